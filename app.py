@@ -4,53 +4,29 @@ from controllers.api_controller import api_bp
 from controllers.web_controller import web_bp
 from controllers.auth_controller import auth_bp
 from middleware.security import setup_security_headers
+from middleware.instrumentation import init_instrumentation
 from services.db import init_db
+from services.config import init_config
+from services.page_cache import init_page_cache
+from lib.ocr_loader import warm_up as warm_up_ocr
 import os
-import glob
 import json
-from typing import Dict
+import logging
+import click
 
+logging.basicConfig(level=os.environ.get('LOG_LEVEL', 'INFO').upper())
 # Initialize Flask app
 app = Flask(__name__, template_folder='templates', static_folder='static')
 
 # Security Configuration
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production')
-app.config['TEMPLATES_AUTO_RELOAD'] = True
-def _load_env_local(path: str) -> Dict[str,str]:
-    env = {}
-    try:
-        if os.path.exists(path):
-            with open(path, 'r', encoding='utf-8') as f:
-                for line in f:
-                    s = line.strip()
-                    if not s or s.startswith('#'):
-                        continue
-                    if '=' in s:
-                        k, v = s.split('=', 1)
-                        env[k.strip()] = v.strip()
-    except Exception:
-        pass
-    return env
-
-# Load local environment overrides for secrets
-_env_local = _load_env_local(os.path.join(os.path.dirname(__file__), '.env.local'))
-for k, v in _env_local.items():
-    os.environ.setdefault(k, v)
-_cid = os.environ.get('GOOGLE_CLIENT_ID')
-if not _cid:
-    try:
-        _files = []
-        _files.extend(glob.glob(os.path.join(os.path.dirname(__file__), 'client_secret_*.json')))
-        _files.extend(glob.glob(os.path.join(os.getcwd(), 'client_secret_*.json')))
-        for _p in _files:
-            with open(_p, 'r', encoding='utf-8') as _f:
-                _data = json.load(_f)
-                _cid = (_data.get('web') or {}).get('client_id')
-                if _cid:
-                    break
-    except Exception:
-        _cid = None
-app.config['GOOGLE_CLIENT_ID'] = _cid
+# APP_ENV=production turns off template auto-reload (no per-request template stat)
+app.config['ENV_NAME'] = os.environ.get('APP_ENV', 'development').lower()
+app.config['TEMPLATES_AUTO_RELOAD'] = app.config['ENV_NAME'] != 'production'
+
+# Load .env.local and resolve GOOGLE_CLIENT_ID once; the resolver watches client_secret_*.json by mtime
+init_config(app, os.path.dirname(os.path.abspath(__file__)))
+
 app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'
 app.config['SESSION_COOKIE_SECURE'] = False
 app.config['MAX_CONTENT_LENGTH'] = 10 * 1024 * 1024  # 10MB max file size
@@ -62,6 +38,24 @@ app.register_blueprint(web_bp)
 app.register_blueprint(api_bp)
 
 init_db(app)
+init_page_cache(app)
+init_instrumentation(app)
+
+# The OCR stack loads lazily on the first parse request; opt in to preloading
+if os.environ.get('OCR_PRELOAD', 'False').lower() == 'true':
+    warm_up_ocr()
+
+
+@app.cli.command('warm-ocr')
+@click.option('--repeat', default=3, show_default=True, help='Dummy OCR runs to time after warm-up.')
+def warm_ocr_command(repeat):
+    """Warm the OCR stack and compare the dummy OCR time with steady state."""
+    from lib import ocr_loader, ocr_warmup
+    report = ocr_warmup.warm_up()
+    click.echo(json.dumps(report, indent=2))
+    if report.get('mode') == 'local' and report.get('ocr_available'):
+        for i in range(repeat):
+            click.echo(f"steady run {i + 1}: {ocr_warmup.run_dummy(ocr_loader.get_parser()) * 1000:.1f} ms")
 
 
 # No global redirect; gating is handled at action time on the UI and per-API
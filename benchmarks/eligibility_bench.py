@@ -0,0 +1,197 @@
+"""Synthetic load benchmark for eligibility checks and catalogue endpoints.
+
+Builds seeded synthetic catalogues (10^2..10^5 Exam records) and candidate
+populations, then measures:
+  - Exam construction/validate() and Candidate construction cost
+  - EligibilityService.check_eligibility per candidate
+  - Flask test-client throughput for api.get_exams and web.index
+  - bulk path: CandidateBatch build+validate, EligibilityService.check_eligibility_batch
+    and memory per candidate (Candidate vs CandidateRecord vs CandidateBatch)
+
+Each measurement reports ops/sec and p50/p99 latency.
+
+Usage:
+    python benchmarks/eligibility_bench.py [--sizes 100,1000,10000,100000]
+        [--candidates 500] [--max-seconds 2.0] [--out results.json]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from models.exam import Exam
+from models.candidate import Candidate
+from models.batch import CandidateBatch
+from services.eligibility_service import EligibilityService
+from services.exam_repository import ExamRepository
+
+CATEGORIES = ['GEN', 'EWS', 'OBC-NCL', 'SC', 'ST']
+
+
+def synthetic_exams(n: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    exams = []
+    for i in range(n):
+        min_age = rng.randint(15, 25)
+        exams.append(Exam(
+            exam_id=1000 + i, exam_name=f'Synthetic Exam {i}', conducting_body='Bench Board',
+            exam_level=rng.choice(['National', 'State', 'University']),
+            exam_mode=rng.choice(['Online', 'Offline']), website='example.org',
+            fee_gen_ews=rng.randint(100, 5000), total_duration_mins=rng.choice([60, 120, 180]),
+            min_age=min_age, max_age=rng.choice([min_age + 10, 99]),
+            min_10_percent=float(rng.randint(33, 75)), min_12_percent=float(rng.randint(33, 75)),
+            min_ug_cgpa=rng.choice([0.0, 5.0, 6.0, 6.5]),
+            subjects=['Subject A', 'Subject B'], documents=['Photo', 'Signature'],
+        ))
+    return exams
+
+
+def synthetic_candidate_rows(n: int, seed: int = 11) -> list:
+    rng = random.Random(seed)
+    today = date.today()
+    rows = []
+    for i in range(n):
+        dob = today - timedelta(days=rng.randint(16 * 365, 35 * 365))
+        rows.append({
+            'first_name': f'Candidate {chr(65 + i % 26)}',
+            'dob': dob.isoformat(),
+            'email': f'candidate{i}@example.org',
+            'category': rng.choice(CATEGORIES),
+            'p10': round(rng.uniform(40, 100), 2),
+            'p12': round(rng.uniform(40, 100), 2),
+            'ug_cgpa': round(rng.uniform(0, 10), 2),
+        })
+    return rows
+
+
+def _stats(latencies: list, elapsed: float) -> dict:
+    lat = sorted(latencies)
+    n = len(lat)
+
+    def pct(p):
+        return lat[min(n - 1, int(p * n))] * 1000.0 if n else None
+
+    return {
+        'ops': n,
+        'ops_per_sec': round(n / elapsed, 1) if elapsed > 0 else None,
+        'p50_ms': round(pct(0.50), 4) if n else None,
+        'p99_ms': round(pct(0.99), 4) if n else None,
+    }
+
+
+def measure(fn, items, max_seconds: float) -> dict:
+    """Call fn(item) for each item until the items or the time budget run out."""
+    latencies = []
+    start = time.perf_counter()
+    for item in items:
+        t0 = time.perf_counter()
+        fn(item)
+        latencies.append(time.perf_counter() - t0)
+        if time.perf_counter() - start >= max_seconds:
+            break
+    return _stats(latencies, time.perf_counter() - start)
+
+
+def _bytes_per_candidate(build, n: int) -> float:
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    obj = build()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(s.size_diff for s in after.compare_to(before, 'filename'))
+    del obj
+    return round(size / n, 1) if n else 0.0
+
+
+def bulk(rows: list, exams: list) -> dict:
+    """Compare per-object construction with the columnar batch path."""
+    n = len(rows)
+    t0 = time.perf_counter()
+    candidates = [Candidate.from_dict(r) for r in rows]
+    per_object_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    batch = CandidateBatch.from_dicts(rows)
+    batch.validate()
+    batch_s = time.perf_counter() - t0
+    service = EligibilityService(exams)
+    t0 = time.perf_counter()
+    for c in candidates:
+        service.check_eligibility(c)
+    loop_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    service.check_eligibility_batch(batch)
+    vector_s = time.perf_counter() - t0
+    return {
+        'candidates': n,
+        'exams': len(exams),
+        'construct_validate_ms': {'candidate_objects': round(per_object_s * 1000.0, 2), 'candidate_batch': round(batch_s * 1000.0, 2)},
+        'eligibility_ms': {'per_candidate_loop': round(loop_s * 1000.0, 2), 'batch': round(vector_s * 1000.0, 2)},
+        'bytes_per_candidate': {
+            'candidate': _bytes_per_candidate(lambda: [Candidate.from_dict(r) for r in rows], n),
+            'candidate_record': _bytes_per_candidate(lambda: [batch.record(i) for i in range(n)], n),
+            'candidate_batch': _bytes_per_candidate(lambda: CandidateBatch.from_dicts(rows), n),
+        },
+    }
+
+
+def _http_client():
+    import app as app_module
+    return app_module.app.test_client()
+
+
+def run(sizes, n_candidates: int, max_seconds: float) -> dict:
+    rows = synthetic_candidate_rows(n_candidates)
+    candidate_construct = measure(lambda r: Candidate.from_dict(r), rows, max_seconds)
+    candidates = [Candidate.from_dict(r) for r in rows]
+    client = _http_client()
+    original = ExamRepository.get_all_exams()
+    results = {'candidates': n_candidates, 'candidate_construct': candidate_construct, 'catalogues': []}
+    try:
+        for size in sizes:
+            t0 = time.perf_counter()
+            exams = synthetic_exams(size)
+            build_s = time.perf_counter() - t0
+            service = EligibilityService(exams)
+            entry = {
+                'exams': size,
+                'exam_construct_ms_per_record': round(build_s * 1000.0 / size, 5),
+                'exam_validate': measure(lambda e: e.validate(), exams, max_seconds),
+                'check_eligibility': measure(service.check_eligibility, candidates, max_seconds),
+            }
+            ExamRepository.replace_all(exams)
+            entry['http_api_get_exams'] = measure(lambda _: client.get('/api/exams'), range(10 ** 6), max_seconds)
+            entry['http_web_index'] = measure(lambda _: client.get('/'), range(10 ** 6), max_seconds)
+            results['catalogues'].append(entry)
+        results['bulk'] = bulk(synthetic_candidate_rows(max(n_candidates, 10000)), synthetic_exams(min(sizes[-1], 1000)))
+    finally:
+        ExamRepository.replace_all(original)
+    return results
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument('--sizes', default='100,1000,10000,100000')
+    ap.add_argument('--candidates', type=int, default=500)
+    ap.add_argument('--max-seconds', type=float, default=2.0, help='Time budget per measurement')
+    ap.add_argument('--out')
+    args = ap.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(',') if s.strip()]
+    results = run(sizes, args.candidates, args.max_seconds)
+    out = json.dumps(results, indent=2)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            f.write(out)
+    print(out)
+
+
+if __name__ == '__main__':
+    main()
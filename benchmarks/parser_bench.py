@@ -0,0 +1,181 @@
+"""Reproducible benchmark for the document parsing pipeline.
+
+Runs every bundled fixture through lib/pdf_parser for each method/dpi
+combination, each case in a fresh interpreter so peak RSS is per case, and
+reports wall time, CPU time, peak RSS, peak Python allocation (tracemalloc,
+one extra untimed run) and Tesseract call count.
+
+Documents are handed to the parser as a path by default; --input bytes
+passes raw bytes and --input stream an in-memory upload stream (like a
+small Werkzeug FileStorage), which is where copies used to pile up.
+
+Usage:
+    python benchmarks/parser_bench.py [--repeat 3] [--input path|bytes|stream] [--out results.json]
+    python benchmarks/parser_bench.py --baseline results.json [--tolerance 0.25] [--min-delta 0.005]
+
+With --baseline, exits non-zero when a case got slower than the tolerance
+allows or makes more Tesseract calls than before.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+FIXTURES = [
+    'lib/cbse_10th.pdf',
+    'lib/tenth_certificate.pdf',
+    'lib/twelfth_certificate.pdf',
+    'lib/ug_certificate.pdf',
+    'cbse_10th.jpg',
+]
+METHODS = ('auto', 'text', 'ocr')
+DPIS = (150, 300)
+
+
+def _cases(fixtures, methods, dpis):
+    for path in fixtures:
+        if path.lower().endswith(('.png', '.jpg', '.jpeg')):
+            yield {'fixture': path, 'method': 'image', 'dpi': None}
+            continue
+        for method in methods:
+            for dpi in (dpis if method != 'text' else dpis[:1]):
+                yield {'fixture': path, 'method': method, 'dpi': dpi}
+
+
+def _case_key(case) -> str:
+    return f"{case['fixture']}|{case['method']}|{case['dpi']}"
+
+
+def _run_case_inline(case, repeat: int, input_mode: str = 'path') -> dict:
+    """Executed inside the child interpreter."""
+    from lib import pdf_parser, timing
+    pdf_parser.probe_ocr_environment()
+    path = os.path.join(ROOT, case['fixture'])
+    data = None
+    if input_mode != 'path':
+        with open(path, 'rb') as f:
+            data = f.read()
+
+    def make_source():
+        if input_mode == 'stream':
+            stream = io.BytesIO()
+            stream.write(data)
+            stream.seek(0)
+            return stream
+        return data if input_mode == 'bytes' else path
+
+    def run_once(source):
+        if case['method'] == 'image':
+            return pdf_parser.extract_marksheet_fields_from_image(source)
+        return pdf_parser.extract_marksheet_fields(source, method=case['method'], dpi=case['dpi'])
+
+    walls, cpus, calls = [], [], []
+    result = None
+    for _ in range(repeat):
+        timing.reset()
+        source = make_source()
+        w0, c0 = time.perf_counter(), time.process_time()
+        result = run_once(source)
+        walls.append(time.perf_counter() - w0)
+        cpus.append(time.process_time() - c0)
+        calls.append(timing.snapshot().get(('stage', 'ocr.tesseract'), {}).get('count', 0))
+    source = make_source()
+    tracemalloc.start()
+    run_once(source)
+    _, alloc_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    try:
+        import resource
+        peak_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    except Exception:
+        peak_rss_kb = None
+    return {
+        **case,
+        'wall_s': round(statistics.median(walls), 4),
+        'cpu_s': round(statistics.median(cpus), 4),
+        'peak_rss_kb': peak_rss_kb,
+        'alloc_peak_kb': round(alloc_peak / 1024.0, 1),
+        'tesseract_calls': max(calls) if calls else 0,
+        'ok': isinstance(result, dict) and 'error' not in result,
+    }
+
+
+def _run_case(case, repeat: int, input_mode: str = 'path') -> dict:
+    proc = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child', json.dumps(case), '--repeat', str(repeat), '--input', input_mode],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        return {**case, 'error': (proc.stderr or '').strip().splitlines()[-1:] or ['child failed']}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def compare(current: dict, baseline: dict, tolerance: float, min_delta: float = 0.005) -> list:
+    """Return a list of regression descriptions (empty when none)."""
+    base = {_case_key(c): c for c in baseline.get('cases', [])}
+    regressions = []
+    for case in current.get('cases', []):
+        prev = base.get(_case_key(case))
+        if not prev or 'error' in case or 'error' in prev:
+            continue
+        slower = case['wall_s'] - prev['wall_s']
+        if slower > min_delta and case['wall_s'] > prev['wall_s'] * (1.0 + tolerance):
+            regressions.append(f"{_case_key(case)}: wall {prev['wall_s']}s -> {case['wall_s']}s")
+        if case['tesseract_calls'] > prev['tesseract_calls']:
+            regressions.append(f"{_case_key(case)}: tesseract calls {prev['tesseract_calls']} -> {case['tesseract_calls']}")
+    return regressions
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument('--repeat', type=int, default=3)
+    ap.add_argument('--input', choices=('path', 'bytes', 'stream'), default='path', help='How documents are handed to the parser')
+    ap.add_argument('--out')
+    ap.add_argument('--baseline')
+    ap.add_argument('--tolerance', type=float, default=0.25)
+    ap.add_argument('--min-delta', type=float, default=0.005, help='Ignore slowdowns below this many seconds')
+    ap.add_argument('--fixture', action='append', help='Limit to these fixtures (repeatable)')
+    ap.add_argument('--method', action='append', choices=METHODS)
+    ap.add_argument('--dpi', action='append', type=int)
+    ap.add_argument('--child', help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        print(json.dumps(_run_case_inline(json.loads(args.child), max(1, args.repeat), args.input)))
+        return
+
+    cases = list(_cases(args.fixture or FIXTURES, tuple(args.method or METHODS), tuple(args.dpi or DPIS)))
+    results = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': args.repeat,
+        'input': args.input,
+        'cases': [_run_case(c, max(1, args.repeat), args.input) for c in cases],
+    }
+    out = json.dumps(results, indent=2)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            f.write(out)
+    print(out)
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance, args.min_delta)
+        for r in regressions:
+            print(f'REGRESSION {r}', file=sys.stderr)
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""Cold-start import budget for the Flask app.
+
+Runs `python -X importtime -c "import app"` in a fresh interpreter, once with
+the lazy OCR stack and once with OCR_PRELOAD=true, and reports cumulative
+import time, peak RSS and whether any heavy OCR module was loaded.
+
+Usage:
+    python benchmarks/startup_importtime.py [--budget-ms 800] [--runs 3]
+
+Exits non-zero when the lazy cold start exceeds the budget or pulls in the
+OCR stack.
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ('cv2', 'PIL', 'pytesseract', 'pdf2image', 'PyPDF2', 'numpy')
+
+_PROBE = (
+    "import sys, json\n"
+    "import app\n"
+    "try:\n"
+    "    import resource\n"
+    "    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss\n"
+    "except Exception:\n"
+    "    rss = None\n"
+    "print(json.dumps({'maxrss_kb': rss, 'heavy': [m for m in %r if m in sys.modules]}))\n"
+) % (HEAVY_MODULES,)
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def _run_once(preload: bool) -> dict:
+    env = dict(os.environ)
+    env['OCR_PRELOAD'] = 'true' if preload else 'false'
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', _PROBE],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    app_us = None
+    top = []
+    for line in proc.stderr.splitlines():
+        m = _LINE.match(line)
+        if not m:
+            continue
+        cumulative = int(m.group(2))
+        name = m.group(4)
+        if name == 'app' and not m.group(3).strip(' '):
+            app_us = cumulative
+        top.append((cumulative, name))
+    top.sort(reverse=True)
+    probe = json.loads(proc.stdout.strip().splitlines()[-1])
+    return {
+        'app_import_ms': round((app_us or 0) / 1000.0, 1),
+        'maxrss_kb': probe['maxrss_kb'],
+        'heavy_modules_loaded': probe['heavy'],
+        'slowest_imports': [{'module': n, 'cumulative_ms': round(c / 1000.0, 1)} for c, n in top[:10]],
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument('--budget-ms', type=float, default=800.0)
+    ap.add_argument('--runs', type=int, default=3)
+    args = ap.parse_args()
+
+    report = {}
+    for label, preload in (('lazy', False), ('preload', True)):
+        runs = [_run_once(preload) for _ in range(max(1, args.runs))]
+        best = min(runs, key=lambda r: r['app_import_ms'])
+        report[label] = best
+    lazy = report['lazy']
+    report['budget_ms'] = args.budget_ms
+    report['ok'] = lazy['app_import_ms'] <= args.budget_ms and not lazy['heavy_modules_loaded']
+    print(json.dumps(report, indent=2))
+    sys.exit(0 if report['ok'] else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""Benchmark the PDF text-layer engines in lib/text_backends.py.
+
+For every installed engine and every PDF fixture in lib/ reports the median
+extraction time, page/character counts and whether the marksheet fields
+parsed from its text (percentage, CGPA, totals, subject marks) match the
+PyPDF2 reference.
+
+Usage:
+    python benchmarks/text_backend_bench.py [--repeat 20] [--fixture lib/x.pdf] [--out results.json]
+"""
+import argparse
+import glob
+import json
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from lib import text_backends
+from lib.document_buffer import DocumentBuffer
+from lib.pdf_parser import _join_pages, _parse_marksheet_text
+
+NUMERIC_FIELDS = ('percentage', 'cgpa', 'total_marks', 'max_marks', 'calculated_percentage')
+
+
+def _numeric_fields(text: str) -> dict:
+    fields = _parse_marksheet_text(text)
+    out = {k: fields.get(k) for k in NUMERIC_FIELDS}
+    out['subject_marks'] = sorted((s.get('marks'), s.get('max')) for s in fields.get('subjects') or [])
+    return out
+
+
+def bench_fixture(path: str, repeat: int) -> dict:
+    with open(path, 'rb') as f:
+        data = f.read()
+    reference = None
+    rows = []
+    for backend in text_backends.available_backends():
+        times = []
+        texts = None
+        error = None
+        for _ in range(repeat):
+            with DocumentBuffer.from_bytes(data) as doc:
+                t0 = time.perf_counter()
+                try:
+                    texts = backend.page_texts(doc)
+                except Exception as e:
+                    error = str(e)
+                    break
+                times.append(time.perf_counter() - t0)
+        if error:
+            rows.append({'backend': backend.name, 'error': error})
+            continue
+        fields = _numeric_fields(_join_pages(texts))
+        rows.append({
+            'backend': backend.name,
+            'median_ms': round(statistics.median(times) * 1000.0, 3),
+            'pages': len(texts),
+            'chars': sum(len(t) for t in texts),
+            'fields': fields,
+        })
+        if backend.name == 'pypdf2':
+            reference = fields
+    for row in rows:
+        if 'fields' in row:
+            row['matches_pypdf2'] = reference is not None and row.pop('fields') == reference
+    return {'fixture': os.path.relpath(path, ROOT), 'size_kb': round(len(data) / 1024.0, 1), 'backends': rows}
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument('--repeat', type=int, default=20)
+    ap.add_argument('--fixture', action='append', help='Limit to these PDFs (repeatable)')
+    ap.add_argument('--out')
+    args = ap.parse_args()
+
+    fixtures = args.fixture or sorted(p for p in glob.glob(os.path.join(ROOT, 'lib', '*.pdf')) if not os.path.basename(p).startswith('~$'))
+    results = {
+        'installed': [b.name for b in text_backends.available_backends()],
+        'selected': text_backends.select_backends()[0].name if text_backends.available_backends() else None,
+        'fixtures': [bench_fixture(os.path.join(ROOT, p) if not os.path.isabs(p) else p, max(1, args.repeat)) for p in fixtures],
+    }
+    out = json.dumps(results, indent=2)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            f.write(out)
+    print(out)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,17 +1,27 @@
 """API controller for handling API endpoints."""
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 from services.exam_repository import ExamRepository
 from services.db import SessionLocal
+from services.candidate_import import detect_format, import_candidates
+from services.eligibility_export import EXPORT_FORMATS, export_eligibility
+from services.upload_store import UploadError, append_chunk, complete_upload, completed_upload, create_upload, upload_status
 from models.db_models import CandidateProfile, DocumentUpload, ParsedDocument, AcademicVerification
 import json
-from lib.pdf_parser import extract_text_from_pdf, extract_marksheet_fields, extract_marksheet_fields_from_image
+import re
+import shutil
+import tempfile
+from lib.ocr_loader import capabilities, get_parser, submit
+from lib.document_buffer import DocumentBuffer
+from lib import deadline, timing
+from lib.ocr_confidence import FALLBACK_CONFIDENCE
 from middleware.security import (
     validate_file_upload, validate_dpi, validate_method,
-    sanitize_input, rate_limit
+    sanitize_input, rate_limit, allowed_file,
+    MAX_FILE_SIZE, MAX_CHUNKED_UPLOAD_SIZE, MAX_FILENAME_LENGTH
 )
+from contextlib import ExitStack
 from functools import wraps
 from flask import session, jsonify
-from io import BytesIO
 
 def require_login(f):
     @wraps(f)
@@ -26,8 +36,28 @@ api_bp = Blueprint('api', __name__, url_prefix='/api')
 
 @api_bp.get('/exams')
 def get_exams():
-    exams = ExamRepository.get_all_exams()
-    return jsonify([e.to_dict() for e in exams])
+    return jsonify(ExamRepository.get_exam_dicts())
+
+
+# Fields of the OCR probe shown without a login; paths, versions and worker addresses are not
+PUBLIC_OCR_CAPS = ('ocr_available', 'tesseract_ok', 'poppler_ok')
+
+
+@api_bp.get('/health/ocr')
+@rate_limit(max_requests=30, window=60)
+def ocr_health():
+    """Report cached OCR capabilities; ?refresh=1 re-probes the environment (login required)."""
+    refresh = (request.args.get('refresh') or '').lower() in ('1', 'true', 'yes')
+    logged_in = bool(session.get('user'))
+    if refresh and not logged_in:
+        return jsonify({'error': 'Authentication required'}), 401
+    caps = capabilities(refresh=refresh)
+    if caps is None:
+        # OCR stack not loaded yet in this worker: unknown, not down
+        return jsonify({k: None for k in PUBLIC_OCR_CAPS}), 200
+    body = caps if logged_in else {k: caps.get(k) for k in PUBLIC_OCR_CAPS}
+    return jsonify(body), (200 if caps.get('ocr_available') else 503)
+
 @api_bp.post('/candidate-profile')
 @require_login
 def save_candidate_profile():
@@ -44,21 +74,155 @@ def save_candidate_profile():
     db = SessionLocal()
     profile = CandidateProfile(user_sub=session['user']['sub'], first_name=first_name, dob=dob, category=category, p10=p10, p12=p12, ug_cgpa=ug_cgpa)
     db.add(profile)
-    db.commit()
+    with timing.stage('db.commit'):
+        db.commit()
     pid = profile.id
     db.close()
     return jsonify({'ok': True, 'candidate_profile_id': pid})
 
+@api_bp.post('/candidate-profiles/import')
+@require_login
+@rate_limit(max_requests=5, window=60)
+def import_candidate_profiles():
+    """Stream-import candidates from CSV/JSONL; per-row results come back as NDJSON."""
+    f = request.files.get('file')
+    filename = f.filename if f else None
+    fmt = detect_format(filename, request.args.get('format'))
+    if fmt is None:
+        return jsonify({'error': 'Unsupported import format. Use csv or jsonl.'}), 400
+    # Werkzeug closes request files when the view returns, so spool to our own temp file first
+    spool = tempfile.TemporaryFile()
+    shutil.copyfileobj(f.stream if f else request.stream, spool, 64 * 1024)
+    spool.seek(0)
+    user_sub = session['user']['sub']
+
+    def generate():
+        try:
+            for result in import_candidates(spool, fmt, user_sub):
+                yield json.dumps(result) + '\n'
+        finally:
+            spool.close()
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@api_bp.get('/export/eligibility')
+@require_login
+@rate_limit(max_requests=10, window=60)
+def export_eligibility_ep():
+    """Stream candidate x eligible-exam results for the caller's profiles as NDJSON or CSV."""
+    fmt = (request.args.get('format') or 'ndjson').lower().strip()
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'error': f"Invalid format. Must be one of: {', '.join(EXPORT_FORMATS)}"}), 400
+    body = export_eligibility(session['user']['sub'], fmt)
+    if fmt == 'csv':
+        resp = Response(stream_with_context(body), mimetype='text/csv')
+        resp.headers['Content-Disposition'] = 'attachment; filename=eligibility.csv'
+        return resp
+    return Response(stream_with_context(body), mimetype='application/x-ndjson')
+
+
+def _document_source(file_field='file', id_field='upload_id'):
+    """
+    Resolve the document for a parse request.
+
+    Returns (source, filename, mime, error) with error as (message, status).
+    `source` is the multipart file, or the spool path of a completed chunked
+    upload named by `id_field`.
+    """
+    upload_id = request.form.get(id_field) or request.args.get(id_field)
+    if upload_id:
+        try:
+            path, filename, mime = completed_upload(upload_id, session['user']['sub'])
+        except UploadError as e:
+            return None, None, None, (str(e), e.status)
+        return path, filename, mime, None
+    f = request.files.get(file_field)
+    is_valid, error_msg = validate_file_upload(f)
+    if not is_valid:
+        return None, None, None, (error_msg, 400)
+    return f, f.filename, getattr(f, 'mimetype', '') or '', None
+
+
+_CONTENT_RANGE_RE = re.compile(r'^bytes (\d+)-(\d+)/(\d+|\*)$')
+
+
+def _chunk_offset():
+    """Chunk offset from ?offset= or a Content-Range header (None if malformed)."""
+    content_range = request.headers.get('Content-Range')
+    if content_range:
+        m = _CONTENT_RANGE_RE.match(content_range.strip())
+        return int(m.group(1)) if m else None
+    try:
+        return int(request.args.get('offset', '0'))
+    except ValueError:
+        return None
+
+
+@api_bp.post('/uploads')
+@require_login
+@rate_limit(max_requests=30, window=60)
+def create_upload_ep():
+    """Start a resumable upload: JSON {filename, size, sha256?}."""
+    data = request.get_json(silent=True) or {}
+    filename = sanitize_input(str(data.get('filename') or ''), max_length=MAX_FILENAME_LENGTH)
+    if not allowed_file(filename):
+        return jsonify({'error': 'File type not allowed. Only pdf, png, jpg, jpeg files are permitted.'}), 400
+    try:
+        size = int(data.get('size'))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Invalid size'}), 400
+    try:
+        status = create_upload(session['user']['sub'], filename, size, MAX_CHUNKED_UPLOAD_SIZE, data.get('sha256'))
+    except UploadError as e:
+        return jsonify({'error': str(e)}), e.status
+    status['max_chunk_size'] = MAX_FILE_SIZE
+    return jsonify(status), 201
+
+
+@api_bp.get('/uploads/<upload_id>')
+@require_login
+def upload_status_ep(upload_id):
+    """Report received bytes so an interrupted client can resume from `offset`."""
+    try:
+        return jsonify(upload_status(upload_id, session['user']['sub']))
+    except UploadError as e:
+        return jsonify({'error': str(e)}), e.status
+
+
+@api_bp.put('/uploads/<upload_id>')
+@api_bp.patch('/uploads/<upload_id>')
+@require_login
+@rate_limit(max_requests=600, window=60)
+def upload_chunk_ep(upload_id):
+    """Append the raw request body at ?offset= (or Content-Range), hashing while it streams to disk."""
+    offset = _chunk_offset()
+    if offset is None or offset < 0:
+        return jsonify({'error': 'Invalid offset'}), 400
+    try:
+        return jsonify(append_chunk(upload_id, session['user']['sub'], offset, request.stream))
+    except UploadError as e:
+        return jsonify({'error': str(e)}), e.status
+
+
+@api_bp.post('/uploads/<upload_id>/complete')
+@require_login
+def complete_upload_ep(upload_id):
+    """Verify size and checksum; the upload_id can then be passed to the parse/verify endpoints."""
+    try:
+        return jsonify(complete_upload(upload_id, session['user']['sub']))
+    except UploadError as e:
+        return jsonify({'error': str(e)}), e.status
+
+
 @api_bp.post('/parse-pdf')
 @require_login
 @rate_limit(max_requests=50, window=60)
 def parse_pdf_ep():
     """Parse PDF endpoint with security validation."""
-    # Validate file upload
-    f = request.files.get('file')
-    is_valid, error_msg = validate_file_upload(f)
-    if not is_valid:
-        return jsonify({'error': error_msg}), 400
+    # Validate file upload (multipart 'file' or a completed chunked 'upload_id')
+    source, filename, mime, error = _document_source()
+    if error:
+        return jsonify({'error': error[0]}), error[1]
     
     # Validate method parameter
     method_param = request.args.get('method', 'auto')
@@ -74,22 +238,25 @@ def parse_pdf_ep():
     
     try:
         # Extract text from PDF
-        text = extract_text_from_pdf(f, method=method, dpi=dpi)
+        with DocumentBuffer.wrap(source, name=filename) as doc, deadline.budget() as budget:
+            text = get_parser().extract_text_from_pdf(doc, method=method, dpi=dpi)
         
         # Sanitize output to prevent XSS
         text = sanitize_input(text, max_length=100000)
         db = SessionLocal()
         doc_type = request.args.get('doc_type', 'unknown')
-        upload = DocumentUpload(user_sub=session['user']['sub'], doc_type=doc_type, filename=f.filename, mime=(getattr(f, 'mimetype', None) or 'application/pdf'), stored_path=None)
+        upload = DocumentUpload(user_sub=session['user']['sub'], doc_type=doc_type, filename=filename, mime=(mime or 'application/pdf'), stored_path=None)
         db.add(upload)
         db.flush()
         db.add(ParsedDocument(upload_id=upload.id, parsed_json=json.dumps({'text': text, 'method': method, 'dpi': dpi})))
-        db.commit()
+        with timing.stage('db.commit'):
+            db.commit()
         db.close()
         return jsonify({
             'text': text,
             'method': method,
-            'dpi': dpi
+            'dpi': dpi,
+            'truncated': budget.truncated
         })
     except RuntimeError as e:
         # Don't expose internal error details
@@ -108,11 +275,10 @@ def parse_pdf_ep():
 @rate_limit(max_requests=50, window=60)
 def parse_marksheet_ep():
     """Parse marksheet endpoint with security validation."""
-    # Validate file upload
-    f = request.files.get('file')
-    is_valid, error_msg = validate_file_upload(f)
-    if not is_valid:
-        return jsonify({'error': error_msg}), 400
+    # Validate file upload (multipart 'file' or a completed chunked 'upload_id')
+    source, filename, mime, error = _document_source()
+    if error:
+        return jsonify({'error': error[0]}), error[1]
     
     # Validate method parameter
     method_param = request.args.get('method', 'auto')
@@ -127,9 +293,10 @@ def parse_marksheet_ep():
         return jsonify({'error': error_msg}), 400
     
     try:
-        mime = getattr(f, 'mimetype', '') or ''
-        is_img = str(mime).lower().startswith('image/') or f.filename.lower().endswith(('.png', '.jpg', '.jpeg'))
-        fields = extract_marksheet_fields_from_image(f) if is_img else extract_marksheet_fields(f, method=method, dpi=dpi)
+        is_img = str(mime).lower().startswith('image/') or filename.lower().endswith(('.png', '.jpg', '.jpeg'))
+        parser = get_parser()
+        with DocumentBuffer.wrap(source, name=filename) as doc, deadline.budget() as budget:
+            fields = parser.extract_marksheet_fields_from_image(doc) if is_img else parser.extract_marksheet_fields(doc, method=method, dpi=dpi)
         
         # Sanitize all string fields in the response
         if isinstance(fields, dict):
@@ -159,89 +326,141 @@ def parse_marksheet_ep():
             fields = sanitized_fields
         db = SessionLocal()
         doc_type = request.args.get('doc_type', 'marksheet')
-        upload = DocumentUpload(user_sub=session['user']['sub'], doc_type=doc_type, filename=f.filename, mime=(getattr(f, 'mimetype', None) or 'application/pdf'), stored_path=None)
+        upload = DocumentUpload(user_sub=session['user']['sub'], doc_type=doc_type, filename=filename, mime=(mime or 'application/pdf'), stored_path=None)
         db.add(upload)
         db.flush()
         db.add(ParsedDocument(upload_id=upload.id, parsed_json=json.dumps({'fields': fields, 'method': method, 'dpi': dpi})))
-        db.commit()
+        with timing.stage('db.commit'):
+            db.commit()
         db.close()
         return jsonify({
             'fields': fields,
             'method': method,
-            'dpi': dpi
+            'dpi': dpi,
+            'truncated': budget.truncated
         })
     except Exception as e:
         # Don't expose internal error details
         return jsonify({'error': 'An unexpected error occurred while processing the marksheet.'}), 500
 
 
-@api_bp.post('/verify-academic')
-@api_bp.post('/verify-academic/')
-@require_login
-@rate_limit(max_requests=30, window=60)
-def verify_academic():
-    stage = (request.args.get('stage') or '').upper().strip()
-    if stage not in ('10', '12', 'UG'):
-        return jsonify({'error': 'Invalid stage. Use 10, 12, or UG'}), 400
-    entered_raw = request.form.get('entered') or request.args.get('entered')
-    try:
-        entered_val = float(entered_raw)
-    except Exception:
-        return jsonify({'error': 'Invalid entered value'}), 400
-    f = request.files.get('file')
-    is_valid, error_msg = validate_file_upload(f)
-    if not is_valid:
-        return jsonify({'error': error_msg}), 400
-    method_param = request.args.get('method', 'auto')
-    is_valid, method, error_msg = validate_method(method_param)
-    if not is_valid:
-        return jsonify({'error': error_msg}), 400
-    dpi_param = request.args.get('dpi')
-    is_valid, dpi, error_msg = validate_dpi(dpi_param)
-    if not is_valid:
-        return jsonify({'error': error_msg}), 400
-    # Optional tolerance parameter
-    tol_param = request.args.get('tolerance') or request.args.get('tol')
-    try:
-        tolerance = float(tol_param) if tol_param is not None else 0.1
-        if tolerance < 0:
-            tolerance = 0.1
-    except Exception:
-        tolerance = 0.1
-    # Round the entered value for consistent comparison
-    entered_val = round(entered_val, 2)
-    try:
-        file_bytes = f.read()
-        buf = BytesIO(file_bytes)
-        mime = getattr(f, 'mimetype', '') or ''
-        is_img = str(mime).lower().startswith('image/') or f.filename.lower().endswith(('.png', '.jpg', '.jpeg'))
-        fields = (extract_marksheet_fields_from_image(BytesIO(file_bytes)) if is_img else extract_marksheet_fields(buf, method=method, dpi=dpi)) or {}
-        # Robust computation from raw fields if percentage missing
-        def safe_float(x):
-            try:
-                return float(x)
-            except Exception:
-                return None
+def _targeted_value(parser, doc, stage, dpi, max_marks=None):
+    """
+    Value to compare from a targeted numeric re-OCR, as (value, source, fields).
+
+    Same preference as the full parse: percentage for 10/12, CGPA for UG,
+    then the total/max ratio (max_marks from the first pass when the crop
+    holds no "/max"). (None, None, {}) when nothing usable was read.
+    """
+    numeric = parser.extract_numeric_fields(doc, dpi=max(dpi or 300, 300), max_marks=max_marks) or {}
+    total, maximum = numeric.get('total_marks'), numeric.get('max_marks', max_marks)
+    computed = (total / maximum) * 100.0 if total and maximum else None
+    order = ('percentage', 'total', 'cgpa') if stage in ('10', '12') else ('cgpa', 'percentage', 'total')
+    for name in order:
+        value = computed if name == 'total' else numeric.get(name)
+        if value is not None:
+            return round(float(value), 2), f'targeted_{name}', numeric
+    return None, None, numeric
+
+
+# comparison_source -> the confidence key it was read from
+_SOURCE_CONFIDENCE = {'percentage': 'percentage', 'calculated_percentage': 'calculated_percentage',
+                      'computed_total': 'total_marks', 'cgpa': 'cgpa'}
+
+
+def _verify_marksheet(doc, filename, mime, stage, entered_val, method, dpi, tolerance):
+    """Extract marks from one DocumentBuffer and compare them with the entered value (no DB writes)."""
+    # One time/page budget per document, fallback passes included; batch jobs each get their own
+    with deadline.budget() as budget:
+        result = _compare_marksheet(doc, filename, mime, stage, entered_val, method, dpi, tolerance)
+    result['truncated'] = budget.truncated
+    return result
+
+
+def _compare_marksheet(doc, filename, mime, stage, entered_val, method, dpi, tolerance):
+    is_img = str(mime).lower().startswith('image/') or filename.lower().endswith(('.png', '.jpg', '.jpeg'))
+    parser = get_parser()
+    fields = (parser.extract_marksheet_fields_from_image(doc) if is_img else parser.extract_marksheet_fields(doc, method=method, dpi=dpi)) or {}
+    # Robust computation from raw fields if percentage missing
+    def safe_float(x):
+        try:
+            return float(x)
+        except Exception:
+            return None
+    total_marks = safe_float(fields.get('total_marks'))
+    max_marks = safe_float(fields.get('max_marks'))
+    if (total_marks is None or max_marks is None or max_marks <= 0):
+        subs = fields.get('subjects') or []
+        sm = sum((s.get('marks') or 0) for s in subs if isinstance(s.get('marks'), (int, float)))
+        sx = sum((s.get('max') or 0) for s in subs if isinstance(s.get('max'), (int, float)))
+        if sm > 0:
+            total_marks = sm
+        if (sx is None or sx <= 0) and subs:
+            sx = 100.0 * len([1 for s in subs if s.get('marks') is not None])
+        if sx and sx > 0:
+            max_marks = sx
+    calc_pct = None
+    if total_marks is not None and max_marks is not None and max_marks > 0:
+        calc_pct = (total_marks / max_marks) * 100.0
+    # Prefer percentage for 10/12, CGPA for UG; fall back to calc_pct
+    extracted = None
+    source = None
+    if stage in ('10', '12'):
+        extracted = fields.get('percentage')
+        if extracted is None:
+            extracted = fields.get('calculated_percentage')
+            source = 'calculated_percentage' if extracted is not None else source
+        if extracted is None:
+            extracted = calc_pct
+            source = 'computed_total' if extracted is not None else source
+        if extracted is None:
+            extracted = fields.get('cgpa')
+            source = 'cgpa' if extracted is not None else source
+        if source is None and extracted is not None:
+            source = 'percentage'
+    else:
+        extracted = fields.get('cgpa')
+        if extracted is None:
+            extracted = fields.get('percentage')
+            source = 'percentage' if extracted is not None else source
+        if extracted is None:
+            extracted = fields.get('calculated_percentage')
+            source = 'calculated_percentage' if extracted is not None else source
+        if extracted is None:
+            extracted = calc_pct
+            source = 'computed_total' if extracted is not None else source
+        if source is None and extracted is not None:
+            source = 'cgpa'
+    extracted_val = safe_float(extracted)
+    if extracted_val is not None:
+        extracted_val = round(extracted_val, 2)
+    confidence = (fields.get('confidence') or {}).get(_SOURCE_CONFIDENCE.get(source))
+    # A confidently read value that differs is a real mismatch; only doubtful reads get a second pass
+    needs_fallback = extracted_val is None or (abs(extracted_val - entered_val) > tolerance
+                                               and (confidence is None or confidence < FALLBACK_CONFIDENCE))
+    targeted_val = None
+    # A spent budget skips the fallbacks: the first read is returned as a truncated result
+    if needs_fallback and not deadline.current().proceed('fallback OCR'):
+        needs_fallback = False
+    if needs_fallback:
+        # Cheap fallback first: re-read just the numeric fields' crops
+        targeted_val, targeted_source, numeric = _targeted_value(parser, doc, stage, dpi, max_marks)
+        if targeted_val is not None:
+            extracted_val, source, confidence = targeted_val, targeted_source, None
+            fields = {**fields, **numeric}
+            total_marks = safe_float(numeric.get('total_marks', total_marks))
+            max_marks = safe_float(numeric.get('max_marks', max_marks))
+    if needs_fallback and targeted_val is None and deadline.current().proceed('full re-OCR'):
+        fields = (parser.extract_marksheet_fields_from_image(doc) if is_img else parser.extract_marksheet_fields(doc, method='ocr', dpi=max(dpi or 300, 300))) or {}
         total_marks = safe_float(fields.get('total_marks'))
         max_marks = safe_float(fields.get('max_marks'))
-        if (total_marks is None or max_marks is None or max_marks <= 0):
-            subs = fields.get('subjects') or []
-            sm = sum((s.get('marks') or 0) for s in subs if isinstance(s.get('marks'), (int, float)))
-            sx = sum((s.get('max') or 0) for s in subs if isinstance(s.get('max'), (int, float)))
-            if sm > 0:
-                total_marks = sm
-            if (sx is None or sx <= 0) and subs:
-                sx = 100.0 * len([1 for s in subs if s.get('marks') is not None])
-            if sx and sx > 0:
-                max_marks = sx
         calc_pct = None
         if total_marks is not None and max_marks is not None and max_marks > 0:
             calc_pct = (total_marks / max_marks) * 100.0
-        # Prefer percentage for 10/12, CGPA for UG; fall back to calc_pct
-        extracted = None
-        source = None
+        # Re-evaluate sources in fallback
         if stage in ('10', '12'):
             extracted = fields.get('percentage')
+            source = 'percentage' if extracted is not None else None
             if extracted is None:
                 extracted = fields.get('calculated_percentage')
                 source = 'calculated_percentage' if extracted is not None else source
@@ -251,10 +470,9 @@ def verify_academic():
             if extracted is None:
                 extracted = fields.get('cgpa')
                 source = 'cgpa' if extracted is not None else source
-            if source is None and extracted is not None:
-                source = 'percentage'
         else:
             extracted = fields.get('cgpa')
+            source = 'cgpa' if extracted is not None else None
             if extracted is None:
                 extracted = fields.get('percentage')
                 source = 'percentage' if extracted is not None else source
@@ -264,71 +482,145 @@ def verify_academic():
             if extracted is None:
                 extracted = calc_pct
                 source = 'computed_total' if extracted is not None else source
-            if source is None and extracted is not None:
-                source = 'cgpa'
         extracted_val = safe_float(extracted)
         if extracted_val is not None:
             extracted_val = round(extracted_val, 2)
-        if extracted_val is None or abs(extracted_val - entered_val) > tolerance:
-            buf2 = BytesIO(file_bytes)
-            fields = (extract_marksheet_fields_from_image(buf2) if is_img else extract_marksheet_fields(buf2, method='ocr', dpi=max(dpi or 300, 300))) or {}
-            total_marks = safe_float(fields.get('total_marks'))
-            max_marks = safe_float(fields.get('max_marks'))
-            calc_pct = None
-            if total_marks is not None and max_marks is not None and max_marks > 0:
-                calc_pct = (total_marks / max_marks) * 100.0
-            # Re-evaluate sources in fallback
-            if stage in ('10', '12'):
-                extracted = fields.get('percentage')
-                source = 'percentage' if extracted is not None else None
-                if extracted is None:
-                    extracted = fields.get('calculated_percentage')
-                    source = 'calculated_percentage' if extracted is not None else source
-                if extracted is None:
-                    extracted = calc_pct
-                    source = 'computed_total' if extracted is not None else source
-                if extracted is None:
-                    extracted = fields.get('cgpa')
-                    source = 'cgpa' if extracted is not None else source
-            else:
-                extracted = fields.get('cgpa')
-                source = 'cgpa' if extracted is not None else None
-                if extracted is None:
-                    extracted = fields.get('percentage')
-                    source = 'percentage' if extracted is not None else source
-                if extracted is None:
-                    extracted = fields.get('calculated_percentage')
-                    source = 'calculated_percentage' if extracted is not None else source
-                if extracted is None:
-                    extracted = calc_pct
-                    source = 'computed_total' if extracted is not None else source
-            extracted_val = safe_float(extracted)
-            if extracted_val is not None:
-                extracted_val = round(extracted_val, 2)
-        diff = None
-        if extracted_val is not None:
-            diff = round(abs(extracted_val - entered_val), 3)
-        verified = int(extracted_val is not None and diff is not None and diff <= tolerance)
+        confidence = (fields.get('confidence') or {}).get(_SOURCE_CONFIDENCE.get(source))
+    diff = None
+    if extracted_val is not None:
+        diff = round(abs(extracted_val - entered_val), 3)
+    verified = int(extracted_val is not None and diff is not None and diff <= tolerance)
+    return {
+        'stage': stage,
+        'entered': entered_val,
+        'extracted': extracted_val,
+        'difference': diff,
+        'tolerance': tolerance,
+        'comparison_source': source,
+        'confidence': confidence,
+        'total_marks': total_marks,
+        'max_marks': max_marks,
+        'verified': bool(verified),
+        'fields': fields
+    }
+
+
+def _save_verification(db, user_sub, result, filename, mime, method, dpi):
+    """Stage upload, parsed document and verification rows for one result (caller commits)."""
+    upload = DocumentUpload(user_sub=user_sub, doc_type=f"marksheet-{result['stage']}", filename=filename, mime=(mime or 'application/pdf'), stored_path=None)
+    db.add(upload)
+    db.flush()
+    db.add(ParsedDocument(upload_id=upload.id, parsed_json=json.dumps({'fields': result['fields'], 'method': method, 'dpi': dpi})))
+    av = AcademicVerification(user_sub=user_sub, stage=result['stage'], entered_value=result['entered'], extracted_value=result['extracted'], verified=int(result['verified']), upload_id=upload.id, filename=filename, mime=(mime or 'application/pdf'))
+    db.add(av)
+
+
+def _tolerance_param():
+    """Optional tolerance query parameter (default 0.1)."""
+    tol_param = request.args.get('tolerance') or request.args.get('tol')
+    try:
+        tolerance = float(tol_param) if tol_param is not None else 0.1
+        if tolerance < 0:
+            tolerance = 0.1
+    except Exception:
+        tolerance = 0.1
+    return tolerance
+
+
+@api_bp.post('/verify-academic')
+@api_bp.post('/verify-academic/')
+@require_login
+@rate_limit(max_requests=30, window=60)
+def verify_academic():
+    stage = (request.args.get('stage') or '').upper().strip()
+    if stage not in ('10', '12', 'UG'):
+        return jsonify({'error': 'Invalid stage. Use 10, 12, or UG'}), 400
+    entered_raw = request.form.get('entered') or request.args.get('entered')
+    try:
+        entered_val = float(entered_raw)
+    except Exception:
+        return jsonify({'error': 'Invalid entered value'}), 400
+    source, filename, mime, error = _document_source()
+    if error:
+        return jsonify({'error': error[0]}), error[1]
+    method_param = request.args.get('method', 'auto')
+    is_valid, method, error_msg = validate_method(method_param)
+    if not is_valid:
+        return jsonify({'error': error_msg}), 400
+    dpi_param = request.args.get('dpi')
+    is_valid, dpi, error_msg = validate_dpi(dpi_param)
+    if not is_valid:
+        return jsonify({'error': error_msg}), 400
+    tolerance = _tolerance_param()
+    # Round the entered value for consistent comparison
+    entered_val = round(entered_val, 2)
+    try:
+        with DocumentBuffer.wrap(source, name=filename) as doc:
+            result = _verify_marksheet(doc, filename, mime, stage, entered_val, method, dpi, tolerance)
         db = SessionLocal()
-        upload = DocumentUpload(user_sub=session['user']['sub'], doc_type=f"marksheet-{stage}", filename=f.filename, mime=(getattr(f, 'mimetype', None) or 'application/pdf'), stored_path=None)
-        db.add(upload)
-        db.flush()
-        db.add(ParsedDocument(upload_id=upload.id, parsed_json=json.dumps({'fields': fields, 'method': method, 'dpi': dpi})))
-        av = AcademicVerification(user_sub=session['user']['sub'], stage=stage, entered_value=entered_val, extracted_value=extracted_val, verified=verified, upload_id=upload.id, filename=f.filename, mime=(getattr(f, 'mimetype', None) or 'application/pdf'))
-        db.add(av)
-        db.commit()
+        _save_verification(db, session['user']['sub'], result, filename, mime, method, dpi)
+        with timing.stage('db.commit'):
+            db.commit()
         db.close()
-        return jsonify({
-            'stage': stage,
-            'entered': entered_val,
-            'extracted': extracted_val,
-            'difference': diff,
-            'tolerance': tolerance,
-            'comparison_source': source,
-            'total_marks': total_marks,
-            'max_marks': max_marks,
-            'verified': bool(verified),
-            'fields': fields
-        })
+        return jsonify(result)
     except Exception:
         return jsonify({'error': 'Failed to verify academic document'}), 500
+
+
+
+@api_bp.post('/verify-academic/batch')
+@require_login
+@rate_limit(max_requests=10, window=60)
+def verify_academic_batch():
+    """Verify several marksheets (file_10 or upload_id_10 with entered_10, likewise 12 and UG) in one request."""
+    method_param = request.args.get('method', 'auto')
+    is_valid, method, error_msg = validate_method(method_param)
+    if not is_valid:
+        return jsonify({'error': error_msg}), 400
+    dpi_param = request.args.get('dpi')
+    is_valid, dpi, error_msg = validate_dpi(dpi_param)
+    if not is_valid:
+        return jsonify({'error': error_msg}), 400
+    tolerance = _tolerance_param()
+    inputs = []
+    for stage in ('10', '12', 'UG'):
+        if request.files.get(f'file_{stage}') is None and not request.form.get(f'upload_id_{stage}'):
+            continue
+        source, filename, mime, error = _document_source(f'file_{stage}', f'upload_id_{stage}')
+        if error:
+            return jsonify({'error': f'Stage {stage}: {error[0]}'}), error[1]
+        try:
+            entered_val = round(float(request.form.get(f'entered_{stage}')), 2)
+        except Exception:
+            return jsonify({'error': f'Stage {stage}: Invalid entered value'}), 400
+        inputs.append((stage, source, filename, mime, entered_val))
+    if not inputs:
+        return jsonify({'error': 'No files provided. Use file_10, file_12 and/or file_UG (or upload_id_*)'}), 400
+
+    results = {}
+    errors = {}
+    completed = []
+    # Buffers are only opened once every stage has validated, and closed however this ends
+    with ExitStack() as buffers:
+        futures = []
+        for stage, source, filename, mime, entered_val in inputs:
+            doc = buffers.enter_context(DocumentBuffer.wrap(source, name=filename))
+            futures.append((stage, filename, mime, submit(_verify_marksheet, doc, filename, mime, stage, entered_val, method, dpi, tolerance)))
+        for stage, filename, mime, fut in futures:
+            try:
+                result = fut.result()
+            except Exception:
+                errors[stage] = 'Failed to verify academic document'
+                continue
+            results[stage] = result
+            completed.append((result, filename, mime))
+    try:
+        db = SessionLocal()
+        for result, filename, mime in completed:
+            _save_verification(db, session['user']['sub'], result, filename, mime, method, dpi)
+        with timing.stage('db.commit'):
+            db.commit()
+        db.close()
+    except Exception:
+        return jsonify({'error': 'Failed to save verification results'}), 500
+    return jsonify({'results': results, 'errors': errors})
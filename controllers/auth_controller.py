@@ -1,6 +1,6 @@
-from flask import Blueprint, render_template, request, jsonify, session, redirect, url_for, current_app
-import os, glob, json
+from flask import Blueprint, render_template, request, jsonify, session, redirect, url_for
 from services.db import SessionLocal
+from services.config import get_google_client_id
 from models.db_models import User
 from google.oauth2 import id_token
 from google.auth.transport import requests as grequests
@@ -9,27 +9,13 @@ auth_bp = Blueprint('auth', __name__)
 
 @auth_bp.get('/login')
 def login():
-    client_id = current_app.config.get('GOOGLE_CLIENT_ID')
-    if not client_id:
-        try:
-            files = []
-            files.extend(glob.glob(os.path.join(os.path.dirname(current_app.root_path), 'client_secret_*.json')))
-            files.extend(glob.glob(os.path.join(current_app.root_path, 'client_secret_*.json')))
-            files.extend(glob.glob(os.path.join(os.getcwd(), 'client_secret_*.json')))
-            for p in files:
-                with open(p, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    client_id = (data.get('web') or {}).get('client_id')
-                    if client_id:
-                        break
-        except Exception:
-            client_id = None
+    client_id = get_google_client_id()
     return render_template('login.html', google_client_id=client_id)
 
 @auth_bp.post('/auth/google')
 def auth_google():
     token = request.json.get('credential')
-    client_id = current_app.config.get('GOOGLE_CLIENT_ID')
+    client_id = get_google_client_id()
     if not token or not client_id:
         return jsonify({'error': 'Missing credential or client id'}), 400
     try:
@@ -0,0 +1,18 @@
+"""Gunicorn settings; `gunicorn app:app` reads this file from the repo root.
+
+Each worker warms the OCR stack right after it forks and before it accepts
+connections (lib/ocr_warmup.py), so its first marksheet request runs as
+fast as later ones.
+"""
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '127.0.0.1:3000')
+workers = int(os.environ.get('WEB_CONCURRENCY', '2'))
+# Allow for a cold Tesseract start during warm-up plus a full OCR request
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '120'))
+
+
+def post_fork(server, worker):
+    from lib import ocr_warmup
+    report = ocr_warmup.warm_up()
+    server.log.info('worker %s OCR warm-up: %s', worker.pid, report['steps_ms'])
@@ -0,0 +1,144 @@
+"""Per-request time and page budgets for the parsing pipeline.
+
+A pathological upload (many pages at 600 DPI, then verify_academic's
+fallback passes) could hold a worker for a minute. Controllers open a
+budget() around extraction; the parser checks it between pages and OCR
+variants, passes the remaining time to Tesseract as `timeout=`, and stops
+rasterizing once the page budget is spent. Whatever was read by then is
+returned, and the budget records that the result is truncated.
+
+The budget lives in a contextvar like lib/timing's collector, so it follows
+work submitted through lib.ocr_loader.submit() and is forwarded to OCR
+workers by lib/ocr_client.py.
+
+Environment:
+- OCR_REQUEST_TIMEOUT: seconds of parsing per request (default 30; 0 disables)
+- OCR_PAGE_BUDGET: pages rasterized per request, counted at 300 DPI; a
+  600 DPI page costs 4 (default 20; 0 disables)
+"""
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import List, Optional
+
+# Never hand Tesseract less than this; a shorter run cannot finish a page anyway
+MIN_TESSERACT_TIMEOUT = 1.0
+# Page costs are relative to a page rendered at this DPI
+BASE_DPI = 300
+
+_current: contextvars.ContextVar = contextvars.ContextVar('ocr_deadline', default=None)
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+class Deadline:
+    """
+    Time and page budget shared by everything parsed for one request.
+
+    - seconds: wall-clock budget from now (None for no limit)
+    - pages: rasterization budget in 300 DPI page equivalents (None for no limit)
+    """
+
+    def __init__(self, seconds: Optional[float] = None, pages: Optional[float] = None):
+        self.expires_at = None if seconds is None else time.monotonic() + seconds
+        self.pages_left = pages
+        self.truncated = False
+        self.reasons: List[str] = []
+        self._lock = threading.Lock()
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left, or None without a time limit."""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+    def truncate(self, reason: str) -> None:
+        """Record that some work was skipped, so the result is partial."""
+        with self._lock:
+            self.truncated = True
+            if reason not in self.reasons:
+                self.reasons.append(reason)
+
+    def proceed(self, what: str) -> bool:
+        """False (and the result marked truncated) once the time budget has run out."""
+        if self.expired():
+            self.truncate(f'time budget exhausted before {what}')
+            return False
+        return True
+
+    def tesseract_timeout(self) -> float:
+        """`timeout=` for one Tesseract call (0 = none, pytesseract's default)."""
+        left = self.remaining()
+        return 0 if left is None else max(MIN_TESSERACT_TIMEOUT, left)
+
+    def take_pages(self, pages: List[int], dpi: int) -> List[int]:
+        """The leading pages that fit in the page budget at `dpi`; charges for them."""
+        if self.pages_left is None:
+            return pages
+        cost = (dpi / BASE_DPI) ** 2
+        with self._lock:
+            fits = min(len(pages), int(self.pages_left // cost + 1e-9))
+            self.pages_left -= fits * cost
+        if fits < len(pages):
+            self.truncate(f'page budget exhausted at page {pages[fits]}')
+        return pages[:fits]
+
+
+def current() -> Deadline:
+    """Budget of the running request; an unlimited one outside budget()."""
+    return _current.get() or Deadline()
+
+
+@contextmanager
+def budget(seconds: Optional[float] = None, pages: Optional[float] = None):
+    """
+    Run the block under a fresh Deadline (None: default from the environment).
+
+    Nested calls reuse the outer budget so fallbacks cannot extend it.
+    """
+    outer = _current.get()
+    if outer is not None:
+        yield outer
+        return
+    if seconds is None:
+        seconds = _env_float('OCR_REQUEST_TIMEOUT', 30) or None
+    if pages is None:
+        pages = _env_float('OCR_PAGE_BUDGET', 20) or None
+    deadline = Deadline(seconds, pages)
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+def run_tesseract(fn, *args, **kwargs):
+    """
+    Call a pytesseract function within the current budget.
+
+    Skipped once the time budget is spent; otherwise the remaining time is
+    passed as `timeout=` and a timeout marks the result truncated. Returns
+    None when skipped, timed out or failed.
+    """
+    deadline = current()
+    if not deadline.proceed('OCR'):
+        return None
+    try:
+        return fn(*args, timeout=deadline.tesseract_timeout(), **kwargs)
+    except RuntimeError as e:
+        # pytesseract kills the process and raises RuntimeError('Tesseract process timeout')
+        if 'timeout' in str(e).lower():
+            deadline.truncate('Tesseract call timed out')
+        return None
+    except Exception:
+        return None
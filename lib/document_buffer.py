@@ -0,0 +1,204 @@
+"""Immutable, zero-copy view over one uploaded document.
+
+A DocumentBuffer is built once per upload and handed to every parsing stage
+(text layer, rasterization, image decode, fallbacks). Stages read through
+reader(), which serves slices of the shared memoryview instead of copying
+the document, so bytes, Werkzeug spools and chunked-upload files are never
+duplicated in memory.
+"""
+import hashlib
+import io
+import mmap
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import Iterator, Optional, Union
+
+# Werkzeug keeps uploads up to 500KB in an in-memory spool; larger ones are on disk
+SPOOL_READ_MAX = 512 * 1024
+
+
+class DocumentReader(io.RawIOBase):
+    """Seekable read-only file object over a memoryview; each reader keeps its own position."""
+
+    def __init__(self, view: memoryview):
+        super().__init__()
+        self._view = view
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        # Slice straight out of the view: one allocation per read, like BytesIO
+        start = self._pos
+        end = len(self._view) if size is None or size < 0 else min(len(self._view), start + size)
+        if end <= start:
+            return b''
+        self._pos = end
+        return self._view[start:end].tobytes()
+
+    def readinto(self, b) -> int:
+        end = min(len(self._view), self._pos + len(b))
+        n = max(0, end - self._pos)
+        b[:n] = self._view[self._pos:end]
+        self._pos += n
+        return n
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            pos = offset
+        elif whence == io.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == io.SEEK_END:
+            pos = len(self._view) + offset
+        else:
+            raise ValueError(f'invalid whence ({whence})')
+        if pos < 0:
+            raise ValueError('negative seek position')
+        self._pos = pos
+        return pos
+
+    def tell(self) -> int:
+        return self._pos
+
+
+class DocumentBuffer:
+    """
+    One document's bytes, shared read-only by all parsing stages.
+
+    - path: filesystem path when the document lives on disk (lets pdf2image use convert_from_path)
+    - name: original filename, if known
+    """
+    __slots__ = ('_view', '_bytes', '_mmap', '_digest', 'path', 'name')
+
+    def __init__(self, view: memoryview, data: Optional[bytes] = None, mapped: Optional[mmap.mmap] = None,
+                 path: Optional[str] = None, name: Optional[str] = None):
+        if not view.readonly:
+            readonly = view.toreadonly()
+            view.release()
+            view = readonly
+        self._view = view
+        self._bytes = data
+        self._mmap = mapped
+        self._digest = None
+        self.path = path
+        self.name = name
+
+    @classmethod
+    def from_bytes(cls, data: Union[bytes, bytearray, memoryview], name: Optional[str] = None) -> 'DocumentBuffer':
+        if isinstance(data, bytes):
+            return cls(memoryview(data), data=data, name=name)
+        return cls(memoryview(data), name=name)
+
+    @classmethod
+    def from_path(cls, path: str, name: Optional[str] = None) -> 'DocumentBuffer':
+        """Memory-map a file on disk read-only."""
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return cls(memoryview(b''), data=b'', path=path, name=name)
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(memoryview(mapped), mapped=mapped, path=path, name=name)
+
+    @classmethod
+    def from_stream(cls, stream, name: Optional[str] = None) -> 'DocumentBuffer':
+        """
+        Wrap an open upload stream without copying where possible.
+
+        BytesIO is exposed through getbuffer(), real files are memory-mapped;
+        anything else is read once. Werkzeug spools uploads to a
+        SpooledTemporaryFile that stays in memory up to 500KB. Its fileno()
+        would roll such a spool over to disk, so spools up to SPOOL_READ_MAX
+        are read once instead; larger ones are already on disk and mapped.
+        """
+        stream = getattr(stream, 'stream', stream)  # unwrap werkzeug FileStorage
+        if isinstance(stream, tempfile.SpooledTemporaryFile) and stream.seek(0, io.SEEK_END) <= SPOOL_READ_MAX:
+            stream.seek(0)
+            return cls.from_bytes(stream.read(), name=name)
+        if isinstance(stream, io.BytesIO):
+            return cls(stream.getbuffer(), name=name)
+        try:
+            fd = stream.fileno()
+            size = os.fstat(fd).st_size
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            fd = None
+        if fd is not None and size > 0:
+            mapped = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+            return cls(memoryview(mapped), mapped=mapped, name=name)
+        if hasattr(stream, 'seek'):
+            stream.seek(0)
+        return cls.from_bytes(stream.read(), name=name)
+
+    @classmethod
+    def wrap(cls, input_obj, name: Optional[str] = None) -> 'DocumentBuffer':
+        """Build a buffer from bytes, a path, an open stream or an existing DocumentBuffer."""
+        if isinstance(input_obj, DocumentBuffer):
+            return input_obj
+        if isinstance(input_obj, (bytes, bytearray, memoryview)):
+            return cls.from_bytes(input_obj, name=name)
+        if isinstance(input_obj, (str, os.PathLike)):
+            return cls.from_path(os.fspath(input_obj), name=name)
+        if hasattr(input_obj, 'read'):
+            return cls.from_stream(input_obj, name=name or getattr(input_obj, 'filename', None))
+        raise ValueError('Unsupported input')
+
+    @property
+    def view(self) -> memoryview:
+        return self._view
+
+    def __len__(self) -> int:
+        return len(self._view)
+
+    def reader(self) -> DocumentReader:
+        """A fresh file object over the shared bytes (independent position)."""
+        return DocumentReader(self._view)
+
+    def head(self, n: int = 16) -> bytes:
+        return bytes(self._view[:n])
+
+    def digest(self) -> str:
+        """Content hash, used to key per-document caches."""
+        if self._digest is None:
+            self._digest = hashlib.blake2b(self._view, digest_size=16).hexdigest()
+        return self._digest
+
+    def tobytes(self) -> bytes:
+        """Bytes for APIs that insist on them; free for bytes-backed buffers, one copy otherwise."""
+        if self._bytes is None:
+            self._bytes = self._view.tobytes()
+        return self._bytes
+
+    @contextmanager
+    def on_disk(self, suffix: str = '.pdf') -> Iterator[str]:
+        """Path for tools that need a file (pdftoppm, pdftotext); in-memory documents are spooled once."""
+        if self.path:
+            yield self.path
+            return
+        fd, path = tempfile.mkstemp(suffix=suffix)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(self._view)
+            yield path
+        finally:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def close(self) -> None:
+        try:
+            self._view.release()
+            if self._mmap is not None:
+                self._mmap.close()
+        except BufferError:
+            # A slice handed out by a reader is still alive; the mapping goes with the last reference
+            pass
+
+    def __enter__(self) -> 'DocumentBuffer':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
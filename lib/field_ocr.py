@@ -0,0 +1,167 @@
+"""Targeted re-OCR of the numeric marksheet fields.
+
+verify_academic only compares a few numbers (percentage, CGPA, total marks,
+roll number), yet a full re-OCR runs dictionary-driven English recognition
+over every line of every page. Here one layout pass (image_to_data) finds
+the word boxes of those fields' labels, and only the strip holding each
+value is read again as a single line (--psm 7) restricted to digits, '.'
+and '/'.
+"""
+import re
+from typing import Dict, Iterable, List, Optional
+
+import pytesseract
+from PIL import Image, ImageOps
+
+from lib import deadline
+from lib.timing import stage
+
+NUMERIC_FIELDS = ('percentage', 'cgpa', 'total_marks')
+ALL_FIELDS = NUMERIC_FIELDS + ('roll_no',)
+
+LAYOUT_CONFIG = "--psm 6"
+NUMERIC_CONFIG = "--psm 7 -c tessedit_char_whitelist=0123456789./"
+
+# Label word prefixes (lowercased, punctuation stripped) that precede each value.
+# Grade cards print SGPA rows before the CGPA, so only cumulative/overall labels count.
+FIELD_LABELS = {
+    'percentage': re.compile(r'^(percent|%age)'),
+    'cgpa': re.compile(r'^(cgpa|ogpa|cpi)'),
+    'total_marks': re.compile(r'^(total|grand|aggregate)'),
+    'roll_no': re.compile(r'^(roll|enrol)'),
+}
+
+_NUMBER_RE = re.compile(r'\d+(?:\.\d+)?(?:/\d+(?:\.\d+)?)?')
+
+
+def _layout(img: Image.Image, lang: str) -> Optional[dict]:
+    with stage("ocr.tesseract"):
+        return deadline.run_tesseract(pytesseract.image_to_data, img, lang=lang, config=LAYOUT_CONFIG, output_type=pytesseract.Output.DICT)
+
+
+def _read_line(img: Image.Image, lang: str) -> str:
+    with stage("ocr.tesseract"):
+        return deadline.run_tesseract(pytesseract.image_to_string, img, lang=lang, config=NUMERIC_CONFIG) or ""
+
+
+def word_lines(img: Image.Image, lang: str = "eng") -> List[List[dict]]:
+    """Recognized words grouped into text lines, each word with text and left/top/width/height."""
+    data = _layout(img, lang)
+    if not data:
+        return []
+    lines = {}
+    for i, text in enumerate(data.get('text') or []):
+        text = (text or '').strip()
+        if not text:
+            continue
+        key = (data['block_num'][i], data['par_num'][i], data['line_num'][i])
+        lines.setdefault(key, []).append({
+            'text': text,
+            'left': int(data['left'][i]),
+            'top': int(data['top'][i]),
+            'width': int(data['width'][i]),
+            'height': int(data['height'][i]),
+        })
+    return [sorted(words, key=lambda w: w['left']) for _, words in sorted(lines.items())]
+
+
+def _label_key(text: str) -> str:
+    return re.sub(r'[^a-z%]', '', text.lower())
+
+
+def value_box(line: List[dict], label_index: int, pad: float = 0.35) -> Optional[tuple]:
+    """
+    Crop box (left, top, right, bottom) of the value following line[label_index].
+
+    Starts at the first word after the label that already contains a digit;
+    when the first pass read none, everything right of the label is taken.
+    """
+    after = line[label_index + 1:]
+    if not after:
+        return None
+    start = next((i for i, w in enumerate(after) if any(c.isdigit() for c in w['text'])), None)
+    if start is None:
+        value_words = after
+    else:
+        value_words = [after[start]]
+        # Extend over adjacent numeric tokens ("489 / 500")
+        for w in after[start + 1:]:
+            if not re.fullmatch(r'[\d./%]+', w['text']):
+                break
+            value_words.append(w)
+    height = max(w['height'] for w in line)
+    left = min(w['left'] for w in value_words)
+    right = max(w['left'] + w['width'] for w in value_words)
+    top = min(w['top'] for w in line)
+    bottom = max(w['top'] + w['height'] for w in line)
+    px = int(height * pad) + 2
+    return (max(0, left - px), max(0, top - px), right + px, bottom + px)
+
+
+def parse_value(field: str, text: str, max_marks: Optional[float] = None) -> Dict[str, object]:
+    """
+    Field values from a whitelisted single-line read ({} when implausible).
+
+    - max_marks: maximum marks known from the first pass; a total without
+      "/max" is only taken when it fits that scale (a "Total Credits 24" line
+      is otherwise indistinguishable from a total)
+    """
+    text = (text or '').replace(' ', '')
+    for m in _NUMBER_RE.finditer(text):
+        token = m.group(0)
+        if field == 'roll_no':
+            digits = token.replace('.', '').replace('/', '')
+            if len(digits) >= 4:
+                return {'roll_no': digits}
+            continue
+        if '/' in token:
+            num, den = (float(x) for x in token.split('/', 1))
+            if field == 'total_marks' and 0 < num <= den:
+                return {'total_marks': num, 'max_marks': den}
+            if field == 'cgpa' and 0 < num <= den <= 10:
+                return {'cgpa': num}
+            continue
+        value = float(token)
+        if field == 'percentage' and 0 < value <= 100:
+            return {'percentage': value}
+        if field == 'cgpa' and 0 < value <= 10:
+            return {'cgpa': value}
+        if field == 'total_marks' and max_marks and max_marks / 10 <= value <= max_marks:
+            return {'total_marks': value}
+    return {}
+
+
+def read_fields(img: Image.Image, fields: Iterable[str] = NUMERIC_FIELDS, lang: str = "eng",
+                max_marks: Optional[float] = None) -> Dict[str, object]:
+    """
+    Locate each field's label on a preprocessed page and re-read only its value.
+
+    - fields: subset of ALL_FIELDS
+    - max_marks: known maximum marks (see parse_value)
+    Returns the fields found (plus max_marks for an "a/b" total).
+    """
+    wanted = [f for f in fields if f in FIELD_LABELS]
+    found = {}
+    if not wanted:
+        return found
+    gray = img.convert("L") if img.mode != "L" else img
+    for line in word_lines(gray, lang):
+        keys = [_label_key(w['text']) for w in line]
+        for field in wanted:
+            if field in found:
+                continue
+            for i, key in enumerate(keys):
+                if not FIELD_LABELS[field].match(key):
+                    continue
+                box = value_box(line, i)
+                if box is None:
+                    continue
+                # A white border keeps Tesseract from clipping glyphs at the crop edge
+                crop = ImageOps.expand(gray.crop(box), border=10, fill=255)
+                value = parse_value(field, _read_line(crop, lang), max_marks)
+                if value:
+                    found.update(value)
+                    break
+        if all(f in found for f in wanted):
+            break
+    return found
@@ -0,0 +1,35 @@
+import sys, os
+ROOT = os.path.dirname(os.path.abspath(os.path.join(__file__, '..')))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+from lib.field_ocr import FIELD_LABELS, _label_key, parse_value
+
+
+def _field_for(label):
+    key = _label_key(label)
+    return next((f for f, rx in FIELD_LABELS.items() if rx.match(key)), None)
+
+
+def test_only_cumulative_gpa_labels_are_cgpa():
+    assert [_field_for(l) for l in ('CGPA', 'C.G.P.A.', 'OGPA', 'CPI:')] == ['cgpa'] * 4
+    assert _field_for('SGPA') is None
+    assert _field_for('S.G.P.A') is None
+
+
+def test_total_needs_max_or_known_scale():
+    assert parse_value('total_marks', '24') == {}
+    assert parse_value('total_marks', '489/500') == {'total_marks': 489.0, 'max_marks': 500.0}
+    assert parse_value('total_marks', '489', max_marks=500) == {'total_marks': 489.0}
+    assert parse_value('total_marks', '24', max_marks=500) == {}
+    assert parse_value('total_marks', '512', max_marks=500) == {}
+
+
+def main():
+    for name, fn in sorted(globals().items()):
+        if name.startswith('test_') and callable(fn):
+            fn()
+            print(f"ok  {name}")
+
+
+if __name__ == '__main__':
+    main()
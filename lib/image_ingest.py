@@ -0,0 +1,110 @@
+"""Decode uploaded marksheet images at the resolution OCR needs.
+
+Phone photos arrive at 12 MP or more, often stored sideways with an EXIF
+orientation tag. Decoding them at full size in RGB costs ~36 MB per photo
+before preprocessing starts, and every later stage (deskew, crop, the
+threshold variants) pays for pixels Tesseract does not need.
+load_image() instead:
+
+- lets the JPEG decoder downscale in the DCT domain (Image.draft, 1/2 to
+  1/8) and emit luma only, so no RGB buffer is built;
+- shrinks the rest with Image.reduce (integer box filter) and one final
+  resize to the target size;
+- applies the EXIF orientation to the small image;
+- flattens transparency onto white and maps 16-bit scans to 8 bits, so
+  exactly one grayscale ("L") image leaves this module.
+
+Environment:
+- IMAGE_TARGET_DPI: DPI-equivalent to downscale to, for an A4-sized page
+  filling the frame (default 200; text then sits near preprocess's 28 px
+  glyph target; 0 keeps the native size)
+"""
+import os
+from typing import Optional
+
+from PIL import Image
+
+from lib.document_buffer import DocumentBuffer
+from lib.timing import timed
+
+# Long side of an A4 page in inches
+PAGE_LONG_SIDE_IN = 11.7
+# Only resize when the image is this much larger than the target; preprocess rescales the rest
+RESIZE_SLACK = 1.25
+
+# EXIF Orientation tag and the transpose that undoes each value
+_ORIENTATION = 0x0112
+_TRANSPOSE = {
+    2: Image.Transpose.FLIP_LEFT_RIGHT,
+    3: Image.Transpose.ROTATE_180,
+    4: Image.Transpose.FLIP_TOP_BOTTOM,
+    5: Image.Transpose.TRANSPOSE,
+    6: Image.Transpose.ROTATE_270,
+    7: Image.Transpose.TRANSVERSE,
+    8: Image.Transpose.ROTATE_90,
+}
+
+
+def target_long_side(dpi: Optional[int] = None) -> int:
+    """Target long side in pixels (0: no downscaling)."""
+    if dpi is None:
+        try:
+            dpi = int(float(os.environ.get('IMAGE_TARGET_DPI', '200')))
+        except ValueError:
+            dpi = 200
+    return int(PAGE_LONG_SIDE_IN * dpi) if dpi > 0 else 0
+
+
+def _orientation(img: Image.Image) -> int:
+    try:
+        return int(img.getexif().get(_ORIENTATION) or 1)
+    except Exception:
+        return 1
+
+
+def _to_gray(img: Image.Image) -> Image.Image:
+    """One conversion to 8-bit grayscale, with transparency flattened onto white."""
+    if img.mode == 'L':
+        return img
+    if img.mode in ('I;16', 'I;16B', 'I;16L', 'I'):
+        # 16-bit scans: convert('L') would clip everything above 255 to white
+        return img.convert('I').point(lambda v: v * (1 / 256.0)).convert('L')
+    if img.mode in ('RGBA', 'LA', 'PA') or (img.mode == 'P' and 'transparency' in img.info):
+        rgba = img.convert('RGBA')
+        white = Image.new('RGBA', rgba.size, (255, 255, 255, 255))
+        return Image.alpha_composite(white, rgba).convert('L')
+    return img.convert('L')
+
+
+@timed("image.ingest")
+def load_image(doc: DocumentBuffer, dpi: Optional[int] = None) -> Image.Image:
+    """
+    Decode an image upload as an upright grayscale image near the target size.
+
+    - doc: the uploaded image
+    - dpi: DPI-equivalent to downscale to (default IMAGE_TARGET_DPI)
+    Raises like Image.open() for unreadable input.
+    """
+    img = Image.open(doc.reader())
+    orientation = _orientation(img)
+    target = target_long_side(dpi)
+    w, h = img.size
+    scale = target / max(w, h) if target else 1.0
+    size = (max(1, round(w * scale)), max(1, round(h * scale))) if scale < 1 else img.size
+    if img.format == 'JPEG':
+        # Must precede load(): the decoder scales by up to 1/8 and skips chroma
+        img.draft('L', size)
+    img.load()
+    if img.mode in ('1', 'P') or img.mode.startswith('I;16'):
+        # reduce() does not take these modes; they are cheap to convert first
+        img = _to_gray(img)
+    factor = min(img.width // size[0], img.height // size[1])
+    if factor >= 2:
+        img = img.reduce(factor)
+    img = _to_gray(img)
+    if img.width > size[0] * RESIZE_SLACK:
+        img = img.resize(size, Image.Resampling.LANCZOS)
+    transpose = _TRANSPOSE.get(orientation)
+    if transpose is not None:
+        img = img.transpose(transpose)
+    return img
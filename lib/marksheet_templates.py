@@ -0,0 +1,256 @@
+"""Board-specific marksheet templates.
+
+The generic parser in lib/pdf_parser.py tries every regex it knows against
+the whole document. Marksheets from one board always use the same labels and
+subject table, so classify() scores a handful of header keywords (board
+name, examination title, typical subjects) to pick a template first, and
+extract() then runs only that template's line patterns.
+
+Templates: CBSE class 10, CBSE class 12, state boards (SSC/HSC/SSLC style)
+and university grade cards.
+"""
+import re
+import unicodedata
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Pattern, Tuple
+
+# Minimum keyword score before a template is trusted over the generic parser
+MIN_SCORE = 2
+# Only the top of the document is scored; headers carry the board and exam
+HEADER_CHARS = 2500
+
+_SEP = r"\s*[:\-]\s*"
+_NUM = r"\d{1,4}(?:\.\d+)?"
+
+
+def _rx(*patterns: str) -> Tuple[Pattern, ...]:
+    return tuple(re.compile(p, re.IGNORECASE) for p in patterns)
+
+
+def _kw(*pairs) -> Tuple[Tuple[Pattern, int], ...]:
+    return tuple((re.compile(p, re.IGNORECASE), w) for p, w in pairs)
+
+
+@dataclass(frozen=True)
+class MarksheetTemplate:
+    """
+    - name: reported as `template` in parse results
+    - stage: '10', '12', 'UG', or None when the layout is used for several stages
+    - keywords: (pattern, weight) pairs scored against the document header
+    - fields: field -> line patterns, group 1 is the value (total_marks: obtained, max)
+    - subjects: subject-row patterns with named groups name/marks and optional max/grade
+    - primary: how a bare "Percentage/CGPA" score is read ('percentage' or 'cgpa')
+    - subject_max: max marks for subject rows that do not state one
+    """
+    name: str
+    stage: Optional[str]
+    keywords: Tuple[Tuple[Pattern, int], ...]
+    fields: Dict[str, Tuple[Pattern, ...]]
+    subjects: Tuple[Pattern, ...]
+    primary: str = 'percentage'
+    subject_max: float = 100.0
+
+
+_COMMON_FIELDS = {
+    'name': _rx(rf"^(?:student(?:'s)?\s*name|name of (?:the )?(?:candidate|student)|candidate(?:'s)?\s*name|name){_SEP}(.+)$"),
+    'father_name': _rx(rf"^(?:father(?:'s)?\s*name|guardian(?:'s)?\s*name){_SEP}(.+)$"),
+    'dob': _rx(rf"^(?:date of birth|dob){_SEP}([0-3]?\d[\-/.][0-1]?\d[\-/.][12]\d{{3}}|[0-3]?\d\s+[A-Za-z]{{3,9}}\s+[12]\d{{3}})"),
+    'year': _rx(rf"^(?:year(?: of passing)?|passing year|session|examination year){_SEP}([12]\d{{3}})"),
+    'total_marks': _rx(
+        rf"^(?:grand\s+)?total(?:\s*marks)?(?:\s*obtained)?{_SEP}?({_NUM})\s*(?:/|out of|of)\s*(\d{{1,4}})",
+        rf"^(?:aggregate|marks obtained){_SEP}({_NUM})\s*(?:/|out of|of)\s*(\d{{1,4}})",
+    ),
+    # "Percentage/CGPA - 97.8%" or "... - 8.4 CGPA": unit (or template.primary) decides
+    'score': _rx(rf"^(?:percentage\s*/\s*cgpa|cgpa\s*/\s*percentage){_SEP}({_NUM})\s*(%|cgpa)?"),
+    'percentage': _rx(rf"^(?:percentage|percent|marks percentage|%age){_SEP}(\d{{1,3}}(?:\.\d+)?)\s*%?"),
+}
+
+# "Mathematics - 99/100 [A1]"
+_SLASH_SUBJECT = rf"^(?P<name>[A-Za-z][A-Za-z0-9 .&,()]{{1,60}}?){_SEP}(?P<marks>\d{{1,3}}(?:\.\d+)?)\s*/\s*(?P<max>\d{{1,3}})(?:\s+(?P<grade>[A-Z][12+]?))?$"
+
+CBSE_FIELDS = {
+    **_COMMON_FIELDS,
+    'roll_number': _rx(rf"^roll\s*(?:no\.?|number)?{_SEP}([A-Za-z0-9\-/]+)"),
+    'university': _rx(rf"^(?:board/university|board){_SEP}(.+)$"),
+    'college': _rx(rf"^(?:school(?:\s*name)?|name of (?:the )?school){_SEP}(.+)$"),
+    'exam': _rx(rf"^(?:examination|exam){_SEP}(.+)$",
+                r"^(?:all india )?(secondary school examination|senior school certificate examination)"),
+}
+# "041 MATHEMATICS 080 020 100 ONE HUNDRED A1": code, theory, practical, total, words, grade
+CBSE_SUBJECTS = _rx(
+    _SLASH_SUBJECT,
+    r"^\d{3}\s+(?P<name>[A-Za-z][A-Za-z .&()\-]+?)\s+\d{2,3}\s+\d{2,3}\s+(?P<marks>\d{2,3})\b(?:.*\s(?P<grade>[A-E][12]))?",
+)
+
+STATE_FIELDS = {
+    **_COMMON_FIELDS,
+    'roll_number': _rx(rf"^(?:roll\s*(?:no\.?|number)?|seat\s*(?:no\.?|number)|register\s*(?:no\.?|number)){_SEP}([A-Za-z0-9\-/]+)"),
+    'registration_number': _rx(rf"^(?:registration|reg\.?)\s*(?:no\.?|number){_SEP}([A-Za-z0-9\-/]+)"),
+    'university': _rx(rf"^(?:board/university|board){_SEP}(.+)$"),
+    'college': _rx(rf"^(?:school|college|centre)(?:\s*name)?{_SEP}(.+)$"),
+    'exam': _rx(rf"^(?:examination|exam){_SEP}(.+)$"),
+}
+# "English 100 35 078": subject, max, pass marks, obtained
+STATE_SUBJECTS = _rx(
+    _SLASH_SUBJECT,
+    r"^(?P<name>[A-Za-z][A-Za-z .&()\-]+?)\s+(?P<max>100|80|75|50)\s+(?:\d{2,3}\s+)?(?P<marks>\d{1,3})\b",
+)
+
+UNIVERSITY_FIELDS = {
+    **_COMMON_FIELDS,
+    'roll_number': _rx(rf"^(?:roll\s*(?:no\.?|number)?|enrol(?:l)?ment\s*(?:no\.?|number)){_SEP}([A-Za-z0-9\-/]+)"),
+    'registration_number': _rx(rf"^(?:registration|reg\.?)\s*(?:no\.?|number){_SEP}([A-Za-z0-9\-/]+)"),
+    'university': _rx(rf"^(?:board/university|university){_SEP}(.+)$"),
+    'college': _rx(rf"^(?:college|institute)(?:\s*name)?{_SEP}(.+)$"),
+    'exam': _rx(rf"^(?:programme|program|course|examination){_SEP}(.+)$"),
+    'cgpa': _rx(rf"^(?:cgpa|cumulative grade point average|ogpa){_SEP}(\d{{1,2}}(?:\.\d+)?)"),
+}
+# "CS201 Data Structures 4 A+ 9": optional code, name, credits, grade, grade point
+UNIVERSITY_SUBJECTS = _rx(
+    _SLASH_SUBJECT,
+    r"^(?:[A-Z]{2,5}[- ]?\d{2,4}[A-Z]?\s+)?(?P<name>[A-Za-z][A-Za-z .&()\-]+?)\s+\d(?:\.\d)?\s+(?P<grade>O|A\+|A|B\+|B|C|P|F)\s+(?P<marks>\d{1,2}(?:\.\d+)?)$",
+)
+
+_CBSE = (r"\bcbse\b", 2), (r"central board of secondary education", 3)
+
+TEMPLATES: List[MarksheetTemplate] = [
+    MarksheetTemplate(
+        name='cbse_12', stage='12',
+        keywords=_kw(*_CBSE, (r"senior school certificate", 3), (r"\bclass\s*xii\b", 3), (r"\baissce\b", 3),
+                     (r"\bphysics\b", 1), (r"\bchemistry\b", 1), (r"\baccountancy\b", 1), (r"\bbiology\b", 1)),
+        fields=CBSE_FIELDS, subjects=CBSE_SUBJECTS,
+    ),
+    MarksheetTemplate(
+        name='cbse_10', stage='10',
+        keywords=_kw(*_CBSE, (r"secondary school examination", 3), (r"\bclass\s*x\b", 3), (r"\baisse\b", 3),
+                     (r"\bsocial science\b", 1)),
+        fields=CBSE_FIELDS, subjects=CBSE_SUBJECTS,
+    ),
+    MarksheetTemplate(
+        name='state_board', stage=None,
+        keywords=_kw((r"\bstate board\b", 3), (r"(?<!central )board of (?:secondary|higher secondary|school|intermediate) education", 3),
+                     (r"\bschool examination board\b", 3), (r"\b(?:sslc|hsc|ssc|puc)\b", 2), (r"\bseat\s*no\b", 1)),
+        fields=STATE_FIELDS, subjects=STATE_SUBJECTS,
+    ),
+    MarksheetTemplate(
+        name='university', stage='UG',
+        keywords=_kw((r"\buniversity of\b|\b[a-z]+ university\b", 3), (r"\bgrade (?:card|sheet)\b|\bstatement of grades\b", 3),
+                     (r"\bsemester\b", 1), (r"\bsgpa\b", 1), (r"(?<!percentage/)\bcgpa\b", 1), (r"\bcredits?\b", 1)),
+        fields=UNIVERSITY_FIELDS, subjects=UNIVERSITY_SUBJECTS, primary='cgpa', subject_max=10.0,
+    ),
+]
+
+# Subject rows never start with these labels
+_NOT_SUBJECTS = ('name', 'roll', 'enrol', 'reg', 'date', 'exam', 'course', 'program', 'university', 'board',
+                 'college', 'institute', 'school', 'total', 'grand', 'aggregate', 'percentage', 'cgpa', 'sgpa',
+                 'result', 'year', 'seat')
+
+
+def normalize_lines(text: str) -> List[str]:
+    """NFKC-normalized, dash/space-folded non-empty lines (line breaks are kept)."""
+    s = unicodedata.normalize('NFKC', text or '')
+    s = s.replace('\u2013', '-').replace('\u2014', '-').replace('\u2212', '-')
+    s = s.replace('\u00A0', ' ').replace('\u2009', ' ')
+    lines = []
+    for line in s.splitlines():
+        line = re.sub(r"\s+/\s+", "/", line)
+        line = re.sub(r"\s+", " ", line).strip()
+        if line:
+            lines.append(line)
+    return lines
+
+
+def get_template(name: str) -> Optional[MarksheetTemplate]:
+    return next((t for t in TEMPLATES if t.name == name), None)
+
+
+def score(template: MarksheetTemplate, header: str) -> int:
+    return sum(w for p, w in template.keywords if p.search(header))
+
+
+def classify(text: str, min_score: int = MIN_SCORE) -> Optional[MarksheetTemplate]:
+    """Best-scoring template for the document header, or None below min_score (ties keep TEMPLATES order)."""
+    header = ' '.join(normalize_lines((text or '')[:HEADER_CHARS]))
+    best, best_score = None, min_score - 1
+    for template in TEMPLATES:
+        s = score(template, header)
+        if s > best_score:
+            best, best_score = template, s
+    return best
+
+
+def _first(patterns, lines) -> Optional[re.Match]:
+    for p in patterns:
+        for line in lines:
+            m = p.search(line)
+            if m:
+                return m
+    return None
+
+
+def _subjects(template: MarksheetTemplate, lines: List[str]) -> List[dict]:
+    subjects, seen = [], set()
+    for line in lines:
+        if line.lower().startswith(_NOT_SUBJECTS):
+            continue
+        for p in template.subjects:
+            m = p.match(line)
+            if not m:
+                continue
+            name = m.group('name').strip()
+            key = name.lower()
+            if key not in seen:
+                seen.add(key)
+                groups = m.groupdict()
+                subjects.append({
+                    'name': name,
+                    'marks': float(groups['marks']),
+                    'max': float(groups['max']) if groups.get('max') else template.subject_max,
+                    'grade': groups.get('grade') or None,
+                })
+            break
+    return subjects
+
+
+def extract(template: MarksheetTemplate, text: str) -> dict:
+    """
+    Run one template's patterns over the document lines.
+
+    Returns the raw marksheet fields (missing ones are None); lib.pdf_parser
+    derives calculated_percentage and the summary keys from them.
+    """
+    lines = normalize_lines(text)
+    out = {}
+    for field in ('name', 'father_name', 'roll_number', 'registration_number', 'dob', 'exam', 'year', 'university', 'college'):
+        m = _first(template.fields.get(field, ()), lines)
+        out[field] = m.group(1).strip() if m else None
+
+    percentage = cgpa = None
+    m = _first(template.fields.get('percentage', ()), lines)
+    if m:
+        percentage = float(m.group(1))
+    m = _first(template.fields.get('cgpa', ()), lines)
+    if m:
+        cgpa = float(m.group(1))
+    m = _first(template.fields.get('score', ()), lines)
+    if m:
+        value, unit = float(m.group(1)), (m.group(2) or '').lower()
+        as_cgpa = unit == 'cgpa' or (not unit and template.primary == 'cgpa' and value <= 10)
+        if as_cgpa and cgpa is None:
+            cgpa = value
+        elif not as_cgpa and percentage is None:
+            percentage = value
+
+    total_marks = max_marks = None
+    m = _first(template.fields.get('total_marks', ()), lines)
+    if m:
+        total_marks, max_marks = float(m.group(1)), float(m.group(2))
+
+    out.update({
+        'percentage': percentage,
+        'cgpa': cgpa,
+        'total_marks': total_marks,
+        'max_marks': max_marks,
+        'subjects': _subjects(template, lines),
+    })
+    return out
@@ -0,0 +1,294 @@
+"""Client for OCR worker processes (lib/ocr_worker.py).
+
+OCRClient keeps a small pool of persistent connections per worker address
+and spreads calls round-robin over the addresses, so OCR capacity grows by
+starting more workers (locally or on other nodes) without touching the web
+tier. RemoteParser mirrors the lib/pdf_parser functions the controllers
+use; lib.ocr_loader.get_parser() returns one when OCR_WORKER_ADDRESS is set.
+
+Environment:
+- OCR_WORKER_ADDRESS: comma-separated worker addresses (see lib/ocr_rpc.py)
+- OCR_WORKER_TIMEOUT: seconds to wait for one document (default 120)
+- OCR_WORKER_POOL_SIZE: idle connections kept per address (default 4)
+- OCR_WORKER_TOKEN: shared token, if the workers require one
+"""
+import itertools
+import logging
+import os
+import socket
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from lib import deadline, timing
+from lib.document_buffer import DocumentBuffer
+from lib.ocr_rpc import RPCError, parse_address, recv_frame, send_frame
+
+logger = logging.getLogger(__name__)
+
+CONNECT_TIMEOUT = 2.0
+# Extra wait past the request budget for the worker to wind down and reply
+BUDGET_GRACE = 5.0
+
+
+class OCRWorkerError(RuntimeError):
+    """The worker could not be reached or reported a failure."""
+
+
+class OCRClient:
+    """
+    Pooled connections to one or more OCR workers.
+
+    - addresses: worker addresses, tried round-robin; an unreachable one is skipped
+    - timeout: seconds a single call may take (a timed-out call is not retried)
+    - pool_size: idle connections kept per address
+    """
+
+    def __init__(self, addresses: List[str], timeout: float = 120.0, pool_size: int = 4,
+                 token: Optional[str] = None, connect_timeout: float = CONNECT_TIMEOUT):
+        if not addresses:
+            raise ValueError('at least one OCR worker address is required')
+        self.addresses = list(addresses)
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.token = token
+        self.connect_timeout = connect_timeout
+        self._idle = {a: deque() for a in self.addresses}
+        self._lock = threading.Lock()
+        self._next = itertools.cycle(range(len(self.addresses)))
+
+    @classmethod
+    def from_env(cls) -> 'OCRClient':
+        addresses = [a.strip() for a in os.environ.get('OCR_WORKER_ADDRESS', '').split(',') if a.strip()]
+        return cls(addresses,
+                   timeout=float(os.environ.get('OCR_WORKER_TIMEOUT', '120')),
+                   pool_size=int(os.environ.get('OCR_WORKER_POOL_SIZE', '4')),
+                   token=os.environ.get('OCR_WORKER_TOKEN') or None)
+
+    def _connect(self, address: str) -> socket.socket:
+        family, sockaddr = parse_address(address)
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(self.connect_timeout)
+            sock.connect(sockaddr)
+            if family != socket.AF_UNIX:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+    def _acquire(self, address: str):
+        """(socket, reused) from the idle pool, or a new connection."""
+        with self._lock:
+            idle = self._idle[address]
+            if idle:
+                return idle.pop(), True
+        return self._connect(address), False
+
+    def _release(self, address: str, sock: socket.socket) -> None:
+        with self._lock:
+            idle = self._idle[address]
+            if len(idle) < self.pool_size:
+                idle.append(sock)
+                return
+        sock.close()
+
+    def _order(self) -> List[str]:
+        with self._lock:
+            start = next(self._next)
+        return self.addresses[start:] + self.addresses[:start]
+
+    def _roundtrip(self, address: str, header: dict, body, timeout: float) -> dict:
+        sock, reused = self._acquire(address)
+        try:
+            sock.settimeout(timeout)
+            try:
+                send_frame(sock, header, body)
+                response, _ = recv_frame(sock)
+            except (EOFError, BrokenPipeError, ConnectionResetError):
+                if not reused:
+                    raise
+                # The worker closed an idle pooled connection (restart); one retry on a fresh one
+                sock.close()
+                sock = self._connect(address)
+                sock.settimeout(timeout)
+                send_frame(sock, header, body)
+                response, _ = recv_frame(sock)
+        except BaseException:
+            sock.close()
+            raise
+        self._release(address, sock)
+        return response
+
+    def call(self, op: str, document: Optional[DocumentBuffer] = None, **kwargs):
+        """
+        Run `op` on a worker and return its result; raises OCRWorkerError.
+
+        The request's lib.deadline budget is forwarded, and bounds the wait.
+        """
+        budget = deadline.current()
+        if not budget.proceed(op):
+            raise OCRWorkerError('request time budget exhausted')
+        timeout = self.timeout
+        header = {'op': op, 'kwargs': kwargs}
+        left = budget.remaining()
+        if left is not None or budget.pages_left is not None:
+            header['budget'] = {'seconds': left, 'pages': budget.pages_left}
+            if left is not None:
+                timeout = min(timeout, left + BUDGET_GRACE)
+        if document is not None and document.name:
+            header['name'] = document.name
+        if self.token:
+            header['token'] = self.token
+        body = document.view if document is not None else b''
+        errors = []
+        with timing.stage('ocr.rpc'):
+            for address in self._order():
+                try:
+                    response = self._roundtrip(address, header, body, timeout)
+                    break
+                except socket.timeout:
+                    raise OCRWorkerError(f'OCR worker {address} timed out after {timeout:g}s')
+                except (OSError, EOFError, RPCError) as e:
+                    logger.warning('OCR worker %s unavailable: %s', address, e)
+                    errors.append(f'{address}: {e}')
+            else:
+                raise OCRWorkerError('no OCR worker reachable (' + '; '.join(errors) + ')')
+        # Worker-side stages show up in this request's Server-Timing
+        entries = timing.current_collection()
+        if entries is not None:
+            entries.extend((name, seconds) for name, seconds in response.get('stages') or ())
+        remote = response.get('budget') or {}
+        for reason in remote.get('reasons') or ():
+            budget.truncate(reason)
+        if budget.pages_left is not None and remote.get('pages') is not None:
+            budget.pages_left = min(budget.pages_left, remote['pages'])
+        if not response.get('ok'):
+            raise OCRWorkerError(response.get('error') or 'OCR worker failed')
+        return response.get('result')
+
+    def ping(self) -> bool:
+        try:
+            return self.call('ping') == 'pong'
+        except OCRWorkerError:
+            return False
+
+    def prime(self) -> Dict[str, int]:
+        """
+        Open the idle pool ahead of traffic: up to pool_size pinged connections per address.
+
+        Returns address -> connections now ready (0 for an unreachable worker).
+        """
+        ready = {}
+        header = {'op': 'ping', 'token': self.token} if self.token else {'op': 'ping'}
+        for address in self.addresses:
+            with self._lock:
+                missing = self.pool_size - len(self._idle[address])
+            opened = []
+            for _ in range(missing):
+                sock = None
+                try:
+                    sock = self._connect(address)
+                    sock.settimeout(self.connect_timeout)
+                    send_frame(sock, header)
+                    response = recv_frame(sock)[0]
+                except (OSError, EOFError, RPCError) as e:
+                    logger.warning('OCR worker %s unavailable: %s', address, e)
+                    response = None
+                if not (response and response.get('ok')):
+                    if sock is not None:
+                        sock.close()
+                    if response:
+                        logger.warning('OCR worker %s refused ping: %s', address, response.get('error'))
+                    break
+                opened.append(sock)
+            for sock in opened:
+                self._release(address, sock)
+            with self._lock:
+                ready[address] = len(self._idle[address])
+        return ready
+
+    def close(self) -> None:
+        with self._lock:
+            for idle in self._idle.values():
+                while idle:
+                    idle.pop().close()
+
+
+@contextmanager
+def _as_document(input_obj):
+    doc = DocumentBuffer.wrap(input_obj)
+    try:
+        yield doc
+    finally:
+        if doc is not input_obj:
+            doc.close()
+
+
+class RemoteParser:
+    """
+    Stand-in for lib.pdf_parser that runs each call on an OCR worker.
+
+    Failures come back in the shapes the local functions use for errors
+    (an 'error' key, an explanatory string, {}), so controllers need no
+    remote-specific handling.
+    """
+
+    def __init__(self, client: OCRClient):
+        self.client = client
+
+    @classmethod
+    def from_env(cls) -> 'RemoteParser':
+        return cls(OCRClient.from_env())
+
+    def _call(self, op: str, input_obj, **kwargs):
+        with _as_document(input_obj) as doc:
+            return self.client.call(op, doc, **kwargs)
+
+    def extract_marksheet_fields(self, input_obj, dpi: int = 300, ocr_lang: str = "eng", method: str = "auto") -> dict:
+        try:
+            return self._call('extract_marksheet_fields', input_obj, dpi=dpi, ocr_lang=ocr_lang, method=method)
+        except OCRWorkerError as e:
+            return {"error": f"OCR worker error: {e}"}
+
+    def extract_marksheet_fields_from_image(self, input_obj, ocr_lang: str = "eng") -> dict:
+        try:
+            return self._call('extract_marksheet_fields_from_image', input_obj, ocr_lang=ocr_lang)
+        except OCRWorkerError as e:
+            return {"error": f"OCR worker error: {e}"}
+
+    def extract_numeric_fields(self, input_obj, fields=None, dpi: int = 300, ocr_lang: str = "eng",
+                               max_marks=None) -> dict:
+        kwargs = {'dpi': dpi, 'ocr_lang': ocr_lang}
+        if fields is not None:
+            kwargs['fields'] = list(fields)
+        if max_marks is not None:
+            kwargs['max_marks'] = max_marks
+        try:
+            return self._call('extract_numeric_fields', input_obj, **kwargs)
+        except OCRWorkerError:
+            return {}
+
+    def parse_pdf(self, input_obj, dpi: int = 300, ocr_lang: str = "eng", method: str = "auto") -> str:
+        try:
+            return self._call('parse_pdf', input_obj, dpi=dpi, ocr_lang=ocr_lang, method=method)
+        except OCRWorkerError as e:
+            return f"OCR worker error: {e}"
+
+    def extract_text_from_pdf(self, input_obj, dpi: int = 300, ocr_lang: str = "eng", method: str = "auto") -> str:
+        return self.parse_pdf(input_obj, dpi=dpi, ocr_lang=ocr_lang, method=method)
+
+    def extract_text_with_info(self, input_obj, dpi: int = 300, ocr_lang: str = "eng", method: str = "auto") -> dict:
+        try:
+            return self._call('extract_text_with_info', input_obj, dpi=dpi, ocr_lang=ocr_lang, method=method)
+        except OCRWorkerError as e:
+            return {"text": "", "decided_method": "none", "ocr_available": False, "warnings": [f"OCR worker error: {e}"]}
+
+    def probe_ocr_environment(self, refresh: bool = False) -> dict:
+        try:
+            caps = self.client.call('probe_ocr_environment', refresh=refresh)
+        except OCRWorkerError as e:
+            return {"ocr_available": False, "error": str(e), "workers": self.client.addresses}
+        return {**caps, "workers": self.client.addresses}
@@ -0,0 +1,151 @@
+"""Per-field confidence for parsed marksheets.
+
+A value is trusted when Tesseract was sure of the word it came from and the
+independent ways of reading it agree: percentage against total/max marks,
+total marks against the subject rows, and (for images) the OCR variants
+that contain the same number. Text-layer values need no recognition and
+start at 1.0.
+
+verify_academic uses this to tell an OCR misread (low confidence, worth a
+fallback pass) from a user who entered a different number (high confidence,
+no second pass).
+"""
+import os
+import re
+from typing import Dict, Iterable, List, Optional
+
+SCORED_FIELDS = ('percentage', 'cgpa', 'total_marks')
+
+# verify_academic re-reads a mismatching value only below this confidence
+FALLBACK_CONFIDENCE = float(os.environ.get('OCR_FALLBACK_CONFIDENCE', '0.85'))
+# Confidence for a value whose word could not be found in the OCR output
+UNMATCHED_WORD = 0.5
+# Cross-check tolerance (percentage points / marks)
+AGREEMENT_TOLERANCE = 0.5
+
+
+def _number_pattern(tokens: Iterable[str]):
+    """Match any token not embedded in a longer number ('97.8' but not '197.85')."""
+    return re.compile(r'(?<![\d.])(?:' + '|'.join(re.escape(t) for t in tokens) + r')(?!\d)(?!\.\d)')
+
+
+class WordConfidences:
+    """
+    Tesseract word confidences (0-100) collected while OCR'ing one document.
+
+    - ocr_only: every page came from OCR (no text layer to fall back on)
+    """
+
+    def __init__(self):
+        self._words = {}
+        self.ocr_only = False
+
+    def __bool__(self) -> bool:
+        return bool(self._words)
+
+    def add(self, data: dict) -> None:
+        """Record the words of one image_to_data result (best confidence per word)."""
+        for text, conf in zip(data.get('text') or [], data.get('conf') or []):
+            text = (text or '').strip()
+            try:
+                conf = float(conf)
+            except (TypeError, ValueError):
+                continue
+            if text and conf >= 0 and conf > self._words.get(text, -1):
+                self._words[text] = conf
+
+    def lookup(self, tokens: Iterable[str]) -> Optional[float]:
+        """Best confidence (0-1) of an OCR word containing any token as a whole number, or None."""
+        pattern = _number_pattern(tokens)
+        best = None
+        for word, conf in self._words.items():
+            if pattern.search(word):
+                best = conf if best is None else max(best, conf)
+        return None if best is None else best / 100.0
+
+
+def text_from_data(data: dict) -> str:
+    """Rebuild image_to_string-style text (lines, blank line between blocks) from image_to_data output."""
+    lines, current, key, block = [], [], None, None
+    for i, text in enumerate(data.get('text') or []):
+        text = (text or '').strip()
+        if not text:
+            continue
+        line_key = (data['block_num'][i], data['par_num'][i], data['line_num'][i])
+        if line_key != key and current:
+            lines.append(' '.join(current))
+            current = []
+            if data['block_num'][i] != block:
+                lines.append('')
+        key, block = line_key, data['block_num'][i]
+        current.append(text)
+    if current:
+        lines.append(' '.join(current))
+    return '\n'.join(lines)
+
+
+def value_tokens(value: float) -> List[str]:
+    """How a number can appear in OCR text ('97.8', '97.80'; '489' for 489.0)."""
+    if float(value).is_integer():
+        return [str(int(value))]
+    return sorted({f'{value:g}', f'{value:.2f}', f'{value:.1f}'}, key=len)
+
+
+def _agreement(checks: List[float]) -> float:
+    return sum(checks) / len(checks) if checks else 1.0
+
+
+def _recognition(value: float, words: Optional[WordConfidences]) -> float:
+    if not words:
+        return 1.0
+    conf = words.lookup(value_tokens(value))
+    if conf is not None:
+        return conf
+    # Not an OCR word: it came from a page's text layer unless every page was OCR'd
+    return UNMATCHED_WORD if words.ocr_only else 1.0
+
+
+def _variant_share(value: float, texts: List[str]) -> float:
+    pattern = _number_pattern(value_tokens(value))
+    return sum(1 for t in texts if pattern.search(t)) / len(texts)
+
+
+def field_confidence(fields: dict, words: Optional[WordConfidences] = None, variants: Optional[List[str]] = None) -> Dict[str, float]:
+    """
+    Confidence in [0, 1] for each scored field that was read, plus calculated_percentage.
+
+    Recognition confidence (Tesseract's, or 1.0 for text-layer values) is
+    scaled by extractor agreement: 1.0 when every cross-check agrees, down
+    to half when none do.
+    - words: word confidences from the OCR passes (None for text-layer parses)
+    - variants: the individual OCR outputs of a multi-variant image parse
+    """
+    percentage, cgpa = fields.get('percentage'), fields.get('cgpa')
+    total, maximum = fields.get('total_marks'), fields.get('max_marks')
+    subjects = [s for s in fields.get('subjects') or [] if isinstance(s.get('marks'), (int, float))]
+
+    checks = {f: [] for f in SCORED_FIELDS}
+    if percentage is not None and total and maximum:
+        ok = abs(percentage - total / maximum * 100.0) <= AGREEMENT_TOLERANCE
+        checks['percentage'].append(float(ok))
+        checks['total_marks'].append(float(ok))
+    if total is not None and len(subjects) >= 2:
+        checks['total_marks'].append(float(abs(total - sum(s['marks'] for s in subjects)) <= AGREEMENT_TOLERANCE))
+    if variants:
+        for f, value in (('percentage', percentage), ('cgpa', cgpa), ('total_marks', total)):
+            if value is not None:
+                checks[f].append(_variant_share(value, variants))
+
+    out = {}
+    for f, value in (('percentage', percentage), ('cgpa', cgpa), ('total_marks', total)):
+        if value is None:
+            continue
+        recog = _recognition(value, words)
+        if f == 'total_marks' and maximum:
+            recog = min(recog, _recognition(maximum, words))
+        out[f] = round(recog * (0.5 + 0.5 * _agreement(checks[f])), 3)
+    # calculated_percentage comes from the first of these that was read
+    source = next((f for f in SCORED_FIELDS if f in out), None)
+    if source:
+        out['calculated_percentage'] = out[source]
+    return out
@@ -0,0 +1,103 @@
+"""Lazy access to the OCR/PDF parsing stack.
+
+Importing lib.pdf_parser pulls in PIL, cv2, pytesseract and pdf2image. Web
+workers that only serve pages and the exam catalogue should never pay for
+that, so controllers go through get_parser() which imports on first use.
+With OCR_WORKER_ADDRESS set, get_parser() returns a lib.ocr_client proxy
+instead and the parsing runs in separate OCR worker processes.
+"""
+import contextvars
+import importlib
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional
+
+_parser = None
+_local = None
+_lock = threading.Lock()
+_executor = None
+
+
+def local_parser():
+    """Return the lib.pdf_parser module, importing it on first call."""
+    global _local
+    if _local is None:
+        with _lock:
+            if _local is None:
+                _local = importlib.import_module('lib.pdf_parser')
+    return _local
+
+
+def get_parser():
+    """Parser used by controllers: a remote OCR worker proxy when OCR_WORKER_ADDRESS is set, else lib.pdf_parser."""
+    global _parser
+    if _parser is None:
+        if os.environ.get('OCR_WORKER_ADDRESS'):
+            with _lock:
+                if _parser is None:
+                    _parser = importlib.import_module('lib.ocr_client').RemoteParser.from_env()
+        else:
+            _parser = local_parser()
+    return _parser
+
+
+def is_loaded() -> bool:
+    """Whether the OCR stack has already been imported in this process."""
+    return _local is not None
+
+
+def capabilities(refresh: bool = False) -> Optional[dict]:
+    """
+    OCR capability probe, without importing the OCR stack just to report it.
+
+    Returns None while lib.pdf_parser has not been loaded in this process
+    (and no remote workers are configured), unless refresh asks for a probe.
+    """
+    if refresh or is_loaded() or os.environ.get('OCR_WORKER_ADDRESS'):
+        return get_parser().probe_ocr_environment(refresh=refresh)
+    return None
+
+
+def warm_up() -> dict:
+    """Preload and exercise the OCR stack (see lib.ocr_warmup); returns the warm-up report."""
+    return importlib.import_module('lib.ocr_warmup').warm_up()
+
+
+def pool_size() -> int:
+    """Threads in the extraction pool: OCR_POOL_SIZE, else min(4, CPU count)."""
+    try:
+        size = int(os.environ.get('OCR_POOL_SIZE', '0'))
+    except ValueError:
+        size = 0
+    return size if size > 0 else min(4, os.cpu_count() or 1)
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Shared worker pool for document extraction (size from OCR_POOL_SIZE)."""
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=pool_size(), thread_name_prefix='ocr')
+    return _executor
+
+
+def submit(fn, *args, **kwargs) -> Future:
+    """Run fn on the worker pool in a copy of the caller's context (keeps request timings)."""
+    ctx = contextvars.copy_context()
+    return get_executor().submit(ctx.run, fn, *args, **kwargs)
+
+
+def _after_fork_in_child() -> None:
+    # Pool threads and pooled worker sockets belong to the parent (e.g. a gunicorn
+    # master with preload_app); the child starts its own. The imported modules stay.
+    global _executor, _parser, _lock
+    _lock = threading.Lock()
+    _executor = None
+    if _parser is not None and _parser is not _local:
+        _parser.client.close()
+        _parser = None
+
+
+os.register_at_fork(after_in_child=_after_fork_in_child)
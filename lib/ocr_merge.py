@@ -0,0 +1,146 @@
+"""Merge the OCR outputs of several image variants into one text.
+
+The image path OCRs up to 20 variants (threshold/blur/psm combinations) of
+the same marksheet. Concatenated, they make the parser scan 20 copies of
+every line and report every subject once per variant. merge_variants()
+aligns lines across variants instead: lines with the same letters (label
+skeleton), or close fuzzy matches, form one cluster, the most common
+reading of each token wins the vote, and clusters seen in too few variants
+are dropped as noise. Clusters keep their median position on the page.
+"""
+import re
+import statistics
+from collections import Counter
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional
+
+from lib.timing import timed
+
+# Skeleton similarity for two lines to be the same line read differently
+SIMILARITY = 0.8
+# Whole-line similarity also required for a fuzzy (non-identical skeleton) match
+LINE_SIMILARITY = 0.6
+# Skeletons shorter than this are too generic to match on alone
+MIN_SKELETON = 3
+
+# Lines without two adjacent letters/digits are speckle or rule lines, never content
+_WORDLIKE = re.compile(r'[A-Za-z0-9]{2}')
+
+
+class _Cluster:
+    __slots__ = ('votes', 'variants', 'positions')
+
+    def __init__(self):
+        self.votes = Counter()
+        self.variants = set()
+        self.positions = []
+
+    def best(self) -> str:
+        """Most common exact reading (cheap; used while clustering)."""
+        return self.votes.most_common(1)[0][0]
+
+    def voted(self) -> str:
+        """
+        Token-by-token vote over the readings with the most common token count.
+
+        Noisy variants rarely misread the same character, so this recovers the
+        clean line even when no two readings are identical.
+        """
+        readings = [(line.split(' '), n) for line, n in self.votes.items()]
+        lengths = Counter()
+        for tokens, n in readings:
+            lengths[len(tokens)] += n
+        size = lengths.most_common(1)[0][0]
+        columns = [Counter() for _ in range(size)]
+        for tokens, n in readings:
+            if len(tokens) == size:
+                for column, token in zip(columns, tokens):
+                    column[token] += n
+        return ' '.join(c.most_common(1)[0][0] for c in columns)
+
+
+def _normalize(line: str) -> str:
+    return re.sub(r'\s+', ' ', line).strip()
+
+
+def _skeleton(line: str) -> str:
+    """Letters only, lowercased: what stays stable when digits or spacing are misread."""
+    return re.sub(r'[^a-z]', '', line.lower())
+
+
+def _similar(a: str, b: str, cutoff: float) -> bool:
+    # Length bound first: it rules out most pairs without building a matcher
+    if 2.0 * min(len(a), len(b)) / ((len(a) + len(b)) or 1) < cutoff:
+        return False
+    m = SequenceMatcher(None, a, b, autojunk=False)
+    return m.real_quick_ratio() >= cutoff and m.quick_ratio() >= cutoff and m.ratio() >= cutoff
+
+
+def _free(candidates, vi: int) -> Optional[_Cluster]:
+    """First candidate cluster without a line from variant vi yet."""
+    for c in candidates:
+        if vi not in c.variants:
+            return c
+    return None
+
+
+def _fuzzy_match(clusters: List[_Cluster], line: str, skeleton: str, vi: int) -> Optional[_Cluster]:
+    """First cluster free for variant vi whose current majority reading is close to line."""
+    for c in clusters:
+        if vi in c.variants:
+            continue
+        best = c.best()
+        other = _skeleton(best)
+        if len(skeleton) >= MIN_SKELETON and len(other) >= MIN_SKELETON:
+            if _similar(skeleton, other, SIMILARITY) and _similar(line, best, LINE_SIMILARITY):
+                return c
+        elif not skeleton and not other and _similar(line, best, SIMILARITY):
+            return c
+    return None
+
+
+@timed("ocr.merge")
+def merge_variants(texts: List[str], min_support: Optional[int] = None) -> str:
+    """
+    One voted, deduplicated text from several OCR readings of the same page.
+
+    - min_support: variants a line must appear in to be kept (default 2 with
+      three or more variants, else 1)
+    """
+    texts = [t for t in texts if t and t.strip()]
+    if len(texts) <= 1:
+        return texts[0].strip() if texts else ''
+    if min_support is None:
+        min_support = 2 if len(texts) >= 3 else 1
+
+    clusters: List[_Cluster] = []
+    # A cluster holds at most one line per variant: rows that share their letters
+    # ("Term 1 Marks 85" / "Term 2 Marks 90") stay separate clusters
+    by_line: Dict[str, List[_Cluster]] = {}
+    by_skeleton: Dict[str, List[_Cluster]] = {}
+    for vi, text in enumerate(texts):
+        lines = [l for l in (_normalize(l) for l in text.splitlines()) if _WORDLIKE.search(l)]
+        for li, line in enumerate(lines):
+            skeleton = _skeleton(line)
+            cluster = _free(by_line.get(line, ()), vi)
+            if cluster is None and len(skeleton) >= MIN_SKELETON:
+                cluster = _free(by_skeleton.get(skeleton, ()), vi)
+            if cluster is None:
+                cluster = _fuzzy_match(clusters, line, skeleton, vi)
+            if cluster is None:
+                cluster = _Cluster()
+                clusters.append(cluster)
+            same_line = by_line.setdefault(line, [])
+            if cluster not in same_line:
+                same_line.append(cluster)
+            if len(skeleton) >= MIN_SKELETON:
+                same_skeleton = by_skeleton.setdefault(skeleton, [])
+                if cluster not in same_skeleton:
+                    same_skeleton.append(cluster)
+            cluster.votes[line] += 1
+            cluster.variants.add(vi)
+            cluster.positions.append(li / len(lines))
+
+    kept = [c for c in clusters if len(c.variants) >= min_support]
+    kept.sort(key=lambda c: statistics.median(c.positions))
+    return '\n'.join(c.voted() for c in kept)
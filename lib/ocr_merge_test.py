@@ -0,0 +1,39 @@
+import sys, os
+ROOT = os.path.dirname(os.path.abspath(os.path.join(__file__, '..')))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+from lib.ocr_merge import merge_variants
+
+
+def test_repeated_skeleton_rows_are_kept():
+    # Term/semester rows differ only in digits; each must survive the merge
+    page = "Term 1 Marks 85\nTerm 2 Marks 90\nTerm 3 Marks 78"
+    assert merge_variants([page] * 3).splitlines() == page.splitlines()
+
+
+def test_repeated_rows_vote_per_row():
+    clean = "Semester I SGPA 8.1\nSemester II SGPA 8.4"
+    noisy = "Semester I SGPA 8.l\nSemester II SGPA 8.4"
+    assert merge_variants([clean, noisy, clean]).splitlines() == clean.splitlines()
+
+
+def test_variants_are_deduplicated():
+    page = "Mathematics 95\nScience 91\nEnglish 88"
+    misread = "Mathematics 95\nSc1ence 91\nEnglish 88"
+    assert merge_variants([page, page, misread, page]).splitlines() == page.splitlines()
+
+
+def test_single_variant_noise_is_dropped():
+    page = "Mathematics 95\nScience 91"
+    assert merge_variants([page, page, page + "\nxq zv kk"]).splitlines() == page.splitlines()
+
+
+def main():
+    for name, fn in sorted(globals().items()):
+        if name.startswith('test_') and callable(fn):
+            fn()
+            print(f"ok  {name}")
+
+
+if __name__ == '__main__':
+    main()
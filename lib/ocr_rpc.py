@@ -0,0 +1,87 @@
+"""Length-prefixed framing shared by lib/ocr_worker.py and lib/ocr_client.py.
+
+One frame is:
+
+    4 bytes   big-endian header length
+    N bytes   UTF-8 JSON header ({"op", "kwargs", ...} or {"ok", "result", ...})
+    8 bytes   big-endian body length
+    M bytes   raw body (the document for requests, empty for responses)
+
+Documents travel as the raw body, so there is no base64 and no copy beyond
+the socket buffers. Addresses are "unix:/path/to.sock" (or a bare path) for
+a local worker, and "host:port" or "tcp://host:port" for TCP.
+"""
+import json
+import socket
+import struct
+from typing import Tuple, Union
+
+_HEADER = struct.Struct('>I')
+_BODY = struct.Struct('>Q')
+
+MAX_HEADER_BYTES = 1 << 20
+# Fits the largest chunked upload (MAX_CHUNKED_UPLOAD_SIZE) with room to spare
+MAX_BODY_BYTES = 64 << 20
+
+
+class RPCError(Exception):
+    """Malformed frame or connection closed mid-frame."""
+
+
+def parse_address(address: str) -> Tuple[int, Union[str, Tuple[str, int]]]:
+    """(socket family, sockaddr) for a worker address."""
+    address = address.strip()
+    if address.startswith('unix:'):
+        return socket.AF_UNIX, address[len('unix:'):]
+    if address.startswith('/'):
+        return socket.AF_UNIX, address
+    if address.startswith('tcp://'):
+        address = address[len('tcp://'):]
+    host, _, port = address.rpartition(':')
+    if not host or not port.isdigit():
+        raise ValueError(f'Invalid OCR worker address: {address!r}')
+    return socket.AF_INET, (host.strip('[]'), int(port))
+
+
+def send_frame(sock: socket.socket, header: dict, body=b'') -> None:
+    head = json.dumps(header, separators=(',', ':')).encode('utf-8')
+    body = memoryview(body)
+    sock.sendall(_HEADER.pack(len(head)) + head + _BODY.pack(body.nbytes))
+    if body.nbytes:
+        sock.sendall(body)
+
+
+def _recv_exact(sock: socket.socket, n: int) -> bytearray:
+    buf = bytearray(n)
+    view = memoryview(buf)
+    got = 0
+    while got < n:
+        k = sock.recv_into(view[got:], n - got)
+        if not k:
+            raise RPCError('connection closed mid-frame')
+        got += k
+    return buf
+
+
+def recv_frame(sock: socket.socket) -> Tuple[dict, bytearray]:
+    """
+    Read one frame as (header, body).
+
+    Raises EOFError when the peer closed the connection between frames.
+    """
+    first = sock.recv(_HEADER.size, socket.MSG_WAITALL)
+    if not first:
+        raise EOFError
+    if len(first) < _HEADER.size:
+        first += _recv_exact(sock, _HEADER.size - len(first))
+    (head_len,) = _HEADER.unpack(first)
+    if head_len > MAX_HEADER_BYTES:
+        raise RPCError(f'header too large ({head_len} bytes)')
+    try:
+        header = json.loads(_recv_exact(sock, head_len).decode('utf-8'))
+    except ValueError as e:
+        raise RPCError(f'invalid header: {e}')
+    (body_len,) = _BODY.unpack(_recv_exact(sock, _BODY.size))
+    if body_len > MAX_BODY_BYTES:
+        raise RPCError(f'body too large ({body_len} bytes)')
+    return header, (_recv_exact(sock, body_len) if body_len else bytearray())
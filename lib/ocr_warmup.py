@@ -0,0 +1,132 @@
+"""Warm the OCR stack before a worker takes its first request.
+
+Without this, the first marksheet request in each web or OCR worker
+imports cv2/PIL/pytesseract, probes the binaries, starts the OCR thread
+pool, launches Tesseract cold (loading eng.traineddata from disk) and
+compiles the parser regexes, all while the user waits. warm_up() does that
+work up front:
+
+- imports the stack and probes Tesseract/Poppler (lib.ocr_loader);
+- starts every thread of the OCR pool (OCR_POOL_SIZE) so none is spawned
+  on demand;
+- pushes a tiny generated marksheet through the real pipeline (text layer,
+  rasterize, preprocess, Tesseract, marksheet parse) once per language in
+  OCR_WARMUP_LANGS, from a pool thread, like a request would;
+- with OCR_WORKER_ADDRESS set, opens and pings the pooled connections to
+  the OCR workers instead of the dummy run (the workers warm themselves).
+
+It runs once per process: call it from gunicorn's post_fork
+(gunicorn.conf.py), the OCR worker's startup, OCR_PRELOAD=true, or
+`flask --app app warm-ocr`. A forked child re-runs it, because the pool
+threads and sockets stay with the parent.
+
+Environment:
+- OCR_WARMUP_LANGS: comma-separated Tesseract languages to warm (default "eng")
+"""
+import io
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from lib import ocr_loader
+
+logger = logging.getLogger(__name__)
+
+# A tiny page that still drives template classification and the score regexes
+DUMMY_LINES = ("Secondary School Examination", "Marks Statement", "Total 450/500", "Percentage 90.00")
+DUMMY_DPI = 100
+
+_lock = threading.Lock()
+_report: Optional[dict] = None
+_report_pid: Optional[int] = None
+
+
+def _langs() -> list:
+    return [l.strip() for l in os.environ.get('OCR_WARMUP_LANGS', 'eng').split(',') if l.strip()]
+
+
+def dummy_pdf() -> bytes:
+    """One image-only PDF page with a few marksheet lines (no text layer, so it is OCR'd)."""
+    from PIL import Image, ImageDraw
+    img = Image.new("L", (8 * DUMMY_DPI, 3 * DUMMY_DPI), 255)
+    draw = ImageDraw.Draw(img)
+    for i, line in enumerate(DUMMY_LINES):
+        draw.text((40, 40 + 50 * i), line, fill=0)
+    buf = io.BytesIO()
+    img.save(buf, "PDF", resolution=DUMMY_DPI)
+    return buf.getvalue()
+
+
+def run_dummy(parser, lang: str = "eng") -> float:
+    """Seconds one dummy marksheet takes through parser.extract_marksheet_fields."""
+    data = dummy_pdf()
+    start = time.perf_counter()
+    parser.extract_marksheet_fields(data, dpi=DUMMY_DPI, ocr_lang=lang)
+    return time.perf_counter() - start
+
+
+def _prime_pool() -> int:
+    """Start every pool thread: each waits at a barrier until all have been spawned."""
+    executor = ocr_loader.get_executor()
+    size = ocr_loader.pool_size()
+    barrier = threading.Barrier(size)
+
+    def _wait():
+        try:
+            barrier.wait(timeout=5)
+        except threading.BrokenBarrierError:
+            pass
+
+    for f in [executor.submit(_wait) for _ in range(size)]:
+        f.result()
+    return size
+
+
+def _step(report: dict, name: str, fn: Callable):
+    start = time.perf_counter()
+    try:
+        return fn()
+    except Exception as e:
+        logger.warning('OCR warm-up step %s failed: %s', name, e)
+        report['errors'][name] = str(e)
+        return None
+    finally:
+        report['steps_ms'][name] = round((time.perf_counter() - start) * 1000, 1)
+
+
+def warm_up(force: bool = False, local: bool = False, pool: bool = True) -> dict:
+    """
+    Warm this process once and return the report (cached until the next fork).
+
+    - force: run again even if this process is already warm
+    - local: warm lib.pdf_parser even when OCR_WORKER_ADDRESS is set (OCR workers)
+    - pool: start the lib.ocr_loader thread pool (the OCR worker serves from its own threads)
+    """
+    global _report, _report_pid
+    with _lock:
+        if _report is not None and _report_pid == os.getpid() and not force:
+            return _report
+        report: Dict[str, object] = {'pid': os.getpid(), 'steps_ms': {}, 'errors': {}}
+        parser = _step(report, 'import', ocr_loader.local_parser if local else ocr_loader.get_parser)
+        if parser is None:
+            return report
+        client = getattr(parser, 'client', None)
+        report['mode'] = 'remote' if client is not None else 'local'
+        if client is not None:
+            report['connections'] = _step(report, 'connect', client.prime)
+        caps = _step(report, 'probe', parser.probe_ocr_environment) or {}
+        report['ocr_available'] = bool(caps.get('ocr_available'))
+        if pool:
+            report['pool_threads'] = _step(report, 'pool', _prime_pool)
+        if client is None and report['ocr_available']:
+            for lang in _langs():
+                if pool:
+                    # From a pool thread, where requests run
+                    _step(report, f'dummy_ocr.{lang}', lambda: ocr_loader.submit(run_dummy, parser, lang).result())
+                else:
+                    _step(report, f'dummy_ocr.{lang}', lambda: run_dummy(parser, lang))
+        logger.info('OCR warm-up: %s', report)
+        _report, _report_pid = report, os.getpid()
+        return report
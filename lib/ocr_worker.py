@@ -0,0 +1,176 @@
+"""Standalone OCR worker process.
+
+Runs the lib/pdf_parser entry points for web workers that set
+OCR_WORKER_ADDRESS, so OCR CPU load lives in its own processes (or on its
+own machines) and scales independently of the Flask workers. Requests use
+the length-prefixed frames from lib/ocr_rpc.py over a Unix socket or TCP;
+connections are persistent, so a client pool reuses them.
+
+Usage:
+    python -m lib.ocr_worker --listen unix:/run/eligify/ocr.sock
+    python -m lib.ocr_worker --listen 0.0.0.0:7070 --concurrency 8
+
+Set OCR_WORKER_TOKEN on both sides to require a shared token. It is
+mandatory for TCP addresses other than loopback; the worker refuses to
+start without one.
+"""
+import argparse
+import hmac
+import ipaddress
+import logging
+import os
+import socket
+import socketserver
+import threading
+
+from lib import deadline, ocr_warmup, timing
+from lib.document_buffer import DocumentBuffer
+from lib.ocr_loader import local_parser
+from lib.ocr_rpc import RPCError, parse_address, recv_frame, send_frame
+
+logger = logging.getLogger(__name__)
+
+# op -> whether the request body carries the document (passed as the first argument)
+OPS = {
+    'parse_pdf': True,
+    'extract_text_from_pdf': True,
+    'extract_text_with_info': True,
+    'extract_marksheet_fields': True,
+    'extract_marksheet_fields_from_image': True,
+    'extract_numeric_fields': True,
+    'probe_ocr_environment': False,
+}
+ALLOWED_KWARGS = {'dpi', 'method', 'ocr_lang', 'fields', 'max_marks', 'refresh'}
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def setup(self):
+        if self.request.family != socket.AF_UNIX:
+            self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def handle(self):
+        while True:
+            try:
+                header, body = recv_frame(self.request)
+            except EOFError:
+                return
+            except (RPCError, OSError) as e:
+                # The stream is out of sync after a bad frame; answer once and drop the connection
+                try:
+                    send_frame(self.request, {'ok': False, 'error': str(e)})
+                except OSError:
+                    pass
+                return
+            send_frame(self.request, self.server.dispatch(header, body))
+
+
+class _WorkerMixin:
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def configure(self, concurrency: int, token: str):
+        self.slots = threading.BoundedSemaphore(concurrency)
+        self.token = token
+
+    def dispatch(self, header: dict, body: bytearray) -> dict:
+        if self.token and not hmac.compare_digest(str(header.get('token') or ''), self.token):
+            return {'ok': False, 'error': 'invalid token'}
+        op = header.get('op')
+        if op == 'ping':
+            return {'ok': True, 'result': 'pong'}
+        if op not in OPS:
+            return {'ok': False, 'error': f'unknown op {op!r}'}
+        kwargs = {k: v for k, v in (header.get('kwargs') or {}).items() if k in ALLOWED_KWARGS}
+        if 'fields' in kwargs:
+            kwargs['fields'] = tuple(kwargs['fields'])
+        # The client's remaining budget starts now, so time spent queued for a slot counts
+        limits = header.get('budget') or {}
+        with deadline.budget(limits.get('seconds'), limits.get('pages')) as budget, self.slots:
+            entries = timing.start_collection()
+            try:
+                fn = getattr(local_parser(), op)
+                if OPS[op]:
+                    with DocumentBuffer.from_bytes(body, name=header.get('name')) as doc:
+                        result = fn(doc, **kwargs)
+                else:
+                    result = fn(**kwargs)
+                return {'ok': True, 'result': result, 'stages': entries,
+                        'budget': {'truncated': budget.truncated, 'reasons': budget.reasons, 'pages': budget.pages_left}}
+            except Exception as e:
+                logger.exception('OCR worker op %s failed', op)
+                return {'ok': False, 'error': str(e)}
+            finally:
+                timing.stop_collection()
+
+
+class UnixWorkerServer(_WorkerMixin, socketserver.ThreadingUnixStreamServer):
+    pass
+
+
+class TCPWorkerServer(_WorkerMixin, socketserver.ThreadingTCPServer):
+    pass
+
+
+def _is_loopback(host: str) -> bool:
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def check_listen(address: str, token: str) -> None:
+    """Raise ValueError for a TCP address reachable from other hosts without a token."""
+    family, sockaddr = parse_address(address)
+    if family != socket.AF_UNIX and not token and not _is_loopback(sockaddr[0]):
+        raise ValueError(f'OCR_WORKER_TOKEN is required to listen on {address}; '
+                         'without it anyone who can reach the port can submit jobs')
+
+
+def make_server(address: str, concurrency: int = 0, token: str = None):
+    """
+    Bind a worker server to `address` (a stale Unix socket file is replaced).
+
+    Raises ValueError for a non-loopback TCP address without a token.
+    """
+    if token is None:
+        token = os.environ.get('OCR_WORKER_TOKEN', '')
+    check_listen(address, token)
+    family, sockaddr = parse_address(address)
+    if family == socket.AF_UNIX:
+        if os.path.exists(sockaddr):
+            os.remove(sockaddr)
+        server = UnixWorkerServer(sockaddr, _Handler)
+    else:
+        server = TCPWorkerServer(sockaddr, _Handler)
+    server.configure(concurrency or os.cpu_count() or 1, token)
+    return server
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument('--listen', default=os.environ.get('OCR_WORKER_LISTEN', 'unix:/tmp/eligify-ocr.sock'))
+    ap.add_argument('--concurrency', type=int, default=int(os.environ.get('OCR_WORKER_CONCURRENCY', '0') or 0),
+                    help='Documents processed at once (default: CPU count)')
+    args = ap.parse_args()
+    logging.basicConfig(level=os.environ.get('LOG_LEVEL', 'INFO'))
+    try:
+        check_listen(args.listen, os.environ.get('OCR_WORKER_TOKEN', ''))
+    except ValueError as e:
+        ap.error(str(e))
+
+    # The worker exists to run OCR: import the stack, probe the binaries and run a dummy page before taking requests
+    ocr_warmup.warm_up(local=True, pool=False)
+    server = make_server(args.listen, args.concurrency)
+    logger.info('OCR worker listening on %s', args.listen)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,6 @@
+from contextlib import contextmanager
 from io import BytesIO
-from typing import Union
+from typing import Dict, List, Optional, Tuple, Union
 import os
 
 from PIL import Image
@@ -9,148 +10,299 @@ except Exception:
     cv2 = None
 from PIL import ImageOps, ImageFilter
 import shutil
+import threading
+import time
 import pytesseract
 from pdf2image import convert_from_bytes, convert_from_path
 import re
-try:
-    import PyPDF2  # type: ignore
-except Exception:
-    PyPDF2 = None
+from lib import deadline, field_ocr, image_ingest, marksheet_templates, ocr_confidence, ocr_merge, text_backends
+from lib.document_buffer import DocumentBuffer
+from lib.preprocess import IMAGE_PARAMS, cached_page, preprocess_page
+from lib.timing import stage, timed
 
 
-def _configure_tesseract_from_env() -> None:
+_ocr_caps = None
+_ocr_caps_lock = threading.Lock()
+
+
+def _find_tesseract_cmd() -> str:
     cmd = os.getenv("TESSERACT_CMD")
     if cmd:
-        pytesseract.pytesseract.tesseract_cmd = cmd
-    else:
-        # Common default path on Windows installs; ignore if not present
-        default_win_path = r"C:\\Program Files\\Tesseract-OCR\\tesseract.exe"
-        if os.path.exists(default_win_path):
-            pytesseract.pytesseract.tesseract_cmd = default_win_path
+        return cmd
+    # Common default path on Windows installs; ignore if not present
+    default_win_path = r"C:\\Program Files\\Tesseract-OCR\\tesseract.exe"
+    if os.path.exists(default_win_path):
+        return default_win_path
+    return getattr(pytesseract.pytesseract, "tesseract_cmd", None) or "tesseract"
 
 
-def _detect_poppler_path() -> str:
+def _find_poppler_path() -> str:
     p = os.getenv("POPPLER_PATH") or ""
     if p and os.path.exists(p):
         return p
     w = shutil.which("pdftoppm") or shutil.which("pdftocairo")
     if w:
-        d = os.path.dirname(w)
-        os.environ["POPPLER_PATH"] = d
-        return d
+        return os.path.dirname(w)
     try:
         base = os.path.join(os.getenv("LOCALAPPDATA", ""), "Microsoft", "WinGet", "Packages")
         if os.path.exists(base):
             for root, dirs, files in os.walk(base):
                 if "pdftoppm.exe" in files or "pdftocairo.exe" in files:
-                    os.environ["POPPLER_PATH"] = root
                     return root
     except Exception:
         pass
     return ""
 
 
+def probe_ocr_environment(refresh: bool = False) -> dict:
+    """
+    Detect Tesseract and Poppler once per process and cache the result.
+
+    - refresh: discard the cached probe and detect again
+    """
+    global _ocr_caps
+    if _ocr_caps is not None and not refresh:
+        return _ocr_caps
+    with _ocr_caps_lock:
+        if _ocr_caps is not None and not refresh:
+            return _ocr_caps
+        tess_cmd = _find_tesseract_cmd()
+        pytesseract.pytesseract.tesseract_cmd = tess_cmd
+        tess_ok = bool(tess_cmd and (os.path.exists(tess_cmd) or shutil.which(tess_cmd)))
+        version = None
+        languages = []
+        if tess_ok:
+            try:
+                version = str(pytesseract.get_tesseract_version())
+            except Exception:
+                tess_ok = False
+        if tess_ok:
+            try:
+                languages = sorted(pytesseract.get_languages(config=""))
+            except Exception:
+                languages = []
+
+        poppler_path = _find_poppler_path()
+        if poppler_path:
+            os.environ["POPPLER_PATH"] = poppler_path
+        pdftoppm = os.path.join(poppler_path, "pdftoppm.exe")
+        pdftocairo = os.path.join(poppler_path, "pdftocairo.exe")
+        poppler_ok = bool(poppler_path and (os.path.exists(pdftoppm) or os.path.exists(pdftocairo) or shutil.which("pdftoppm") or shutil.which("pdftocairo")))
+
+        _ocr_caps = {
+            "ocr_available": poppler_ok and tess_ok,
+            "tesseract_cmd": tess_cmd,
+            "tesseract_ok": tess_ok,
+            "tesseract_version": version,
+            "languages": languages,
+            "poppler_path": poppler_path or None,
+            "poppler_ok": poppler_ok,
+            "probed_at": time.time(),
+        }
+        return _ocr_caps
+
+
+def _configure_tesseract_from_env() -> None:
+    probe_ocr_environment()
+
+
+def _detect_poppler_path() -> str:
+    return probe_ocr_environment()["poppler_path"] or ""
+
+
 def _is_ocr_available() -> bool:
-    poppler_path = _detect_poppler_path()
-    pdftoppm = os.path.join(poppler_path, "pdftoppm.exe")
-    pdftocairo = os.path.join(poppler_path, "pdftocairo.exe")
-    poppler_ok = bool(poppler_path and (os.path.exists(pdftoppm) or os.path.exists(pdftocairo) or shutil.which("pdftoppm") or shutil.which("pdftocairo")))
+    return probe_ocr_environment()["ocr_available"]
 
-    env_tess = os.getenv("TESSERACT_CMD")
-    tess_attr = getattr(pytesseract.pytesseract, "tesseract_cmd", None)
-    tess_cmd = env_tess or tess_attr
-    tess_ok = bool(tess_cmd and os.path.exists(tess_cmd))
 
-    return poppler_ok and tess_ok
+def _ocr_image_to_string(img, lang: str = "eng", config: str = "--psm 6") -> str:
+    with stage("ocr.tesseract"):
+        return deadline.run_tesseract(pytesseract.image_to_string, img, lang=lang, config=config) or ""
 
 
-def _images_from_input(input_obj: Union[bytes, bytearray, str, BytesIO], dpi: int = 300):
-    poppler_path = _detect_poppler_path() or None
-    if isinstance(input_obj, (bytes, bytearray)):
-        return convert_from_bytes(input_obj, dpi=dpi, poppler_path=poppler_path)
-    if hasattr(input_obj, "read"):
-        data = input_obj.read()
-        return convert_from_bytes(data, dpi=dpi, poppler_path=poppler_path)
-    if isinstance(input_obj, str):
-        return convert_from_path(input_obj, dpi=dpi, poppler_path=poppler_path)
-    raise ValueError("Unsupported input")
-
-
-def _bytes_from_input(input_obj: Union[bytes, bytearray, str, BytesIO]) -> bytes:
-    if isinstance(input_obj, (bytes, bytearray)):
-        return bytes(input_obj)
-    if hasattr(input_obj, "read"):
-        return input_obj.read()
-    if isinstance(input_obj, str):
-        with open(input_obj, "rb") as f:
-            return f.read()
-    raise ValueError("Unsupported input")
-
-
-def _extract_text_layer(input_obj: Union[bytes, bytearray, str, BytesIO]) -> str:
-    if PyPDF2 is None:
+def _ocr_image_to_data(img, lang: str = "eng", config: str = "--psm 6", words: Optional[ocr_confidence.WordConfidences] = None) -> str:
+    """OCR one image; with `words`, Tesseract's word confidences are recorded from the same call."""
+    if words is None:
+        return _ocr_image_to_string(img, lang=lang, config=config)
+    with stage("ocr.tesseract"):
+        data = deadline.run_tesseract(pytesseract.image_to_data, img, lang=lang, config=config, output_type=pytesseract.Output.DICT)
+    if not data:
         return ""
+    words.add(data)
+    return ocr_confidence.text_from_data(data)
+
+
+@contextmanager
+def _as_document(input_obj):
+    """Yield a DocumentBuffer for input_obj, closing it only if it was created here."""
+    doc = DocumentBuffer.wrap(input_obj)
     try:
-        data = _bytes_from_input(input_obj)
-        reader = PyPDF2.PdfReader(BytesIO(data))
-        texts = []
-        for page in reader.pages:
-            t = page.extract_text() or ""
-            if t.strip():
-                texts.append(t)
-        return "\n\n".join(texts).strip()
-    except Exception:
-        return ""
+        yield doc
+    finally:
+        if doc is not input_obj:
+            doc.close()
+
+
+@timed("pdf.rasterize")
+def _images_from_input(doc: DocumentBuffer, dpi: int = 300):
+    poppler_path = _detect_poppler_path() or None
+    if doc.path:
+        return convert_from_path(doc.path, dpi=dpi, poppler_path=poppler_path)
+    return convert_from_bytes(doc.tobytes(), dpi=dpi, poppler_path=poppler_path)
+
 
+# Pages whose text layer is shorter than this are treated as image-only and OCR'd
+MIN_PAGE_TEXT_CHARS = 20
+# Pages rendered per pdftoppm call; the request budget is checked between calls
+RENDER_BATCH = 4
 
-def parse_pdf(input_obj: Union[bytes, bytearray, str, BytesIO], dpi: int = 300, ocr_lang: str = "eng", method: str = "auto") -> str:
+
+@timed("pdf.text_layer")
+def _page_texts(doc: DocumentBuffer) -> Tuple[Optional[List[str]], Optional[str]]:
+    """
+    Text layer of each page ("" where a page has none) and the engine used.
+
+    Returns (None, None) when no installed engine can read the PDF.
+    """
+    return text_backends.extract_page_texts(doc)
+
+
+def _join_pages(texts) -> str:
+    return "\n\n".join(t.strip() for t in texts if t and t.strip()).strip()
+
+
+def _extract_text_layer(doc: DocumentBuffer) -> str:
+    return _join_pages(_page_texts(doc)[0] or [])
+
+
+def _sparse_pages(page_texts: List[str]) -> List[int]:
+    """1-based numbers of pages without a usable text layer."""
+    return [n for n, t in enumerate(page_texts, start=1) if len(t.strip()) < MIN_PAGE_TEXT_CHARS]
+
+
+def _page_runs(pages: List[int], max_run: int = 0):
+    """Group sorted page numbers into contiguous (first, last) runs of at most max_run pages (0: unbounded)."""
+    runs = []
+    for n in pages:
+        if runs and runs[-1][1] == n - 1 and (not max_run or n - runs[-1][0] < max_run):
+            runs[-1][1] = n
+        else:
+            runs.append([n, n])
+    return [tuple(r) for r in runs]
+
+
+@timed("pdf.rasterize")
+def _render_pages(path: str, first: int, last: int, dpi: int):
+    return convert_from_path(path, dpi=dpi, first_page=first, last_page=last, poppler_path=_detect_poppler_path() or None)
+
+
+def _prepared_pages(doc: DocumentBuffer, pages: Optional[List[int]], dpi: int = 300) -> Dict[int, Image.Image]:
+    """
+    Preprocessed images of the given 1-based pages (every page when None).
+
+    Pages go through lib.preprocess once and are cached per document, page
+    and dpi, so a cached page is not rasterized again. The remaining pages
+    are rendered in contiguous runs of up to RENDER_BATCH pages, within the
+    request's page and time budget (lib.deadline); pages past the budget are
+    left out. Raises if rasterization fails.
+    """
+    key = doc.digest()
+    prepared = {}
+    if pages is None:
+        count = text_backends.page_count(doc)
+        if count is None:
+            for n, img in enumerate(_images_from_input(doc, dpi=dpi), start=1):
+                prepared[n] = preprocess_page(img, doc_key=key, page=n, dpi=dpi)
+            pages = []
+        else:
+            pages = list(range(1, count + 1))
+    missing = []
+    for n in pages:
+        img = cached_page(key, n, dpi)
+        if img is None:
+            missing.append(n)
+        else:
+            prepared[n] = img
+    missing = deadline.current().take_pages(missing, dpi)
+    if missing:
+        with doc.on_disk() as path:
+            for first, last in _page_runs(missing, RENDER_BATCH):
+                if not deadline.current().proceed(f"rendering page {first}"):
+                    break
+                for n, img in enumerate(_render_pages(path, first, last, dpi), start=first):
+                    prepared[n] = preprocess_page(img, doc_key=key, page=n, dpi=dpi)
+    return prepared
+
+
+def _ocr_pages(doc: DocumentBuffer, pages: Optional[List[int]], dpi: int = 300, ocr_lang: str = "eng",
+               words: Optional[ocr_confidence.WordConfidences] = None) -> Dict[int, str]:
+    """OCR the given 1-based pages (every page when None); pages with a text layer are never rasterized."""
+    prepared = _prepared_pages(doc, pages, dpi=dpi)
+    return {n: _ocr_image_to_data(prepared[n], lang=ocr_lang, config="--psm 6", words=words) for n in sorted(prepared)}
+
+
+def _merge_hybrid(page_texts: List[str], ocr_texts: Dict[int, str]) -> str:
+    """Page-ordered text: OCR output for OCR'd pages (their own text layer if OCR came back empty)."""
+    return _join_pages((ocr_texts.get(n) or "").strip() or t for n, t in enumerate(page_texts, start=1))
+
+
+def parse_pdf(input_obj: Union[bytes, bytearray, str, BytesIO, DocumentBuffer], dpi: int = 300, ocr_lang: str = "eng", method: str = "auto") -> str:
     """
     Extract text from a PDF using OCR (PyTesseract).
 
-    - input_obj: bytes, file-like, or filesystem path to a PDF
+    - input_obj: DocumentBuffer, bytes, file-like, or filesystem path to a PDF
     - dpi: rasterization DPI for converting PDF pages to images
     - ocr_lang: language code for Tesseract (default 'eng')
     """
     _configure_tesseract_from_env()
+    with _as_document(input_obj) as doc:
+        return _parse_pdf_document(doc, dpi=dpi, ocr_lang=ocr_lang, method=method)
+
+
+def _parse_pdf_document(doc: DocumentBuffer, dpi: int, ocr_lang: str, method: str,
+                        words: Optional[ocr_confidence.WordConfidences] = None) -> str:
+    """Text of the document for `method`; with `words`, OCR word confidences are collected too."""
     method = (method or "auto").lower()
 
     if method in ("text", "auto"):
-        text_layer = _extract_text_layer(input_obj)
+        page_texts = _page_texts(doc)[0] or []
+        text_layer = _join_pages(page_texts)
         if method == "text":
             if text_layer and text_layer.strip():
                 return text_layer
             return "No text layer found in PDF. Consider method='ocr' (requires Poppler + Tesseract)."
-        if text_layer and len(text_layer.strip()) >= 20:
+        sparse = _sparse_pages(page_texts)
+        if page_texts and not sparse:
             return text_layer
+        if len(text_layer) >= MIN_PAGE_TEXT_CHARS:
+            # Mixed document: keep the digital pages, OCR only the image-only ones
+            if not _is_ocr_available():
+                return text_layer
+            try:
+                ocr_texts = _ocr_pages(doc, sparse, dpi=dpi, ocr_lang=ocr_lang, words=words)
+            except Exception:
+                return text_layer
+            return _merge_hybrid(page_texts, ocr_texts)
 
     if method == "auto" and not _is_ocr_available():
         return "OCR prerequisites missing. Set POPPLER_PATH to Poppler 'bin' and TESSERACT_CMD to tesseract.exe."
 
+    if words is not None:
+        words.ocr_only = True
     try:
-        images = _images_from_input(input_obj, dpi=dpi)
+        ocr_texts = _ocr_pages(doc, None, dpi=dpi, ocr_lang=ocr_lang, words=words)
     except Exception:
         if method == "ocr":
             return "Failed to rasterize PDF. Ensure Poppler is installed and POPPLER_PATH is set correctly."
         return "Could not rasterize pages for OCR. Check Poppler installation and POPPLER_PATH."
 
-    texts = []
-    for img in images:
-        if img.mode != "L":
-            img = img.convert("L")
-        try:
-            text = pytesseract.image_to_string(img, lang=ocr_lang, config="--psm 6")
-        except Exception:
-            text = ""
-        texts.append(text)
-
-    merged = "\n\n".join(t.strip() for t in texts if t)
+    merged = _join_pages(ocr_texts[n] for n in sorted(ocr_texts))
     if merged:
         return merged
     return "OCR produced no text. Verify Tesseract installation or try increasing DPI/improving image quality."
 
 
 def extract_text_from_pdf(
-    input_obj: Union[bytes, bytearray, str, BytesIO],
+    input_obj: Union[bytes, bytearray, str, BytesIO, DocumentBuffer],
     dpi: int = 300,
     ocr_lang: str = "eng",
     method: str = "auto",
@@ -159,7 +311,7 @@ def extract_text_from_pdf(
 
 
 def extract_text_with_info(
-    input_obj: Union[bytes, bytearray, str, BytesIO],
+    input_obj: Union[bytes, bytearray, str, BytesIO, DocumentBuffer],
     dpi: int = 300,
     ocr_lang: str = "eng",
     method: str = "auto",
@@ -181,15 +333,44 @@ def extract_text_with_info(
         },
     }
 
-    text_layer = _extract_text_layer(input_obj)
+    with _as_document(input_obj) as doc:
+        return _text_with_info(doc, info, dpi=dpi, ocr_lang=ocr_lang, method=method)
+
+
+def _text_with_info(doc: DocumentBuffer, info: dict, dpi: int, ocr_lang: str, method: str) -> dict:
+    page_texts, backend = _page_texts(doc)
+    page_texts = page_texts or []
+    text_layer = _join_pages(page_texts)
+    info["text_backend"] = backend
     info["text_layer_found"] = bool(text_layer and text_layer.strip())
+    sparse = _sparse_pages(page_texts)
+    if method == "auto":
+        # Per-page routing: pages without a usable text layer are OCR'd on their own
+        info["pages"] = [{"page": n, "source": "ocr" if n in sparse else "text"} for n in range(1, len(page_texts) + 1)]
 
-    if method in ("text", "auto") and info["text_layer_found"]:
+    if (method == "text" and info["text_layer_found"]) or (method == "auto" and page_texts and not sparse):
         info["decided_method"] = "text"
         info["text"] = text_layer
         return info
 
-    should_ocr = method == "ocr" or (method == "auto" and not info["text_layer_found"])
+    if method == "auto" and len(text_layer) >= MIN_PAGE_TEXT_CHARS:
+        info["decided_method"] = "text"
+        info["text"] = text_layer
+        if not info["ocr_available"]:
+            info["warnings"].append(f"Pages {sparse} have no text layer and OCR prerequisites are missing.")
+            return info
+        try:
+            ocr_texts = _ocr_pages(doc, sparse, dpi=dpi, ocr_lang=ocr_lang)
+            info["rasterize_ok"] = True
+        except Exception:
+            info["warnings"].append("Failed to rasterize PDF (Poppler not installed or invalid POPPLER_PATH).")
+            return info
+        info["decided_method"] = "hybrid"
+        info["ocr_ok"] = any(t.strip() for t in ocr_texts.values())
+        info["text"] = _merge_hybrid(page_texts, ocr_texts)
+        return info
+
+    should_ocr = method in ("ocr", "auto")
     if not should_ocr:
         info["warnings"].append("No text layer found and OCR not requested.")
         return info
@@ -200,24 +381,14 @@ def extract_text_with_info(
         return info
 
     try:
-        images = _images_from_input(input_obj, dpi=dpi)
+        ocr_texts = _ocr_pages(doc, None, dpi=dpi, ocr_lang=ocr_lang)
         info["rasterize_ok"] = True
     except Exception:
         info["decided_method"] = "ocr"
         info["warnings"].append("Failed to rasterize PDF (Poppler not installed or invalid POPPLER_PATH).")
         return info
 
-    texts = []
-    for img in images:
-        if img.mode != "L":
-            img = img.convert("L")
-        try:
-            t = pytesseract.image_to_string(img, lang=ocr_lang, config="--psm 6")
-        except Exception:
-            t = ""
-        texts.append(t)
-
-    merged = "\n\n".join(s.strip() for s in texts if s)
+    merged = _join_pages(ocr_texts[n] for n in sorted(ocr_texts))
     info["decided_method"] = "ocr"
     info["ocr_ok"] = bool(merged)
     if not info["ocr_ok"]:
@@ -227,7 +398,7 @@ def extract_text_with_info(
 
 
 def extract_headings_and_bullets(
-    input_obj: Union[bytes, bytearray, str, BytesIO],
+    input_obj: Union[bytes, bytearray, str, BytesIO, DocumentBuffer],
     dpi: int = 300,
     ocr_lang: str = "eng",
     method: str = "auto",
@@ -247,7 +418,7 @@ def extract_headings_and_bullets(
 
 
 def extract_modification_items(
-    input_obj: Union[bytes, bytearray, str, BytesIO],
+    input_obj: Union[bytes, bytearray, str, BytesIO, DocumentBuffer],
     dpi: int = 300,
     ocr_lang: str = "eng",
     method: str = "auto",
@@ -262,7 +433,15 @@ def extract_modification_items(
     return items
 
 
-def _parse_marksheet_text(text: str) -> dict:
+@timed("parse.marksheet")
+def _parse_marksheet_text(text: str, words: Optional[ocr_confidence.WordConfidences] = None,
+                         variants: Optional[List[str]] = None) -> dict:
+    """
+    Parse marksheet fields, using the board template picked by header keywords.
+
+    Unrecognized layouts (or a template that finds no score) go through the
+    generic regexes. words/variants feed the per-field `confidence` scores.
+    """
     issue_markers = (
         "No text layer found",
         "OCR prerequisites missing",
@@ -272,7 +451,15 @@ def _parse_marksheet_text(text: str) -> dict:
     )
     if not text or any(m in text for m in issue_markers):
         return {"error": text or "No text extracted"}
+    template = marksheet_templates.classify(text)
+    if template is not None:
+        fields = marksheet_templates.extract(template, text)
+        if fields["subjects"] or any(fields.get(k) is not None for k in ("percentage", "cgpa", "total_marks")):
+            return _marksheet_result(fields, template.name, words, variants)
+    return _parse_generic_marksheet(text, words, variants)
+
 
+def _parse_generic_marksheet(text: str, words=None, variants=None) -> dict:
     import unicodedata
     def _normalize(s: str) -> str:
         s2 = unicodedata.normalize('NFKC', s)
@@ -513,6 +700,10 @@ def _parse_marksheet_text(text: str) -> dict:
             total_col = None
         subjects.append({"name": subj_name, "marks": total_col, "max": 100.0, "grade": None})
 
+    # The line loop and the joined-text scan can both see a row; keep its first reading
+    seen_subjects = set()
+    subjects = [s for s in subjects if not (s["name"].lower() in seen_subjects or seen_subjects.add(s["name"].lower()))]
+
     total_marks = None
     max_marks = None
     m_total = re.search(rf"(?:Total\s*marks?|Aggregate|Marks\s*Obtained)\s*{sep}\s*([0-9]{1,4})(?:\s*(?:out\s*of|of|/)?\s*([0-9]{1,4}))", joined, flags=re.IGNORECASE)
@@ -535,24 +726,7 @@ def _parse_marksheet_text(text: str) -> dict:
             sx = 100.0 * len([1 for s in subjects if s.get("marks") is not None])
         max_marks = sx if sx > 0 else None
 
-    calculated_percentage = None
-    if percentage:
-        try:
-            calculated_percentage = float(percentage)
-        except Exception:
-            calculated_percentage = None
-    elif cgpa:
-        try:
-            calculated_percentage = float(cgpa) * 9.5
-        except Exception:
-            calculated_percentage = None
-    elif total_marks and max_marks and max_marks > 0:
-        try:
-            calculated_percentage = (float(total_marks) / float(max_marks)) * 100.0
-        except Exception:
-            calculated_percentage = None
-
-    result = {
+    return _marksheet_result({
         "name": name,
         "father_name": father_name,
         "roll_number": roll_number,
@@ -566,11 +740,37 @@ def _parse_marksheet_text(text: str) -> dict:
         "cgpa": float(cgpa) if cgpa else None,
         "total_marks": total_marks,
         "max_marks": max_marks,
-        "calculated_percentage": calculated_percentage,
         "subjects": subjects,
-    }
+    }, "generic", words, variants)
+
+
+def _marksheet_result(fields: dict, template: str, words=None, variants=None) -> dict:
+    """Add calculated_percentage, per-field confidence and the summary keys to raw marksheet fields."""
+    percentage, cgpa = fields.get("percentage"), fields.get("cgpa")
+    total_marks, max_marks = fields.get("total_marks"), fields.get("max_marks")
+    subjects = fields.get("subjects") or []
+    name, university = fields.get("name"), fields.get("university")
+    if total_marks is None and subjects:
+        sm = sum(s["marks"] for s in subjects if isinstance(s.get("marks"), (int, float)))
+        sx = sum(s["max"] for s in subjects if isinstance(s.get("marks"), (int, float)) and isinstance(s.get("max"), (int, float)))
+        if sm > 0 and sx > 0:
+            total_marks, max_marks = sm, sx
+            fields = {**fields, "total_marks": total_marks, "max_marks": max_marks}
+    calculated_percentage = None
+    if percentage:
+        calculated_percentage = percentage
+    elif cgpa:
+        calculated_percentage = cgpa * 9.5
+    elif total_marks and max_marks and max_marks > 0:
+        calculated_percentage = (float(total_marks) / float(max_marks)) * 100.0
+
+    result = {**fields, "calculated_percentage": calculated_percentage, "template": template}
+    confidence = ocr_confidence.field_confidence(result, words, variants)
     if result["percentage"] is None and calculated_percentage is not None:
         result["percentage"] = calculated_percentage
+        if "calculated_percentage" in confidence:
+            confidence["percentage"] = confidence["calculated_percentage"]
+    result["confidence"] = confidence
     subjects_map = {s.get("name"): {"marks": s.get("marks"), "max": s.get("max"), "grade": s.get("grade")} for s in subjects if s.get("name")}
     total_outoff = f"{int(total_marks) if isinstance(total_marks, (int, float)) else total_marks}/{int(max_marks) if isinstance(max_marks, (int, float)) else max_marks}" if (total_marks is not None and max_marks is not None) else None
     pref_val = result["percentage"] if result["percentage"] is not None else (result["cgpa"] if result["cgpa"] is not None else result["calculated_percentage"])
@@ -584,30 +784,90 @@ def _parse_marksheet_text(text: str) -> dict:
     return result
 
 def extract_marksheet_fields(
-    input_obj: Union[bytes, bytearray, str, BytesIO],
+    input_obj: Union[bytes, bytearray, str, BytesIO, DocumentBuffer],
     dpi: int = 300,
     ocr_lang: str = "eng",
     method: str = "auto",
 ) -> dict:
-    text = parse_pdf(input_obj, dpi=dpi, ocr_lang=ocr_lang, method=method)
-    return _parse_marksheet_text(text)
+    _configure_tesseract_from_env()
+    words = ocr_confidence.WordConfidences()
+    with _as_document(input_obj) as doc:
+        text = _parse_pdf_document(doc, dpi=dpi, ocr_lang=ocr_lang, method=method, words=words)
+    return _parse_marksheet_text(text, words=words)
+
+def extract_numeric_fields(
+    input_obj: Union[bytes, bytearray, str, BytesIO, DocumentBuffer],
+    fields=field_ocr.NUMERIC_FIELDS,
+    dpi: int = 300,
+    ocr_lang: str = "eng",
+    max_marks: Optional[float] = None,
+) -> dict:
+    """
+    Re-read only the numeric fields (percentage, cgpa, total_marks/max_marks, roll_no).
+
+    A total printed without its maximum is only accepted within max_marks
+    (the maximum the full parse found), so credit or subject counts are not
+    mistaken for it.
+
+    Works on the same preprocessed pages as the full OCR path (so a page OCR'd
+    earlier is not rasterized again) and stops at the first page where every
+    requested field was found. Returns {} when nothing was found or OCR is
+    unavailable.
+    """
+    _configure_tesseract_from_env()
+    try:
+        with _as_document(input_obj) as doc:
+            if doc.head(5) != b"%PDF-":
+                img = image_ingest.load_image(doc)
+                img = preprocess_page(img, IMAGE_PARAMS, doc_key=doc.digest(), page=1)
+                return field_ocr.read_fields(img, fields, lang=ocr_lang, max_marks=max_marks)
+            if not _is_ocr_available():
+                return {}
+            count = text_backends.page_count(doc)
+            pages = [[n] for n in range(1, count + 1)] if count else [None]
+            found = {}
+            for batch in pages:
+                if not deadline.current().proceed("the next page"):
+                    break
+                prepared = _prepared_pages(doc, batch, dpi=dpi)
+                for n in sorted(prepared):
+                    missing = [f for f in fields if f not in found]
+                    if not missing:
+                        return found
+                    found.update(field_ocr.read_fields(prepared[n], missing, lang=ocr_lang, max_marks=max_marks))
+                if all(f in found for f in fields):
+                    break
+            return found
+    except Exception:
+        return {}
+
 
 def extract_marksheet_fields_from_image(
-    input_obj: Union[bytes, bytearray, str, BytesIO],
+    input_obj: Union[bytes, bytearray, str, BytesIO, DocumentBuffer],
     ocr_lang: str = "eng",
 ) -> dict:
     _configure_tesseract_from_env()
     try:
-        if isinstance(input_obj, (bytes, bytearray)):
-            img = Image.open(BytesIO(input_obj))
-        elif hasattr(input_obj, "read"):
-            img = Image.open(input_obj)
-        elif isinstance(input_obj, str):
-            img = Image.open(input_obj)
-        else:
-            return {"error": "Unsupported input"}
+        doc = DocumentBuffer.wrap(input_obj)
+    except ValueError:
+        return {"error": "Unsupported input"}
+    except Exception:
+        return {"error": "Failed to open image"}
+    try:
+        return _marksheet_fields_from_image_document(doc, ocr_lang)
+    finally:
+        if doc is not input_obj:
+            doc.close()
+
+
+def _marksheet_fields_from_image_document(doc: DocumentBuffer, ocr_lang: str) -> dict:
+    try:
+        # Upright, downscaled grayscale; the variants below never convert again
+        img = image_ingest.load_image(doc)
     except Exception:
         return {"error": "Failed to open image"}
+    # Deskew/crop/rescale once; the threshold variants below start from this base
+    img = preprocess_page(img, IMAGE_PARAMS, doc_key=doc.digest(), page=1)
     def _variants(im: Image.Image):
         vars = []
         if cv2 is None:
@@ -623,10 +883,6 @@ def extract_marksheet_fields_from_image(
             vars.append(ImageOps.invert(base))
         else:
             arr = cv2.cvtColor(np.array(im), cv2.COLOR_RGB2GRAY) if im.mode != "L" else np.array(im)
-            h, w = arr.shape[:2]
-            if max(w, h) < 1200:
-                s = 1200.0 / max(w, h)
-                arr = cv2.resize(arr, (int(w * s), int(h * s)), interpolation=cv2.INTER_CUBIC)
             v1 = arr
             v2 = cv2.medianBlur(arr, 3)
             v3 = cv2.GaussianBlur(arr, (3, 3), 0.8)
@@ -640,13 +896,16 @@ def extract_marksheet_fields_from_image(
     except Exception:
         np = None
     texts = []
+    words = ocr_confidence.WordConfidences()
+    words.ocr_only = True
+    budget = deadline.current()
     for var in _variants(img):
         for cfg in ("--psm 6", "--psm 4", "--psm 11", "--oem 1 --psm 6"):
-            try:
-                t = pytesseract.image_to_string(var, lang=ocr_lang, config=cfg)
-            except Exception:
-                t = ""
+            if not budget.proceed("the remaining OCR variants"):
+                break
+            t = _ocr_image_to_data(var, lang=ocr_lang, config=cfg, words=words)
             if t and t.strip():
                 texts.append(t)
-    merged = "\n\n".join(s.strip() for s in texts if s.strip())
-    return _parse_marksheet_text(merged)
+    # Vote line by line across variants instead of parsing 20 concatenated copies
+    merged = ocr_merge.merge_variants(texts)
+    return _parse_marksheet_text(merged, words=words, variants=texts)
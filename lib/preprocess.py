@@ -0,0 +1,231 @@
+"""Page preprocessing shared by the PDF and image OCR paths.
+
+preprocess_page() deskews, crops scan borders, binarizes and rescales a page
+so its text sits near the glyph height Tesseract reads best. The result is
+cached per (document, page, dpi, params), so the verify fallback and
+repeated requests for the same upload never redo the OpenCV work.
+"""
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Hashable, Optional
+
+from PIL import Image, ImageOps
+
+try:
+    import cv2  # type: ignore
+    import numpy as np  # type: ignore
+except Exception:
+    cv2 = None
+    np = None
+
+from lib.timing import timed
+
+
+@dataclass(frozen=True)
+class PreprocessParams:
+    """
+    - deskew: rotate by the detected text skew (up to max_skew_deg)
+    - crop: trim empty margins and solid scanner borders
+    - binarize: 'otsu' (clean renders), 'adaptive' (uneven lighting) or '' to keep grayscale
+    - target_glyph_px: median character height to scale towards (0 disables scaling)
+    """
+    deskew: bool = True
+    crop: bool = True
+    binarize: str = 'otsu'
+    target_glyph_px: int = 28
+    max_skew_deg: float = 10.0
+
+
+# Rendered PDF pages: clean backgrounds, Otsu is enough
+PDF_PAGE_PARAMS = PreprocessParams()
+# Photos/scans: keep grayscale, the image path builds its own threshold variants
+IMAGE_PARAMS = PreprocessParams(binarize='')
+
+_MARGIN_PX = 12
+
+
+def _ink_mask(gray):
+    """Binary mask (255 = ink) via Otsu on a lightly blurred copy."""
+    blur = cv2.GaussianBlur(gray, (3, 3), 0)
+    _, mask = cv2.threshold(blur, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    return mask
+
+
+def _skew_angle(mask, max_skew: float) -> float:
+    """Dominant text-line angle in degrees from the ink's minimum-area rectangle."""
+    # Join characters into line blobs so the rectangle follows text lines, not glyphs
+    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (max(15, mask.shape[1] // 60), 3))
+    lines = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel)
+    coords = cv2.findNonZero(lines)
+    if coords is None or len(coords) < 50:
+        return 0.0
+    angle = cv2.minAreaRect(coords)[-1]
+    if angle > 45:
+        angle -= 90
+    elif angle < -45:
+        angle += 90
+    if abs(angle) > max_skew or abs(angle) < 0.2:
+        return 0.0
+    return angle
+
+
+def _rotate(gray, angle: float):
+    h, w = gray.shape[:2]
+    m = cv2.getRotationMatrix2D((w / 2.0, h / 2.0), angle, 1.0)
+    return cv2.warpAffine(gray, m, (w, h), flags=cv2.INTER_CUBIC, borderMode=cv2.BORDER_CONSTANT, borderValue=255)
+
+
+def _drop_border_components(mask):
+    """Remove large blobs touching the image edge (scanner/camera borders, page shadows)."""
+    h, w = mask.shape[:2]
+    n, labels, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+    out = mask
+    for i in range(1, n):
+        x, y, cw, ch = stats[i, cv2.CC_STAT_LEFT], stats[i, cv2.CC_STAT_TOP], stats[i, cv2.CC_STAT_WIDTH], stats[i, cv2.CC_STAT_HEIGHT]
+        touches = x == 0 or y == 0 or x + cw == w or y + ch == h
+        if touches and (cw > 0.5 * w or ch > 0.5 * h):
+            if out is mask:
+                out = mask.copy()
+            out[labels == i] = 0
+    return out
+
+
+def _content_box(mask):
+    """Bounding box of ink after dropping border blobs and near-solid rows/columns."""
+    mask = _drop_border_components(mask)
+    h, w = mask.shape[:2]
+    rows = (mask > 0).sum(axis=1)
+    cols = (mask > 0).sum(axis=0)
+    row_ok = np.where((rows > 0) & (rows < 0.9 * w))[0]
+    col_ok = np.where((cols > 0) & (cols < 0.9 * h))[0]
+    if len(row_ok) == 0 or len(col_ok) == 0:
+        return 0, 0, w, h
+    top = max(0, int(row_ok[0]) - _MARGIN_PX)
+    bottom = min(h, int(row_ok[-1]) + 1 + _MARGIN_PX)
+    left = max(0, int(col_ok[0]) - _MARGIN_PX)
+    right = min(w, int(col_ok[-1]) + 1 + _MARGIN_PX)
+    return left, top, right, bottom
+
+
+def _glyph_height(mask) -> Optional[float]:
+    """Median height of character-sized connected components."""
+    n, _, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+    if n <= 1:
+        return None
+    heights = stats[1:, cv2.CC_STAT_HEIGHT]
+    widths = stats[1:, cv2.CC_STAT_WIDTH]
+    keep = (heights >= 6) & (heights <= 300) & (widths <= heights * 4)
+    if keep.sum() < 10:
+        return None
+    return float(np.median(heights[keep]))
+
+
+def _binarize(gray, mode: str):
+    if mode == 'adaptive':
+        return cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 35, 11)
+    _, out = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    return out
+
+
+@timed("ocr.preprocess")
+def _compute(img: Image.Image, params: PreprocessParams) -> Image.Image:
+    gray_img = img.convert("L") if img.mode != "L" else img
+    if cv2 is None:
+        return ImageOps.autocontrast(gray_img)
+    gray = np.asarray(gray_img)
+    mask = _ink_mask(gray)
+    if params.deskew:
+        angle = _skew_angle(mask, params.max_skew_deg)
+        if angle:
+            gray = _rotate(gray, angle)
+            mask = _ink_mask(gray)
+    if params.crop:
+        left, top, right, bottom = _content_box(mask)
+        gray = gray[top:bottom, left:right]
+        mask = mask[top:bottom, left:right]
+    if params.target_glyph_px:
+        glyph = _glyph_height(mask)
+        if glyph:
+            scale = params.target_glyph_px / glyph
+            if scale < 0.9 or scale > 1.25:
+                scale = min(scale, 3.0)
+                h, w = gray.shape[:2]
+                interp = cv2.INTER_AREA if scale < 1 else cv2.INTER_CUBIC
+                gray = cv2.resize(gray, (max(1, int(w * scale)), max(1, int(h * scale))), interpolation=interp)
+    if params.binarize:
+        gray = _binarize(gray, params.binarize)
+    return Image.fromarray(gray)
+
+
+class _PageCache:
+    """LRU of preprocessed pages bounded by total pixel bytes."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._items = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            img = self._items.get(key)
+            if img is not None:
+                self._items.move_to_end(key)
+            return img
+
+    def put(self, key, img: Image.Image) -> None:
+        size = img.width * img.height * len(img.getbands())
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._bytes -= old.width * old.height * len(old.getbands())
+            self._items[key] = img
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._items:
+                _, evicted = self._items.popitem(last=False)
+                self._bytes -= evicted.width * evicted.height * len(evicted.getbands())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+
+
+def _cache_bytes() -> int:
+    try:
+        return int(float(os.environ.get('PREPROCESS_CACHE_MB', '64')) * 1024 * 1024)
+    except ValueError:
+        return 64 * 1024 * 1024
+
+
+page_cache = _PageCache(_cache_bytes())
+
+
+def cache_key(doc_key: Hashable, page: int, dpi: Optional[int], params: PreprocessParams) -> tuple:
+    return (doc_key, page, dpi, params)
+
+
+def cached_page(doc_key: Hashable, page: int, dpi: Optional[int], params: PreprocessParams = PDF_PAGE_PARAMS) -> Optional[Image.Image]:
+    """Previously preprocessed page, or None (lets callers skip rasterizing it again)."""
+    return page_cache.get(cache_key(doc_key, page, dpi, params))
+
+
+def preprocess_page(img: Image.Image, params: PreprocessParams = PDF_PAGE_PARAMS, doc_key: Optional[Hashable] = None,
+                    page: int = 1, dpi: Optional[int] = None) -> Image.Image:
+    """
+    Deskew, crop, rescale and binarize one page image (grayscale result).
+
+    With doc_key set, the result is cached per (doc_key, page, dpi, params).
+    """
+    if doc_key is None:
+        return _compute(img, params)
+    key = cache_key(doc_key, page, dpi, params)
+    out = page_cache.get(key)
+    if out is None:
+        out = _compute(img, params)
+        page_cache.put(key, out)
+    return out
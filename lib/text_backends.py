@@ -0,0 +1,180 @@
+"""Pluggable PDF text-layer engines.
+
+Each backend returns the text layer of every page of a DocumentBuffer.
+extract_page_texts() tries the available engines in preference order
+(fastest first) and reports which one produced the text, falling through
+to the next engine when one cannot read a document; PDF_TEXT_BACKEND=<name>
+moves one engine to the front.
+
+Optional engines are imported on first use so they cost nothing when
+absent: pypdfium2, pdftotext (ships with Poppler) and pdfminer.six.
+"""
+import importlib.util
+import logging
+import os
+import shutil
+import subprocess
+import threading
+from typing import List, Optional, Tuple
+
+from lib.document_buffer import DocumentBuffer
+
+logger = logging.getLogger(__name__)
+
+PDFTOTEXT_TIMEOUT = 30
+
+
+class TextBackend:
+    """Interface: name, available() and page_texts(doc) -> one string per page (raises on failure)."""
+
+    name = ''
+
+    def available(self) -> bool:
+        raise NotImplementedError
+
+    def page_texts(self, doc: DocumentBuffer) -> List[str]:
+        raise NotImplementedError
+
+
+class PdfiumBackend(TextBackend):
+    name = 'pypdfium2'
+
+    def available(self) -> bool:
+        return importlib.util.find_spec('pypdfium2') is not None
+
+    def page_texts(self, doc: DocumentBuffer) -> List[str]:
+        import pypdfium2 as pdfium
+        pdf = pdfium.PdfDocument(doc.path or doc.reader())
+        try:
+            texts = []
+            for page in pdf:
+                textpage = page.get_textpage()
+                texts.append(textpage.get_text_bounded().replace('\r\n', '\n'))
+                textpage.close()
+                page.close()
+            return texts
+        finally:
+            pdf.close()
+
+
+class PdftotextBackend(TextBackend):
+    name = 'pdftotext'
+
+    def _command(self) -> Optional[str]:
+        poppler = os.getenv('POPPLER_PATH') or ''
+        for exe in ('pdftotext.exe', 'pdftotext'):
+            candidate = os.path.join(poppler, exe) if poppler else ''
+            if candidate and os.path.exists(candidate):
+                return candidate
+        return shutil.which('pdftotext')
+
+    def available(self) -> bool:
+        return self._command() is not None
+
+    def page_texts(self, doc: DocumentBuffer) -> List[str]:
+        with doc.on_disk() as path:
+            out = subprocess.run([self._command(), '-q', '-enc', 'UTF-8', path, '-'],
+                                 capture_output=True, timeout=PDFTOTEXT_TIMEOUT, check=True).stdout
+        # Pages are separated (and terminated) by form feeds
+        pages = out.decode('utf-8', errors='replace').split('\f')
+        if pages and not pages[-1].strip():
+            pages.pop()
+        return pages
+
+
+class PdfminerBackend(TextBackend):
+    name = 'pdfminer'
+
+    def available(self) -> bool:
+        return importlib.util.find_spec('pdfminer') is not None
+
+    def page_texts(self, doc: DocumentBuffer) -> List[str]:
+        from pdfminer.high_level import extract_pages
+        from pdfminer.layout import LTTextContainer
+        return [''.join(el.get_text() for el in page if isinstance(el, LTTextContainer))
+                for page in extract_pages(doc.reader())]
+
+
+class PyPDF2Backend(TextBackend):
+    name = 'pypdf2'
+
+    def available(self) -> bool:
+        return importlib.util.find_spec('PyPDF2') is not None
+
+    def page_texts(self, doc: DocumentBuffer) -> List[str]:
+        import PyPDF2
+        reader = PyPDF2.PdfReader(doc.reader())
+        texts = []
+        for page in reader.pages:
+            try:
+                texts.append(page.extract_text() or '')
+            except Exception:
+                texts.append('')
+        return texts
+
+
+# Preference order, fastest first (see benchmarks/text_backend_bench.py). pdfminer is
+# slower than PyPDF2 but more tolerant of odd layouts, so it is the last resort.
+BACKENDS: List[TextBackend] = [PdfiumBackend(), PdftotextBackend(), PyPDF2Backend(), PdfminerBackend()]
+
+_available = None
+_available_lock = threading.Lock()
+_warned = set()
+
+
+def available_backends(refresh: bool = False) -> List[TextBackend]:
+    """Installed engines in preference order (probed once per process)."""
+    global _available
+    if _available is None or refresh:
+        with _available_lock:
+            if _available is None or refresh:
+                _available = [b for b in BACKENDS if b.available()]
+    return _available
+
+
+def select_backends(preferred: Optional[str] = None) -> List[TextBackend]:
+    """Engines to try, with `preferred` (or PDF_TEXT_BACKEND) first when it is installed."""
+    backends = list(available_backends())
+    name = (preferred or os.getenv('PDF_TEXT_BACKEND') or '').strip().lower()
+    if name:
+        chosen = [b for b in backends if b.name == name]
+        if chosen:
+            backends.remove(chosen[0])
+            backends.insert(0, chosen[0])
+        elif name not in _warned:
+            _warned.add(name)
+            logger.warning('Text backend %r is not installed; using %s', name, [b.name for b in backends])
+    return backends
+
+
+def extract_page_texts(doc: DocumentBuffer, preferred: Optional[str] = None) -> Tuple[Optional[List[str]], Optional[str]]:
+    """
+    Per-page text layer and the name of the engine that produced it.
+
+    Falls through to the next engine when one fails on a document; returns
+    (None, None) when no engine can read it.
+    """
+    for backend in select_backends(preferred):
+        try:
+            return backend.page_texts(doc), backend.name
+        except Exception as e:
+            logger.debug('text backend %s failed: %s', backend.name, e)
+    return None, None
+
+
+def page_count(doc: DocumentBuffer) -> Optional[int]:
+    """Number of pages without extracting any text (None if unreadable)."""
+    try:
+        import pypdfium2 as pdfium
+        pdf = pdfium.PdfDocument(doc.path or doc.reader())
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+    except Exception:
+        pass
+    try:
+        import PyPDF2
+        return len(PyPDF2.PdfReader(doc.reader()).pages)
+    except Exception:
+        return None
@@ -0,0 +1,140 @@
+"""Monotonic stage timers with per-request collection and process-wide histograms.
+
+Framework-free so lib/pdf_parser can use it; middleware/instrumentation.py
+hooks it into Flask (Server-Timing header, log lines, /metrics).
+"""
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# metric kind -> (Prometheus family name, label key)
+METRIC_FAMILIES = {
+    'stage': ('eligify_stage_duration_seconds', 'stage'),
+    'request': ('eligify_request_duration_seconds', 'endpoint'),
+}
+
+_collector: contextvars.ContextVar = contextvars.ContextVar('timing_collector', default=None)
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.count += 1
+        self.sum += seconds
+        for i, upper in enumerate(self.buckets):
+            if seconds <= upper:
+                self.counts[i] += 1
+
+
+_registry: Dict[Tuple[str, str], Histogram] = {}
+_registry_lock = threading.Lock()
+
+
+def observe(name: str, seconds: float, kind: str = 'stage') -> None:
+    """Record a duration in the process histogram and the active collector."""
+    with _registry_lock:
+        hist = _registry.get((kind, name))
+        if hist is None:
+            hist = _registry[(kind, name)] = Histogram()
+        hist.observe(seconds)
+    if kind == 'stage':
+        entries = _collector.get()
+        if entries is not None:
+            entries.append((name, seconds))
+
+
+@contextmanager
+def stage(name: str):
+    """Time the enclosed block as pipeline stage `name`."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start)
+
+
+def timed(name: str):
+    """Decorator form of stage()."""
+    def decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return f(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def start_collection() -> List[Tuple[str, float]]:
+    """Start collecting stage timings for the current context (e.g. one request)."""
+    entries = []
+    _collector.set(entries)
+    return entries
+
+
+def stop_collection() -> List[Tuple[str, float]]:
+    """Stop collecting and return the (stage, seconds) entries recorded so far."""
+    entries = _collector.get() or []
+    _collector.set(None)
+    return entries
+
+
+def current_collection() -> Optional[List[Tuple[str, float]]]:
+    return _collector.get()
+
+
+def summarize(entries) -> Dict[str, Dict[str, float]]:
+    """Aggregate collected entries into {stage: {'count', 'total'}} in first-seen order."""
+    out: Dict[str, Dict[str, float]] = {}
+    for name, seconds in entries:
+        agg = out.setdefault(name, {'count': 0, 'total': 0.0})
+        agg['count'] += 1
+        agg['total'] += seconds
+    return out
+
+
+def snapshot() -> Dict[Tuple[str, str], Dict[str, float]]:
+    """Copy of the process histograms as {(kind, name): {'count', 'sum'}}."""
+    with _registry_lock:
+        return {k: {'count': h.count, 'sum': h.sum} for k, h in _registry.items()}
+
+
+def reset() -> None:
+    with _registry_lock:
+        _registry.clear()
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render_prometheus() -> str:
+    """Render all histograms in the Prometheus text exposition format."""
+    with _registry_lock:
+        items = sorted(_registry.items())
+        lines = []
+        for kind, (family, label) in METRIC_FAMILIES.items():
+            family_items = [(name, h) for (k, name), h in items if k == kind]
+            if not family_items:
+                continue
+            lines.append(f'# HELP {family} Duration in seconds by {label}.')
+            lines.append(f'# TYPE {family} histogram')
+            for name, h in family_items:
+                lv = _escape(name)
+                for upper, count in zip(h.buckets, h.counts):
+                    lines.append(f'{family}_bucket{{{label}="{lv}",le="{upper:g}"}} {count}')
+                lines.append(f'{family}_bucket{{{label}="{lv}",le="+Inf"}} {h.count}')
+                lines.append(f'{family}_sum{{{label}="{lv}"}} {h.sum:.6f}')
+                lines.append(f'{family}_count{{{label}="{lv}"}} {h.count}')
+    return '\n'.join(lines) + '\n'
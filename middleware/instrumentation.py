@@ -0,0 +1,72 @@
+"""Request timing: Server-Timing header, structured log lines and /metrics.
+
+Environment:
+- METRICS_TOKEN: enables /metrics for scrapers sending `Authorization: Bearer <token>`
+  (unset: /metrics answers 404)
+"""
+import hmac
+import json
+import logging
+import os
+import time
+from flask import request, g, Response, abort
+from lib import timing
+
+logger = logging.getLogger('eligify.timing')
+
+
+def _server_timing_header(summary: dict, total: float) -> str:
+    parts = []
+    for name, agg in summary.items():
+        token = name.replace('.', '-').replace(':', '-')
+        parts.append(f'{token};dur={agg["total"] * 1000.0:.1f};desc="x{agg["count"]}"')
+    parts.append(f'total;dur={total * 1000.0:.1f}')
+    return ', '.join(parts)
+
+
+def _authorized(token: str) -> bool:
+    scheme, _, supplied = (request.headers.get('Authorization') or '').partition(' ')
+    return scheme.lower() == 'bearer' and hmac.compare_digest(supplied.strip().encode(), token.encode())
+
+
+def init_instrumentation(app):
+    """Time every request and expose per-stage histograms at /metrics (only with METRICS_TOKEN)."""
+    metrics_token = os.environ.get('METRICS_TOKEN', '')
+
+    @app.before_request
+    def _start_timing():
+        g._timing_start = time.perf_counter()
+        timing.start_collection()
+
+    @app.after_request
+    def _finish_timing(response):
+        start = g.pop('_timing_start', None)
+        entries = timing.stop_collection()
+        if start is None:
+            return response
+        total = time.perf_counter() - start
+        endpoint = request.endpoint or 'unmatched'
+        timing.observe(endpoint, total, kind='request')
+        summary = timing.summarize(entries)
+        response.headers['Server-Timing'] = _server_timing_header(summary, total)
+        if summary or total >= 0.5:
+            logger.info(json.dumps({
+                'event': 'request_timing',
+                'endpoint': endpoint,
+                'method': request.method,
+                'status': response.status_code,
+                'total_ms': round(total * 1000.0, 2),
+                'stages': {k: {'count': v['count'], 'ms': round(v['total'] * 1000.0, 2)} for k, v in summary.items()},
+            }))
+        return response
+
+    def metrics():
+        # Route and stage latencies are internal: off unless a scrape token is configured
+        if not metrics_token:
+            abort(404)
+        if not _authorized(metrics_token):
+            return Response('Unauthorized\n', status=401, mimetype='text/plain',
+                            headers={'WWW-Authenticate': 'Bearer'})
+        return Response(timing.render_prometheus(), mimetype='text/plain; version=0.0.4')
+
+    app.add_url_rule('/metrics', 'metrics', metrics)
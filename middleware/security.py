@@ -10,6 +10,7 @@ from werkzeug.exceptions import RequestEntityTooLarge
 # File upload security settings
 ALLOWED_EXTENSIONS = {'pdf', 'png', 'jpg', 'jpeg'}
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+MAX_CHUNKED_UPLOAD_SIZE = 50 * 1024 * 1024  # 50MB, assembled from chunks of at most MAX_FILE_SIZE
 MAX_FILENAME_LENGTH = 255
 
 
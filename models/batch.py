@@ -0,0 +1,330 @@
+"""Columnar candidate/exam containers for bulk eligibility scoring."""
+import re
+from array import array
+from datetime import date
+from typing import Iterable, List, Optional
+
+try:
+    import numpy as np  # type: ignore
+except Exception:
+    np = None
+
+from models.candidate import Candidate, CandidateRecord
+from models.exam import Exam, ExamRecord
+
+_NAME_RE = re.compile(r'^[a-zA-Z\s\-\.]+$')
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+_DOB_RE = re.compile(r'^(\d{4})-(\d{1,2})-(\d{1,2})\Z', re.ASCII)  # what strptime('%Y-%m-%d') accepts
+VALID_CATEGORIES = frozenset(['GEN', 'EWS', 'OBC-NCL', 'SC', 'ST'])
+_MONTH_DAYS = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+def _column(values) -> 'array':
+    return array('d', values)
+
+
+def _parse_dob(text: str) -> Optional[date]:
+    m = _DOB_RE.match(text)
+    if not m:
+        return None
+    try:
+        return date(int(m.group(1)), int(m.group(2)), int(m.group(3)))
+    except ValueError:
+        return None
+
+
+def _out_of_range(col: 'array', lower: float = 0.0, upper: Optional[float] = None, integer: bool = False) -> List[int]:
+    """Indices of NaN values, values outside [lower, upper] and (integer) fractional values."""
+    if np is not None:
+        a = np.asarray(col, dtype=np.float64)
+        bad = np.isnan(a) | (a < lower)
+        if upper is not None:
+            bad |= a > upper
+        if integer:
+            bad |= a != np.floor(a)
+        return np.flatnonzero(bad).tolist()
+    return [i for i, v in enumerate(col)
+            if not (lower <= v and (upper is None or v <= upper) and (not integer or float(v).is_integer()))]
+
+
+class CandidateBatch:
+    """
+    Candidates stored column-wise: strings in lists, numbers in typed arrays.
+
+    validate() applies the Candidate rules to the whole batch at once and
+    computes ages; rows are only materialized on demand via record(i).
+    """
+
+    __slots__ = ('first_names', 'emails', 'categories', 'dobs', 'dob_dates',
+                 'p10', 'p12', 'ug_cgpa', 'ages', 'errors')
+
+    def __init__(self, first_names: List[str], dobs: List[str], emails: List[str], categories: List[str],
+                 p10: Iterable[float], p12: Iterable[float], ug_cgpa: Iterable[float]):
+        self.first_names = list(first_names)
+        self.dobs = list(dobs)
+        # Parsed dates of birth, filled in by validate() (None where invalid)
+        self.dob_dates: List[Optional[date]] = [None] * len(self.dobs)
+        self.emails = list(emails)
+        self.categories = list(categories)
+        self.p10 = _column(p10)
+        self.p12 = _column(p12)
+        self.ug_cgpa = _column(ug_cgpa)
+        self.ages = array('l', [-1] * len(self.first_names))
+        self.errors: Optional[List[Optional[str]]] = None
+
+    def __len__(self) -> int:
+        return len(self.first_names)
+
+    @classmethod
+    def from_dicts(cls, rows: Iterable[dict]) -> 'CandidateBatch':
+        """Create a batch from dicts shaped like Candidate.from_dict input (not yet validated)."""
+        names, dobs, emails, cats, p10, p12, cgpa = [], [], [], [], [], [], []
+        for data in rows:
+            names.append(str(data.get('first_name', '') or '').strip())
+            dobs.append(str(data.get('dob', '') or ''))
+            emails.append(str(data.get('email', '') or '').strip().lower())
+            cats.append(str(data.get('category', '') or ''))
+            p10.append(_to_float(data.get('p10', 0)))
+            p12.append(_to_float(data.get('p12', 0)))
+            cgpa.append(_to_float(data.get('ug_cgpa', 0)))
+        return cls(names, dobs, emails, cats, p10, p12, cgpa)
+
+    @classmethod
+    def from_profiles(cls, profiles: Iterable, today: Optional[date] = None) -> 'CandidateBatch':
+        """
+        Create a batch from stored CandidateProfile rows (or row tuples with the same attributes).
+
+        Rows are scored as stored: every row is marked valid, so results line
+        up one-to-one with `profiles`, and only ages are computed. Nothing is
+        re-checked; /api/candidate-profile stores scores without validating
+        them, and an out-of-range value is compared with the thresholds as is.
+        """
+        today = today or date.today()
+        names, dob_dates, cats, p10, p12, cgpa, ages = [], [], [], [], [], [], []
+        for p in profiles:
+            dob = p.dob if isinstance(p.dob, date) else date.fromisoformat(str(p.dob))
+            names.append(p.first_name)
+            dob_dates.append(dob)
+            cats.append(p.category)
+            p10.append(p.p10)
+            p12.append(p.p12)
+            cgpa.append(p.ug_cgpa)
+            ages.append(today.year - dob.year - ((today.month, today.day) < (dob.month, dob.day)))
+        batch = cls(names, [d.isoformat() for d in dob_dates], [''] * len(names), cats, p10, p12, cgpa)
+        batch.ages = array('l', ages)
+        batch.dob_dates = dob_dates
+        batch.errors = [None] * len(names)
+        return batch
+
+    def validate(self, today: Optional[date] = None) -> List[Optional[str]]:
+        """
+        Validate every row with the Candidate rules and fill in ages.
+
+        Returns:
+            Per-row error message (same text Candidate.validate raises) or None
+        """
+        today = today or date.today()
+        n = len(self)
+        row_errors: List[List[str]] = [[] for _ in range(n)]
+
+        for i in range(n):
+            name = self.first_names[i]
+            errs = row_errors[i]
+            if not name:
+                errs.append("First name is required and must be a string")
+            elif len(name.strip()) < 2:
+                errs.append("First name must be at least 2 characters")
+            elif len(name) > 100:
+                errs.append("First name must be less than 100 characters")
+            elif not _NAME_RE.match(name):
+                errs.append("First name contains invalid characters")
+
+            email = self.emails[i]
+            if not email:
+                errs.append("Email is required")
+            elif not _EMAIL_RE.match(email):
+                errs.append("Invalid email format")
+            elif len(email) > 100:
+                errs.append("Email must be less than 100 characters")
+
+            if self.categories[i] not in VALID_CATEGORIES:
+                errs.append(f"Category must be one of: {', '.join(['GEN', 'EWS', 'OBC-NCL', 'SC', 'ST'])}")
+
+        invalid, future, implausible = self._check_dobs(today)
+        for i in invalid:
+            row_errors[i].append("Invalid date format. Use YYYY-MM-DD")
+        for i in future:
+            row_errors[i].append("Date of birth cannot be in the future")
+        for i in implausible:
+            row_errors[i].append("Invalid date of birth")
+        for i in _out_of_range(self.p10, upper=100.0):
+            row_errors[i].append("10th percentage must be between 0 and 100")
+        for i in _out_of_range(self.p12, upper=100.0):
+            row_errors[i].append("12th percentage must be between 0 and 100")
+        for i in _out_of_range(self.ug_cgpa, upper=10.0):
+            row_errors[i].append("UG CGPA must be between 0 and 10")
+
+        self.errors = ["; ".join(e) if e else None for e in row_errors]
+        return self.errors
+
+    def _check_dobs(self, today: date):
+        """
+        Parse dates of birth into dob_dates and fill in ages.
+
+        With NumPy, zero-padded YYYY-MM-DD strings are decoded and checked as
+        whole columns; other shapes (unpadded month or day, non-ASCII digits)
+        go through _DOB_RE row by row.
+
+        Returns:
+            (rows with an invalid date, rows born after today, rows aged outside 0-150 years)
+        """
+        n = len(self)
+        if np is None:
+            invalid, future, implausible = [], [], []
+            for i in range(n):
+                dob_date = self.dob_dates[i] = _parse_dob(self.dobs[i])
+                if dob_date is None:
+                    invalid.append(i)
+                    continue
+                if dob_date > today:
+                    future.append(i)
+                age_calc = (today - dob_date).days // 365
+                if age_calc < 0 or age_calc > 150:
+                    implausible.append(i)
+                self.ages[i] = today.year - dob_date.year - ((today.month, today.day) < (dob_date.month, dob_date.day))
+            return invalid, future, implausible
+
+        codes = np.array([s if len(s) == 10 else '' for s in self.dobs], dtype='U10').view(np.uint32).reshape(n, 10)
+        digits = codes[:, [0, 1, 2, 3, 5, 6, 8, 9]].astype(np.int64) - ord('0')
+        ok = ((digits >= 0) & (digits <= 9)).all(axis=1) & (codes[:, 4] == ord('-')) & (codes[:, 7] == ord('-'))
+        year = digits[:, 0] * 1000 + digits[:, 1] * 100 + digits[:, 2] * 10 + digits[:, 3]
+        month = digits[:, 4] * 10 + digits[:, 5]
+        day = digits[:, 6] * 10 + digits[:, 7]
+        leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+        month_len = np.array(_MONTH_DAYS)[np.clip(month, 1, 12) - 1] + ((month == 2) & leap)
+        ok &= (year >= 1) & (month >= 1) & (month <= 12) & (day >= 1) & (day <= month_len)
+        for i in np.flatnonzero(~ok).tolist():
+            dob_date = _parse_dob(self.dobs[i])
+            if dob_date is not None:
+                ok[i] = True
+                year[i], month[i], day[i] = dob_date.year, dob_date.month, dob_date.day
+
+        idx = np.flatnonzero(ok)
+        year, month, day = year[idx], month[idx], day[idx]
+        dates = ((year - 1970).astype('M8[Y]') + (month - 1).astype('m8[M]')).astype('M8[D]') + (day - 1).astype('m8[D]')
+        dob_dates = np.full(n, None, dtype=object)
+        dob_dates[idx] = dates.astype(object)
+        self.dob_dates = dob_dates.tolist()
+        days = np.datetime64(today, 'D') - dates
+        years = days.astype(np.int64) // 365
+        ages = np.frombuffer(self.ages, dtype=np.int64 if self.ages.itemsize == 8 else np.int32)
+        ages[idx] = today.year - year - (month * 100 + day > today.month * 100 + today.day)
+        return (np.flatnonzero(~ok).tolist(), idx[days.astype(np.int64) < 0].tolist(),
+                idx[(years < 0) | (years > 150)].tolist())
+
+    def valid_indices(self) -> List[int]:
+        if self.errors is None:
+            self.validate()
+        return [i for i, e in enumerate(self.errors) if e is None]
+
+    def record(self, i: int) -> CandidateRecord:
+        """Materialize row i as a slotted CandidateRecord."""
+        age = self.ages[i]
+        return CandidateRecord(self.first_names[i], self.dobs[i], self.emails[i], self.categories[i],
+                               self.p10[i], self.p12[i], self.ug_cgpa[i], age if age >= 0 else None)
+
+    def to_candidate(self, i: int) -> Candidate:
+        """Materialize row i as a fully validated Candidate."""
+        return Candidate(self.first_names[i], self.dobs[i], self.emails[i], self.categories[i],
+                         self.p10[i], self.p12[i], self.ug_cgpa[i])
+
+
+class ExamTable:
+    """Eligibility thresholds for many exams as parallel columns."""
+
+    __slots__ = ('exams', 'exam_ids', 'min_age', 'max_age', 'min_10', 'min_12', 'min_cgpa')
+
+    def __init__(self, exams: List[Exam]):
+        self.exams = list(exams)
+        self.exam_ids = array('q', [e.exam_id for e in self.exams])
+        self.min_age = _column(e.min_age for e in self.exams)
+        self.max_age = _column(e.max_age for e in self.exams)
+        self.min_10 = _column(e.min_10_percent for e in self.exams)
+        self.min_12 = _column(e.min_12_percent for e in self.exams)
+        self.min_cgpa = _column(e.min_ug_cgpa for e in self.exams)
+
+    def __len__(self) -> int:
+        return len(self.exams)
+
+    def validate(self) -> List[Optional[str]]:
+        """
+        Validate every exam with the Exam rules, range checks on whole columns.
+
+        Exams without an exam_name (e.g. ExamRecord rows) skip the name rule.
+
+        Returns:
+            Per-exam error message (same text Exam.validate raises) or None
+        """
+        row_errors: List[List[str]] = [[] for _ in range(len(self))]
+        checks = [
+            (_out_of_range(self.exam_ids, lower=1, integer=True), "Exam ID must be a positive integer"),
+            ([i for i, e in enumerate(self.exams)
+              if hasattr(e, 'exam_name') and (not e.exam_name or len(e.exam_name.strip()) < 3)],
+             "Exam name must be at least 3 characters"),
+            (_out_of_range(self.min_age, integer=True), "Minimum age must be a non-negative integer"),
+            (self._max_age_below_min(), "Maximum age must be greater than or equal to minimum age"),
+            (_out_of_range(self.min_10, upper=100.0), "Minimum 10th percentage must be between 0 and 100"),
+            (_out_of_range(self.min_12, upper=100.0), "Minimum 12th percentage must be between 0 and 100"),
+            (_out_of_range(self.min_cgpa, upper=10.0), "Minimum UG CGPA must be between 0 and 10"),
+        ]
+        for rows, message in checks:
+            for i in rows:
+                row_errors[i].append(message)
+        return ["; ".join(e) if e else None for e in row_errors]
+
+    def _max_age_below_min(self) -> List[int]:
+        if np is not None:
+            lo = np.frombuffer(self.min_age, dtype=np.float64)
+            hi = np.frombuffer(self.max_age, dtype=np.float64)
+            return np.flatnonzero(~(hi >= lo) | (hi != np.floor(hi))).tolist()
+        return [i for i, (lo, hi) in enumerate(zip(self.min_age, self.max_age))
+                if not (hi >= lo and float(hi).is_integer())]
+
+    def records(self) -> List[ExamRecord]:
+        return [ExamRecord.from_exam(e) for e in self.exams]
+
+    def eligible_indices(self, batch: CandidateBatch, rows: Optional[List[int]] = None) -> List[List[int]]:
+        """
+        For each candidate row, the indices of exams it is eligible for.
+
+        - rows: candidate rows to score (defaults to the batch's valid rows)
+        """
+        if rows is None:
+            rows = batch.valid_indices()
+        if not rows or not self.exams:
+            return [[] for _ in rows]
+        if np is not None:
+            idx = np.asarray(rows, dtype=np.intp)
+            age = np.frombuffer(batch.ages, dtype=np.int64 if batch.ages.itemsize == 8 else np.int32)[idx].astype(np.float64)[:, None]
+            p10 = np.frombuffer(batch.p10, dtype=np.float64)[idx][:, None]
+            p12 = np.frombuffer(batch.p12, dtype=np.float64)[idx][:, None]
+            cgpa = np.frombuffer(batch.ug_cgpa, dtype=np.float64)[idx][:, None]
+            mask = ((age >= np.frombuffer(self.min_age, dtype=np.float64))
+                    & (age <= np.frombuffer(self.max_age, dtype=np.float64))
+                    & (p10 >= np.frombuffer(self.min_10, dtype=np.float64))
+                    & (p12 >= np.frombuffer(self.min_12, dtype=np.float64))
+                    & (cgpa >= np.frombuffer(self.min_cgpa, dtype=np.float64)))
+            return [np.flatnonzero(row).tolist() for row in mask]
+        records = self.records()
+        out = []
+        for i in rows:
+            c = batch.record(i)
+            out.append([j for j, r in enumerate(records) if r.is_eligible(c)])
+        return out
+
+
+def _to_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float('nan')
@@ -107,3 +107,20 @@ class Candidate:
             'ug_cgpa': self.ug_cgpa,
             'age': self.age
         }
+
+
+@dataclass(frozen=True, slots=True)
+class CandidateRecord:
+    """Slotted, immutable candidate row for bulk scoring.
+
+    Construction does no validation; rows come from a CandidateBatch that
+    validated them once per batch.
+    """
+    first_name: str
+    dob: str
+    email: str
+    category: str
+    p10: float
+    p12: float
+    ug_cgpa: float
+    age: Optional[int] = None
@@ -1,9 +1,46 @@
-from sqlalchemy.orm import declarative_base, relationship
-from sqlalchemy import Column, Integer, String, Date, Float, DateTime, ForeignKey, Text, UniqueConstraint
+import json
+import zlib
+from sqlalchemy.orm import declarative_base, relationship, deferred
+from sqlalchemy import Column, Integer, String, Date, Float, DateTime, ForeignKey, Text, UniqueConstraint, LargeBinary
+from sqlalchemy.types import TypeDecorator
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func
 
 Base = declarative_base()
 
+
+class CompactJSON(TypeDecorator):
+    """JSON text stored as zlib bytes (JSONB on PostgreSQL).
+
+    The Python side stays a JSON string so callers keep using json.dumps/loads.
+    Legacy rows written as plain Text are returned unchanged.
+    """
+    impl = LargeBinary
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == 'postgresql':
+            return dialect.type_descriptor(JSONB())
+        return dialect.type_descriptor(LargeBinary())
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if dialect.name == 'postgresql':
+            return json.loads(value) if isinstance(value, str) else value
+        if not isinstance(value, str):
+            value = json.dumps(value)
+        return zlib.compress(value.encode('utf-8'), 6)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, str):
+            return value
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return zlib.decompress(bytes(value)).decode('utf-8')
+        return json.dumps(value)
+
 class User(Base):
     __tablename__ = 'users'
     sub = Column(String(64), primary_key=True)
@@ -38,7 +75,7 @@ class ParsedDocument(Base):
     __tablename__ = 'parsed_documents'
     id = Column(Integer, primary_key=True, autoincrement=True)
     upload_id = Column(Integer, ForeignKey('document_uploads.id'), nullable=False)
-    parsed_json = Column(Text, nullable=False)
+    parsed_json = deferred(Column(CompactJSON, nullable=False))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
 class AcademicVerification(Base):
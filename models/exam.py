@@ -90,3 +90,31 @@ class Exam:
             'subjects': self.subjects,
             'documents': self.documents
         }
+
+
+@dataclass(frozen=True, slots=True)
+class ExamRecord:
+    """Slotted, immutable eligibility criteria for bulk scoring.
+
+    Unlike Exam it skips __post_init__ validation; build it from an
+    already-validated Exam (or validate in bulk via ExamTable).
+    """
+    exam_id: int
+    min_age: int
+    max_age: int
+    min_10_percent: float
+    min_12_percent: float
+    min_ug_cgpa: float
+
+    @classmethod
+    def from_exam(cls, exam: Exam) -> 'ExamRecord':
+        """Create ExamRecord from a validated Exam."""
+        return cls(exam.exam_id, exam.min_age, exam.max_age,
+                   exam.min_10_percent, exam.min_12_percent, exam.min_ug_cgpa)
+
+    def is_eligible(self, candidate) -> bool:
+        """Check if a candidate is eligible for this exam."""
+        return (self.min_age <= candidate.age <= self.max_age
+                and candidate.p10 >= self.min_10_percent
+                and candidate.p12 >= self.min_12_percent
+                and candidate.ug_cgpa >= self.min_ug_cgpa)
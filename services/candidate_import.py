@@ -0,0 +1,204 @@
+"""Streaming bulk import of candidate profiles from CSV or JSONL."""
+import csv
+import io
+import json
+from typing import IO, Iterator, List, Optional, Tuple, Union
+
+from models.batch import CandidateBatch
+from models.db_models import CandidateProfile
+from services.db import SessionLocal
+from services.eligibility_service import EligibilityService
+from services.exam_repository import ExamRepository
+
+IMPORT_FORMATS = ('csv', 'jsonl')
+DEFAULT_CHUNK_SIZE = 500
+MAX_IMPORT_ROWS = 50000
+
+
+def detect_format(filename: Optional[str], requested: Optional[str] = None) -> Optional[str]:
+    """Pick the import format from an explicit parameter or the file extension."""
+    fmt = (requested or '').lower().strip()
+    if fmt in ('ndjson', 'json'):
+        fmt = 'jsonl'
+    if fmt:
+        return fmt if fmt in IMPORT_FORMATS else None
+    name = (filename or '').lower()
+    if name.endswith('.csv'):
+        return 'csv'
+    if name.endswith(('.jsonl', '.ndjson')):
+        return 'jsonl'
+    return None
+
+
+def _text_stream(stream: Union[IO[bytes], IO[str]]) -> IO[str]:
+    if isinstance(stream, io.TextIOBase):
+        return stream
+    # Undecodable bytes become lone surrogates, so one bad row is reported instead of ending the import
+    return io.TextIOWrapper(stream, encoding='utf-8-sig', errors='surrogateescape', newline='')
+
+
+def _valid_utf8(s: str) -> bool:
+    try:
+        s.encode('utf-8')
+    except UnicodeEncodeError:
+        return False
+    return True
+
+
+def iter_rows(stream, fmt: str) -> Iterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """
+    Yield (row_number, data, parse_error) one row at a time.
+
+    Rows are numbered from 1 (CSV header excluded); blank JSONL lines are skipped.
+    Malformed rows (invalid UTF-8, bad CSV quoting, extra columns) come back
+    as parse errors and reading continues with the next row.
+    """
+    text = _text_stream(stream)
+    if fmt == 'csv':
+        reader = csv.DictReader(text)
+        n = 0
+        while True:
+            n += 1
+            try:
+                row = next(reader)
+            except StopIteration:
+                return
+            except csv.Error as e:
+                yield n, None, f'Malformed CSV row: {e}'
+                continue
+            except UnicodeDecodeError:
+                # Only text streams handed in by the caller decode strictly; nothing after this is readable
+                yield n, None, 'Invalid UTF-8'
+                return
+            if None in row:
+                # DictReader files fields beyond the header under the key None
+                yield n, None, 'Unexpected extra columns'
+                continue
+            data = {(k or '').strip().lower(): (v or '').strip() for k, v in row.items()}
+            if not all(_valid_utf8(k) and _valid_utf8(v) for k, v in data.items()):
+                yield n, None, 'Invalid UTF-8'
+                continue
+            yield n, data, None
+    n = 0
+    while True:
+        try:
+            line = next(text)
+        except StopIteration:
+            return
+        except UnicodeDecodeError:
+            yield n + 1, None, 'Invalid UTF-8'
+            return
+        if not line.strip():
+            continue
+        n += 1
+        if not _valid_utf8(line):
+            yield n, None, 'Invalid UTF-8'
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError:
+            yield n, None, 'Invalid JSON'
+            continue
+        if not isinstance(data, dict):
+            yield n, None, 'Each line must be a JSON object'
+            continue
+        yield n, data, None
+
+
+def _chunks(rows, size: int):
+    chunk = []
+    for item in rows:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def import_candidates(stream, fmt: str, user_sub: str, db=None,
+                      chunk_size: int = DEFAULT_CHUNK_SIZE, max_rows: int = MAX_IMPORT_ROWS) -> Iterator[dict]:
+    """
+    Validate, insert and score candidates chunk by chunk.
+
+    Only one chunk is held in memory at a time. Yields one result dict per
+    row ({'row', 'ok', 'candidate_profile_id', 'eligible_exam_ids'} or
+    {'row', 'ok': False, 'error'}) followed by a final {'summary': ...}.
+    """
+    own_session = db is None
+    db = db or SessionLocal.session_factory()
+    service = EligibilityService(ExamRepository.get_all_exams())
+    imported = failed = 0
+    truncated = False
+    try:
+        rows = iter_rows(stream, fmt)
+        for chunk in _chunks(rows, chunk_size):
+            if imported + failed + len(chunk) > max_rows:
+                chunk = chunk[:max(0, max_rows - imported - failed)]
+                truncated = True
+            parsed = [(n, data) for n, data, err in chunk if err is None]
+            results = {n: {'row': n, 'ok': False, 'error': err} for n, data, err in chunk if err is not None}
+            batch = CandidateBatch.from_dicts(data for _, data in parsed)
+            errors = batch.validate()
+            valid = [i for i, e in enumerate(errors) if e is None]
+            for i, e in enumerate(errors):
+                if e is not None:
+                    results[parsed[i][0]] = {'row': parsed[i][0], 'ok': False, 'error': e}
+            profiles: List[CandidateProfile] = []
+            for i in valid:
+                profiles.append(CandidateProfile(
+                    user_sub=user_sub, first_name=batch.first_names[i], dob=batch.dob_dates[i],
+                    category=batch.categories[i], p10=batch.p10[i], p12=batch.p12[i], ug_cgpa=batch.ug_cgpa[i],
+                ))
+            ids: List[int] = []
+            if profiles:
+                db.add_all(profiles)
+                db.flush()
+                ids = [p.id for p in profiles]
+                db.commit()
+            eligible = service.check_eligibility_batch(batch)
+            for i, pid, exams in zip(valid, ids, eligible):
+                n = parsed[i][0]
+                results[n] = {'row': n, 'ok': True, 'candidate_profile_id': pid,
+                              'eligible_exam_ids': [e.exam_id for e in exams]}
+            for n, _, _ in chunk:
+                r = results[n]
+                if r['ok']:
+                    imported += 1
+                else:
+                    failed += 1
+                yield r
+            db.expunge_all()
+            if truncated:
+                break
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        if own_session:
+            db.close()
+    yield {'summary': {'imported': imported, 'failed': failed, 'truncated': truncated}}
+
+
+def main():
+    import argparse
+    import sys
+    ap = argparse.ArgumentParser(description='Import candidate profiles from CSV or JSONL.')
+    ap.add_argument('path')
+    ap.add_argument('--user-sub', required=True, help='Owner (users.sub) of the imported profiles')
+    ap.add_argument('--format', choices=IMPORT_FORMATS)
+    ap.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    args = ap.parse_args()
+    fmt = detect_format(args.path, args.format)
+    if fmt is None:
+        ap.error('Cannot detect format; pass --format csv|jsonl')
+    from models.db_models import Base
+    from services.db import engine
+    Base.metadata.create_all(engine)
+    with open(args.path, 'rb') as f:
+        for result in import_candidates(f, fmt, args.user_sub, chunk_size=args.chunk_size):
+            sys.stdout.write(json.dumps(result) + '\n')
+
+
+if __name__ == '__main__':
+    main()
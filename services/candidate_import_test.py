@@ -0,0 +1,66 @@
+import sys, os
+ROOT = os.path.dirname(os.path.abspath(os.path.join(__file__, '..')))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+import io
+from datetime import date
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from models.db_models import Base, CandidateProfile
+from services.candidate_import import import_candidates
+
+HEADER = "first_name,email,dob,category,p10,p12,ug_cgpa\n"
+
+
+def _session():
+    engine = create_engine('sqlite://', future=True)
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine, autoflush=False, autocommit=False)()
+
+
+def _run(text, fmt='csv', **kwargs):
+    db = _session()
+    results = list(import_candidates(io.BytesIO(text.encode('utf-8')), fmt, 'u1', db=db, **kwargs))
+    return db, results[:-1], results[-1]['summary']
+
+
+def test_unpadded_dob_is_imported():
+    db, rows, summary = _run(HEADER
+                             + "Asha,asha@example.com,2001-01-05,GEN,90,91,8.5\n"
+                             + "Ravi,ravi@example.com,2001-1-5,OBC-NCL,80,82,7.9\n"
+                             + "Meena,meena@example.com,2002-12-31,SC,70,75,7.0\n")
+    assert summary == {'imported': 3, 'failed': 0, 'truncated': False}
+    assert [r['ok'] for r in rows] == [True, True, True]
+    dobs = [p.dob for p in db.query(CandidateProfile).order_by(CandidateProfile.id)]
+    assert dobs == [date(2001, 1, 5), date(2001, 1, 5), date(2002, 12, 31)]
+
+
+def test_invalid_rows_do_not_drop_valid_ones():
+    db, rows, summary = _run(HEADER
+                             + "Asha,asha@example.com,2001-1-5,GEN,90,91,8.5\n"
+                             + "Ravi,ravi@example.com,2001-13-5,GEN,80,82,7.9\n"
+                             + "Meena,not-an-email,2002-1-1,SC,70,75,7.0\n"
+                             + "Kiran,kiran@example.com,2003-2-3,ST,60,65,6.5\n", chunk_size=2)
+    assert [r['ok'] for r in rows] == [True, False, False, True]
+    assert summary['imported'] == 2 and summary['failed'] == 2
+    assert db.query(CandidateProfile).count() == 2
+
+
+def test_jsonl_unpadded_dob():
+    db, rows, summary = _run('{"first_name": "Asha", "email": "asha@example.com", "dob": "1999-7-9",'
+                             ' "category": "EWS", "p10": 88, "p12": 89, "ug_cgpa": 8.1}\n', fmt='jsonl')
+    assert rows[0]['ok'] and summary['imported'] == 1
+    assert db.query(CandidateProfile).one().dob == date(1999, 7, 9)
+
+
+def main():
+    for name, fn in sorted(globals().items()):
+        if name.startswith('test_') and callable(fn):
+            fn()
+            print(f"ok  {name}")
+
+
+if __name__ == '__main__':
+    main()
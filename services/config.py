@@ -0,0 +1,116 @@
+"""Application settings resolved once at boot and served from memory."""
+import os
+import glob
+import json
+import threading
+import time
+from typing import Dict, List, Optional
+
+
+def load_env_local(path: str) -> Dict[str, str]:
+    """Read KEY=VALUE pairs from a local env file, ignoring comments."""
+    env = {}
+    try:
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    s = line.strip()
+                    if not s or s.startswith('#'):
+                        continue
+                    if '=' in s:
+                        k, v = s.split('=', 1)
+                        env[k.strip()] = v.strip()
+    except Exception:
+        pass
+    return env
+
+
+class ClientIdResolver:
+    """
+    Resolve the Google OAuth client id from the environment or client_secret_*.json.
+
+    The value is resolved once; afterwards the secret files are re-checked by
+    mtime at most every `check_interval` seconds, so page renders in between
+    do no filesystem I/O. A non-positive interval disables watching.
+    """
+
+    def __init__(self, search_dirs: List[str], check_interval: float = 30.0):
+        self.search_dirs = []
+        for d in search_dirs:
+            d = os.path.abspath(d)
+            if d not in self.search_dirs:
+                self.search_dirs.append(d)
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._value: Optional[str] = None
+        self._env_value = os.environ.get('GOOGLE_CLIENT_ID') or None
+        self._stamps: Dict[str, float] = {}
+        self._last_check = 0.0
+        self._refresh(force=True)
+
+    def _scan(self) -> Dict[str, float]:
+        stamps = {}
+        for d in self.search_dirs:
+            for p in glob.glob(os.path.join(d, 'client_secret_*.json')):
+                try:
+                    stamps[p] = os.path.getmtime(p)
+                except OSError:
+                    continue
+        return stamps
+
+    def _load(self, paths) -> Optional[str]:
+        for p in paths:
+            try:
+                with open(p, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                client_id = (data.get('web') or {}).get('client_id')
+                if client_id:
+                    return client_id
+            except Exception:
+                continue
+        return None
+
+    def _refresh(self, force: bool = False) -> None:
+        with self._lock:
+            self._last_check = time.monotonic()
+            if self._env_value:
+                self._value = self._env_value
+                return
+            stamps = self._scan()
+            if force or stamps != self._stamps:
+                self._stamps = stamps
+                self._value = self._load(stamps.keys())
+
+    def get(self) -> Optional[str]:
+        """Return the cached client id, re-checking files when the interval elapsed."""
+        if self._env_value:
+            return self._env_value
+        if self.check_interval > 0 and time.monotonic() - self._last_check >= self.check_interval:
+            self._refresh()
+        return self._value
+
+
+def init_config(app, project_root: str) -> ClientIdResolver:
+    """Load .env.local, resolve GOOGLE_CLIENT_ID and attach the resolver to the app."""
+    for k, v in load_env_local(os.path.join(project_root, '.env.local')).items():
+        os.environ.setdefault(k, v)
+    try:
+        interval = float(os.environ.get('CONFIG_WATCH_INTERVAL', '30'))
+    except ValueError:
+        interval = 30.0
+    resolver = ClientIdResolver(
+        [project_root, os.path.dirname(app.root_path), app.root_path, os.getcwd()],
+        check_interval=interval,
+    )
+    app.extensions['client_id_resolver'] = resolver
+    app.config['GOOGLE_CLIENT_ID'] = resolver.get()
+    return resolver
+
+
+def get_google_client_id() -> Optional[str]:
+    """Client id for the current app, served from the boot-time cache."""
+    from flask import current_app
+    resolver = current_app.extensions.get('client_id_resolver')
+    if resolver is None:
+        return current_app.config.get('GOOGLE_CLIENT_ID')
+    return resolver.get()
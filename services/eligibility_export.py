@@ -0,0 +1,93 @@
+"""Constant-memory export of candidate x eligible-exam results."""
+import csv
+import io
+import json
+from typing import Iterator, Optional
+
+from sqlalchemy import select
+
+from models.batch import CandidateBatch
+from models.db_models import CandidateProfile
+from services.db import SessionLocal
+from services.eligibility_service import EligibilityService
+from services.exam_repository import ExamRepository
+
+EXPORT_FORMATS = ('ndjson', 'csv')
+CSV_COLUMNS = ['candidate_profile_id', 'first_name', 'category', 'exam_id', 'exam_name']
+DEFAULT_CHUNK_SIZE = 1000
+
+
+def iter_eligibility(user_sub: str, db=None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[dict]:
+    """
+    Yield {'candidate_profile_id', 'first_name', 'category', 'eligible_exams'} per profile.
+
+    Profiles are read with yield_per (server-side cursor where supported) as
+    plain column rows, so no ORM identity map grows, and scored chunk by chunk.
+    """
+    own_session = db is None
+    db = db or SessionLocal.session_factory()
+    service = EligibilityService(ExamRepository.get_all_exams())
+    stmt = (
+        select(CandidateProfile.id, CandidateProfile.first_name, CandidateProfile.dob, CandidateProfile.category,
+               CandidateProfile.p10, CandidateProfile.p12, CandidateProfile.ug_cgpa)
+        .where(CandidateProfile.user_sub == user_sub)
+        .order_by(CandidateProfile.id)
+        .execution_options(yield_per=chunk_size)
+    )
+    try:
+        for rows in db.execute(stmt).partitions():
+            batch = CandidateBatch.from_profiles(rows)
+            for row, exams in zip(rows, service.check_eligibility_batch(batch)):
+                yield {
+                    'candidate_profile_id': row.id,
+                    'first_name': row.first_name,
+                    'category': row.category,
+                    'eligible_exams': exams,
+                }
+    finally:
+        if own_session:
+            db.close()
+
+
+def export_ndjson(results: Iterator[dict]) -> Iterator[str]:
+    """One JSON line per candidate with the ids of eligible exams."""
+    for r in results:
+        yield json.dumps({
+            'candidate_profile_id': r['candidate_profile_id'],
+            'first_name': r['first_name'],
+            'category': r['category'],
+            'eligible_exam_ids': [e.exam_id for e in r['eligible_exams']],
+        }) + '\n'
+
+
+def _csv_cell(value):
+    # Keep spreadsheet apps from treating names as formulas
+    if isinstance(value, str) and value[:1] in ('=', '+', '-', '@'):
+        return "'" + value
+    return value
+
+
+def export_csv(results: Iterator[dict]) -> Iterator[str]:
+    """One CSV row per (candidate, eligible exam) pair, header first."""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+
+    def drain() -> str:
+        out = buf.getvalue()
+        buf.seek(0)
+        buf.truncate(0)
+        return out
+
+    writer.writerow(CSV_COLUMNS)
+    yield drain()
+    for r in results:
+        for exam in r['eligible_exams']:
+            writer.writerow([r['candidate_profile_id'], _csv_cell(r['first_name']), r['category'], exam.exam_id, _csv_cell(exam.exam_name)])
+        chunk = drain()
+        if chunk:
+            yield chunk
+
+
+def export_eligibility(user_sub: str, fmt: str, db=None, chunk_size: Optional[int] = None) -> Iterator[str]:
+    results = iter_eligibility(user_sub, db=db, chunk_size=chunk_size or DEFAULT_CHUNK_SIZE)
+    return export_csv(results) if fmt == 'csv' else export_ndjson(results)
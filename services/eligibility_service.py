@@ -1,7 +1,8 @@
 """Service layer for eligibility checking business logic."""
-from typing import List
+from typing import List, Optional
 from models.candidate import Candidate
 from models.exam import Exam
+from models.batch import CandidateBatch, ExamTable
 
 
 class EligibilityService:
@@ -10,6 +11,8 @@ class EligibilityService:
     def __init__(self, exams: List[Exam]):
         """Initialize with a list of exams."""
         self.exams = exams
+        self._table: Optional[ExamTable] = None
+        self._table_source = None
     
     def check_eligibility(self, candidate: Candidate) -> List[Exam]:
         """
@@ -29,6 +32,23 @@ class EligibilityService:
         
         return eligible_exams
     
+    def check_eligibility_batch(self, batch: CandidateBatch) -> List[List[Exam]]:
+        """
+        Check eligibility for every valid row of a candidate batch at once.
+
+        Args:
+            batch: CandidateBatch; validated here if it has not been yet
+
+        Returns:
+            One list of eligible Exam objects per valid row, in
+            batch.valid_indices() order
+        """
+        if self._table is None or self._table_source is not self.exams:
+            self._table = ExamTable(self.exams)
+            self._table_source = self.exams
+        table = self._table
+        return [[table.exams[j] for j in row] for row in table.eligible_indices(batch)]
+
     def get_all_exams(self) -> List[Exam]:
         """Get all available exams."""
         return self.exams
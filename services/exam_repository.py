@@ -170,10 +170,33 @@ class ExamRepository:
         ),
     ]
     
+    # Bumped whenever the catalogue changes; used as a cache key by renderers
+    _version = 1
+    _exam_dicts = None
+
     @classmethod
     def get_all_exams(cls) -> List[Exam]:
         """Get all exams from the repository."""
         return cls.MOCK_EXAMS.copy()
+
+    @classmethod
+    def get_exam_dicts(cls) -> List[dict]:
+        """Get all exams serialized with to_dict(), cached per catalogue version."""
+        if cls._exam_dicts is None:
+            cls._exam_dicts = [exam.to_dict() for exam in cls.MOCK_EXAMS]
+        return cls._exam_dicts
+
+    @classmethod
+    def catalogue_version(cls) -> int:
+        """Get the current catalogue version."""
+        return cls._version
+
+    @classmethod
+    def replace_all(cls, exams: List[Exam]) -> None:
+        """Replace the catalogue and invalidate cached serializations."""
+        cls.MOCK_EXAMS = list(exams)
+        cls._exam_dicts = None
+        cls._version += 1
     
     @classmethod
     def get_exam_by_id(cls, exam_id: int) -> Exam:
@@ -0,0 +1,56 @@
+"""Render cache for the landing page."""
+import os
+from typing import Optional
+from flask import current_app, render_template
+from services.exam_repository import ExamRepository
+
+LANDING_TEMPLATE = 'index.html'
+
+
+class LandingPageCache:
+    """
+    Cache the anonymous landing page keyed by catalogue version and template mtime.
+
+    Signed-in users still get a per-request render (the user block is spread
+    through the page), but reuse the pre-serialized exam list.
+    """
+
+    def __init__(self, app):
+        self.template_path = os.path.join(app.root_path, app.template_folder or 'templates', LANDING_TEMPLATE)
+        self._entry = None  # (key, html), swapped atomically
+        self._mtime: Optional[float] = None
+
+    def _template_mtime(self) -> Optional[float]:
+        # With auto-reload off the template cannot change under us; stat once
+        if self._mtime is not None and not current_app.jinja_env.auto_reload:
+            return self._mtime
+        try:
+            self._mtime = os.path.getmtime(self.template_path)
+        except OSError:
+            self._mtime = None
+        return self._mtime
+
+    def render(self, user: Optional[dict], google_client_id: Optional[str]) -> str:
+        exams_data = ExamRepository.get_exam_dicts()
+        if user:
+            return render_template(LANDING_TEMPLATE, exams=exams_data, user=user, google_client_id=google_client_id)
+        key = (ExamRepository.catalogue_version(), self._template_mtime(), google_client_id)
+        entry = self._entry
+        if entry is not None and entry[0] == key:
+            return entry[1]
+        html = render_template(LANDING_TEMPLATE, exams=exams_data, user=None, google_client_id=google_client_id)
+        self._entry = (key, html)
+        return html
+
+
+def init_page_cache(app) -> LandingPageCache:
+    cache = LandingPageCache(app)
+    app.extensions['landing_page_cache'] = cache
+    return cache
+
+
+def render_landing_page(user: Optional[dict], google_client_id: Optional[str]) -> str:
+    cache = current_app.extensions.get('landing_page_cache')
+    if cache is None:
+        return render_template(LANDING_TEMPLATE, exams=ExamRepository.get_exam_dicts(), user=user, google_client_id=google_client_id)
+    return cache.render(user, google_client_id)
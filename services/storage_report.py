@@ -0,0 +1,48 @@
+"""Size accounting for compactly stored parsed documents."""
+from sqlalchemy import select, func
+from services.db import SessionLocal, engine
+from models.db_models import ParsedDocument
+
+
+def _stored_size_expr():
+    if engine.dialect.name == 'postgresql':
+        return func.pg_column_size(ParsedDocument.parsed_json)
+    return func.length(ParsedDocument.parsed_json)
+
+
+def parsed_document_size_report(db=None, batch_size: int = 500) -> dict:
+    """
+    Compare the stored size of parsed_json with its uncompressed JSON size.
+
+    Rows are streamed in batches so the report never holds the whole table.
+
+    Returns:
+        Dict with row count, raw/stored byte totals and bytes saved
+    """
+    own_session = db is None
+    db = db or SessionLocal()
+    rows = 0
+    raw_bytes = 0
+    stored_bytes = 0
+    try:
+        stmt = select(_stored_size_expr(), ParsedDocument.parsed_json).execution_options(yield_per=batch_size)
+        for stored, text in db.execute(stmt):
+            rows += 1
+            stored_bytes += int(stored or 0)
+            raw_bytes += len((text or '').encode('utf-8'))
+    finally:
+        if own_session:
+            db.close()
+    saved = raw_bytes - stored_bytes
+    return {
+        'rows': rows,
+        'raw_bytes': raw_bytes,
+        'stored_bytes': stored_bytes,
+        'bytes_saved': saved,
+        'ratio': round(stored_bytes / raw_bytes, 4) if raw_bytes else None,
+    }
+
+
+if __name__ == '__main__':
+    import json
+    print(json.dumps(parsed_document_size_report(), indent=2))
@@ -0,0 +1,273 @@
+"""Chunked, resumable document uploads spooled to disk with streaming hashing."""
+import hashlib
+import json
+import os
+import re
+import secrets
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import IO, Iterator, Optional, Tuple
+
+try:
+    import fcntl  # type: ignore
+except ImportError:  # Windows
+    fcntl = None
+
+CHUNK_READ_SIZE = 64 * 1024
+SNIFF_BYTES = 16
+# Unfinished uploads can be resumed this long after their last chunk
+UPLOAD_TTL_SECONDS = 24 * 3600
+# Completed uploads stay available to parse/verify this long after completion
+COMPLETED_UPLOAD_TTL_SECONDS = 3600
+_ID_RE = re.compile(r'^[A-Za-z0-9_-]{16,64}$')
+
+# Leading bytes of the document types we accept, keyed by kind
+MAGIC_BYTES = {
+    'pdf': (b'%PDF-',),
+    'png': (b'\x89PNG\r\n\x1a\n',),
+    'jpeg': (b'\xff\xd8\xff',),
+}
+KIND_MIME = {'pdf': 'application/pdf', 'png': 'image/png', 'jpeg': 'image/jpeg', 'webp': 'image/webp'}
+
+# In-process hash state so sequential chunks never re-read the spool file
+_hashers = {}
+# Stands in for flock where fcntl is unavailable (single-process servers only)
+_fallback_lock = threading.Lock()
+
+
+class UploadError(Exception):
+    """Raised for invalid upload operations; the message is safe to return to clients."""
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+
+def sniff_kind(head: bytes) -> Optional[str]:
+    """Identify the document type from its first bytes."""
+    for kind, prefixes in MAGIC_BYTES.items():
+        if any(head.startswith(p) for p in prefixes):
+            return kind
+    # Phones often save WebP under a .jpg name; PIL reads it like the multipart path does
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'webp'
+    return None
+
+
+def upload_dir() -> str:
+    d = os.environ.get('UPLOAD_SPOOL_DIR') or os.path.join(tempfile.gettempdir(), 'eligify-uploads')
+    os.makedirs(d, exist_ok=True)
+    return d
+
+
+def _paths(upload_id: str) -> Tuple[str, str]:
+    if not upload_id or not _ID_RE.match(upload_id):
+        raise UploadError('Invalid upload id', 404)
+    base = os.path.join(upload_dir(), upload_id)
+    return base + '.json', base + '.part'
+
+
+@contextmanager
+def _locked_part(part_path: str) -> Iterator[IO[bytes]]:
+    """
+    Open the spool file read/write under an exclusive lock.
+
+    flock() serializes writers across threads and across server processes
+    (gunicorn workers), so two requests cannot both pass the offset check.
+    """
+    try:
+        f = open(part_path, 'r+b')
+    except FileNotFoundError:
+        raise UploadError('Upload not found', 404)
+    with f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            yield f
+        else:
+            with _fallback_lock:
+                yield f
+
+
+def _read_meta(upload_id: str, user_sub: str) -> dict:
+    meta_path, _ = _paths(upload_id)
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        raise UploadError('Upload not found', 404)
+    if meta.get('user_sub') != user_sub:
+        raise UploadError('Upload not found', 404)
+    return meta
+
+
+def _write_meta(upload_id: str, meta: dict) -> None:
+    meta_path, _ = _paths(upload_id)
+    tmp = meta_path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+    os.replace(tmp, meta_path)
+
+
+def _purge_stale(now: float) -> None:
+    """
+    Delete unfinished uploads untouched for UPLOAD_TTL_SECONDS and completed
+    ones older than COMPLETED_UPLOAD_TTL_SECONDS.
+    """
+    d = upload_dir()
+    min_ttl = min(UPLOAD_TTL_SECONDS, COMPLETED_UPLOAD_TTL_SECONDS)
+    for name in os.listdir(d):
+        upload_id, _, ext = name.partition('.')
+        if ext not in ('part', 'json.tmp') or not _ID_RE.match(upload_id):
+            continue
+        p = os.path.join(d, name)
+        try:
+            age = now - os.path.getmtime(p)
+            if age <= min_ttl:
+                continue
+            meta_path = os.path.join(d, upload_id + '.json')
+            if ext == 'part' and os.path.exists(meta_path):
+                age = min(age, now - os.path.getmtime(meta_path))
+                with open(meta_path, 'r', encoding='utf-8') as f:
+                    complete = json.load(f).get('complete')
+                if age <= (COMPLETED_UPLOAD_TTL_SECONDS if complete else UPLOAD_TTL_SECONDS):
+                    continue
+                os.remove(meta_path)
+            elif age <= UPLOAD_TTL_SECONDS:
+                continue
+            os.remove(p)
+        except (OSError, ValueError):
+            continue
+        _hashers.pop(upload_id, None)
+
+
+def _status(upload_id: str, meta: dict, received: int) -> dict:
+    return {
+        'upload_id': upload_id,
+        'filename': meta['filename'],
+        'size': meta['size'],
+        'offset': received,
+        'kind': meta.get('kind'),
+        'complete': bool(meta.get('complete')),
+        'sha256': meta.get('sha256'),
+    }
+
+
+def create_upload(user_sub: str, filename: str, size: int, max_size: int, sha256: Optional[str] = None) -> dict:
+    """Start a resumable upload and return its status (offset 0)."""
+    if size <= 0:
+        raise UploadError('File is empty')
+    if size > max_size:
+        raise UploadError(f'File size exceeds maximum allowed size of {max_size / (1024 * 1024):.1f}MB', 413)
+    if sha256 is not None and not re.match(r'^[0-9a-fA-F]{64}$', sha256):
+        raise UploadError('Invalid sha256')
+    _purge_stale(time.time())
+    upload_id = secrets.token_urlsafe(24)
+    meta = {'user_sub': user_sub, 'filename': filename, 'size': size, 'expected_sha256': (sha256 or '').lower() or None,
+            'kind': None, 'complete': False, 'sha256': None, 'created_at': time.time()}
+    _, part_path = _paths(upload_id)
+    open(part_path, 'wb').close()
+    _write_meta(upload_id, meta)
+    return _status(upload_id, meta, 0)
+
+
+def upload_status(upload_id: str, user_sub: str) -> dict:
+    meta = _read_meta(upload_id, user_sub)
+    _, part_path = _paths(upload_id)
+    return _status(upload_id, meta, os.path.getsize(part_path))
+
+
+def _hasher_at(upload_id: str, f: IO[bytes], offset: int):
+    """
+    Hash state covering exactly the first `offset` bytes of the open spool file.
+
+    The cached state is reused only if the file is unchanged since this
+    process wrote it (same size and mtime); otherwise, e.g. after a restart or
+    a chunk taken by another worker process, the prefix is hashed again.
+    """
+    state = _hashers.get(upload_id)
+    if state is not None and state[:2] == (offset, os.fstat(f.fileno()).st_mtime_ns):
+        return state[2]
+    h = hashlib.sha256()
+    remaining = offset
+    f.seek(0)
+    while remaining > 0:
+        block = f.read(min(CHUNK_READ_SIZE, remaining))
+        if not block:
+            break
+        h.update(block)
+        remaining -= len(block)
+    return h
+
+
+def append_chunk(upload_id: str, user_sub: str, offset: int, stream) -> dict:
+    """
+    Append bytes from `stream` at `offset`, hashing and sniffing while writing.
+
+    The offset must equal the bytes already received, so clients resume from
+    the offset reported by upload_status().
+    """
+    _, part_path = _paths(upload_id)
+    with _locked_part(part_path) as out:
+        # Read under the lock: another process may have completed the upload or sniffed its kind
+        meta = _read_meta(upload_id, user_sub)
+        if meta.get('complete'):
+            raise UploadError('Upload already completed', 409)
+        received = os.fstat(out.fileno()).st_size
+        if offset != received:
+            raise UploadError(f'Offset mismatch; resume from {received}', 409)
+        hasher = _hasher_at(upload_id, out, received)
+        out.seek(received)
+        while True:
+            block = stream.read(CHUNK_READ_SIZE)
+            if not block:
+                break
+            if received + len(block) > meta['size']:
+                out.truncate(offset)
+                _hashers.pop(upload_id, None)
+                raise UploadError('Chunk exceeds declared upload size', 413)
+            out.write(block)
+            hasher.update(block)
+            received += len(block)
+        out.flush()
+        if meta.get('kind') is None and (received >= SNIFF_BYTES or received == meta['size']):
+            out.seek(0)
+            kind = sniff_kind(out.read(SNIFF_BYTES))
+            if kind is None:
+                out.truncate(0)
+                _hashers.pop(upload_id, None)
+                raise UploadError('Unsupported file content. Only PDF, PNG, JPEG or WebP documents are accepted.')
+            meta['kind'] = kind
+            _write_meta(upload_id, meta)
+        _hashers[upload_id] = (received, os.fstat(out.fileno()).st_mtime_ns, hasher)
+    return _status(upload_id, meta, received)
+
+
+def complete_upload(upload_id: str, user_sub: str) -> dict:
+    """Check size and checksum and mark the upload ready for parsing."""
+    _, part_path = _paths(upload_id)
+    with _locked_part(part_path) as f:
+        meta = _read_meta(upload_id, user_sub)
+        received = os.fstat(f.fileno()).st_size
+        if meta.get('complete'):
+            return _status(upload_id, meta, received)
+        if received != meta['size']:
+            raise UploadError(f'Upload incomplete; {received} of {meta["size"]} bytes received', 409)
+        digest = _hasher_at(upload_id, f, received).hexdigest()
+        if meta.get('expected_sha256') and digest != meta['expected_sha256']:
+            raise UploadError('Checksum mismatch', 422)
+        meta['sha256'] = digest
+        meta['complete'] = True
+        _write_meta(upload_id, meta)
+        _hashers.pop(upload_id, None)
+    return _status(upload_id, meta, received)
+
+
+def completed_upload(upload_id: str, user_sub: str) -> Tuple[str, str, str]:
+    """Return (spool path, filename, mime) of a completed upload for parsing."""
+    meta = _read_meta(upload_id, user_sub)
+    if not meta.get('complete'):
+        raise UploadError('Upload not completed', 409)
+    _, part_path = _paths(upload_id)
+    return part_path, meta['filename'], KIND_MIME.get(meta.get('kind'), 'application/octet-stream')